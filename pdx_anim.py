@@ -0,0 +1,558 @@
+"""
+    Paradox asset files, DCC independent animation data.
+
+    Converts between the interleaved sample layout of .anim files and per-bone channels. Samples are stored frame by
+    frame, then bone by bone (in info order) for each bone that animates that sample type, so each bones channel is a
+    set of fixed stride slices through the sample buffer.
+
+    Also provides headless clip editing (resampling, trimming, concatenation and loop closing) on decoded poses, usable
+    from the command line to process whole directories of .anim files, eg.
+        python pdx_anim.py ./anims ./anims_30fps --fps 30 --loop 3
+
+    author : ross-g
+"""
+
+from __future__ import division, print_function
+
+import os
+import math
+import argparse
+import multiprocessing
+from array import array
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+
+try:
+    import xml.etree.cElementTree as Xml
+except ImportError:
+    import xml.etree.ElementTree as Xml
+
+try:
+    from . import pdx_data, pdx_math
+except (ImportError, ValueError):
+    import pdx_data
+    import pdx_math
+
+
+""" ====================================================================================================================
+    Variables.
+========================================================================================================================
+"""
+
+# sample types, and the number of values stored per bone per frame
+PDX_SAMPLE_SIZES = OrderedDict([('t', 3), ('q', 4), ('s', 1)])
+
+# animation rounding precisions, shared by the exporters and used for constant channel tolerances
+PDX_ROUND_ROT = 4
+PDX_ROUND_TRANS = 3
+PDX_ROUND_SCALE = 2
+
+
+""" ====================================================================================================================
+    Functions.
+========================================================================================================================
+"""
+
+
+def read_animfiles(animpaths, threads=4):
+    """
+        Reads many .anim files, returning an (info, samples) element pair per file in the order given.
+        Files are read on a small thread pool so that file access overlaps with parsing.
+    """
+    def read_animfile(animpath):
+        asset_elem = pdx_data.read_meshfile(animpath)
+        return asset_elem.find('info'), asset_elem.find('samples')
+
+    if len(animpaths) < 2:
+        return [read_animfile(animpath) for animpath in animpaths]
+
+    pool = ThreadPool(min(threads, len(animpaths)))
+    try:
+        return pool.map(read_animfile, animpaths)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def get_animated_bones(info):
+    """
+        Returns an ordered dictionary of bone name to the sample types animated on that bone, from the .anim info.
+    """
+    return OrderedDict((bone.tag, bone.attrib['sa'][0]) for bone in info)
+
+
+def get_sample_layout(animated_bones):
+    """
+        Returns the per frame stride of each sample buffer, and the offset of each animated bone within a frame.
+    """
+    strides, offsets = dict(), dict()
+
+    for sample_type, size in PDX_SAMPLE_SIZES.items():
+        bones = [name for name, sample_types in animated_bones.items() if sample_type in sample_types]
+        strides[sample_type] = len(bones) * size
+        offsets[sample_type] = OrderedDict((name, k * size) for k, name in enumerate(bones))
+
+    return strides, offsets
+
+
+def get_animation_keys(info, samples):
+    """
+        Reads the .anim sample buffers into per-bone channels. Returns an ordered dictionary of bone name to a dictionary
+        of animated sample type to a list of per frame tuples, 3 values for 't', 4 for 'q' (xyzw) and 1 for 's'.
+        Each channel component is a single strided slice of the sample buffer.
+    """
+    framecount = info.attrib['sa'][0]
+    animated_bones = get_animated_bones(info)
+    strides, offsets = get_sample_layout(animated_bones)
+
+    channels = OrderedDict((name, dict()) for name in animated_bones)
+    for sample_type, size in PDX_SAMPLE_SIZES.items():
+        stride = strides[sample_type]
+        if stride == 0:
+            continue
+
+        data = samples.attrib[sample_type][: framecount * stride]
+        for name, offset in offsets[sample_type].items():
+            components = [data[offset + i :: stride] for i in range(size)]
+            channels[name][sample_type] = list(zip(*components))
+
+    return channels
+
+
+def get_animation_samples(channels, framecount):
+    """
+        Interleaves per-bone channels into the .anim sample buffers, the inverse of get_animation_keys. Channels are an
+        ordered dictionary of bone name to a dictionary of animated sample type to a list of per frame values. Only the
+        first component of each scale value is used, as animation supports uniform scale only.
+        Returns a dictionary of sample type to a typed float array, for each sample type animated on any bone.
+    """
+    animated_bones = OrderedDict(
+        (name, ''.join(sample_type for sample_type in PDX_SAMPLE_SIZES if sample_type in keys))
+        for name, keys in channels.items()
+    )
+    strides, offsets = get_sample_layout(animated_bones)
+
+    samples = dict()
+    for sample_type, size in PDX_SAMPLE_SIZES.items():
+        stride = strides[sample_type]
+        if stride == 0:
+            continue
+
+        # each channel component is written as a single strided slice
+        data = [0.0] * (framecount * stride)
+        for name, offset in offsets[sample_type].items():
+            channel = channels[name][sample_type]
+            for i in range(size):
+                data[offset + i :: stride] = [value[i] for value in channel]
+
+        samples[sample_type] = array('f', data)
+
+    return samples
+
+
+def get_channel_tolerances(ndigits):
+    """
+        Tolerances for constant channel detection per sample type, just under one quantization step at each precision
+        of (t, q, s). Noise smaller than a step is ignored, while a change of a whole step is kept despite float error.
+    """
+    return tuple((1.0 - 1e-6) * 10.0 ** -precision for precision in ndigits)
+
+
+def is_constant_channel(samples, tolerance=0.0):
+    """
+        Checks if a channel holds the same value on every frame, allowing each component to vary within the tolerance.
+    """
+    return all(max(values) - min(values) <= tolerance for values in zip(*samples))
+
+
+def clean_pose_rotations(bone_poses):
+    """
+        Renormalizes the sampled rotations of each bone and keeps them in the same hemisphere from frame to frame,
+        starting from a positive w. Interpolation in game then takes the short path between samples, and channels that
+        only flip sign are found to be constant. Returns new poses in the same layout as get_animation_channels takes.
+    """
+    cleaned = OrderedDict()
+
+    for name, poses in bone_poses.items():
+        translations, rotations, scales = zip(*poses) if poses else ([], [], [])
+        rotations = pdx_math.make_quaternions_continuous(
+            pdx_math.normalize_quaternions(rotations), previous=(0.0, 0.0, 0.0, 1.0)
+        )
+        cleaned[name] = list(zip(translations, rotations, scales))
+
+    return cleaned
+
+
+def get_animation_channels(bone_poses, ndigits=None, tolerances=None):
+    """
+        Finds the animated channels of each bone from its sampled poses. Poses are an ordered dictionary of bone name to
+        a list per frame of (translation, rotation, scale), in Game space with xyzw quaternions. Samples are rounded if
+        ndigits gives the precision of each of (t, q, s). A channel is animated if any component varies by more than
+        the tolerance for that sample type, which defaults to one quantization step when rounding and zero otherwise.
+        Returns an ordered dictionary of bone name to a dictionary of animated sample type to a list of frame tuples.
+    """
+    if tolerances is None:
+        tolerances = get_channel_tolerances(ndigits) if ndigits is not None else (0.0, 0.0, 0.0)
+
+    channels = OrderedDict()
+
+    for name, poses in bone_poses.items():
+        channels[name] = dict()
+
+        # convert data from list of tuples [(t,q,s)] to three nested lists [t][q][s]
+        sample_lists = list(zip(*poses))
+
+        for sample_type, samples, tolerance, i in zip(PDX_SAMPLE_SIZES, sample_lists, tolerances, range(3)):
+            # constant channels are left out, the initial pose in the bone info holds their value
+            if is_constant_channel(samples, tolerance):
+                continue
+
+            # store any animated transform samples per attribute
+            if ndigits is not None:
+                samples = pdx_math.quantize_keys(pdx_math.flatten(samples), ndigits[i], len(samples[0]))
+            else:
+                samples = [tuple(value) for value in samples]
+            channels[name][sample_type] = samples
+
+    return channels
+
+
+def prune_static_bones(bone_poses, channels):
+    """
+        Removes bones without any animated channels from both the poses and channels. The game then leaves these bones
+        in their bind pose, so this is only safe when the exported initial pose of each pruned bone matches it.
+    """
+    moving_bones = [name for name in bone_poses if channels[name]]
+    return (
+        OrderedDict((name, bone_poses[name]) for name in moving_bones),
+        OrderedDict((name, channels[name]) for name in moving_bones),
+    )
+
+
+def get_pruned_size(bone_poses, channels):
+    """
+        Bytes of samples saved by leaving out constant channels, compared to writing every channel of every bone.
+    """
+    framecount = len(next(iter(bone_poses.values()), []))
+    all_values = len(bone_poses) * sum(PDX_SAMPLE_SIZES.values())
+    animated_values = sum(PDX_SAMPLE_SIZES[sample_type] for bone in channels.values() for sample_type in bone)
+
+    return 4 * framecount * (all_values - animated_values)
+
+
+def create_anim_xml(fps, bone_poses, channels, ndigits):
+    """
+        Builds the .anim XML structure, ready for pdx_data.write_animfile. The first sampled pose of each bone describes
+        its initial offset from parent, and the animated channels are interleaved into the samples.
+    """
+    framecount = len(next(iter(bone_poses.values()), []))
+
+    # create an XML structure to store the object hierarchy
+    root_xml = Xml.Element('File')
+    root_xml.set('pdxasset', [1, 0])
+
+    # fill in animation info
+    info_xml = Xml.SubElement(root_xml, 'info')
+    info_xml.set('fps', [float(fps)])
+    info_xml.set('sa', [framecount])
+    info_xml.set('j', [len(bone_poses)])
+
+    # for each bone, write sample types and describe the initial offset from parent
+    for name, poses in bone_poses.items():
+        bone_xml = Xml.SubElement(info_xml, name)
+        bone_xml.set('sa', [''.join(sample_type for sample_type in PDX_SAMPLE_SIZES if sample_type in channels[name])])
+
+        # round to required precisions, animation supports uniform scale only
+        _translation, _rotation, _scale = poses[0]
+        bone_xml.set('t', pdx_math.quantize(list(_translation), ndigits[0]))
+        bone_xml.set('q', pdx_math.quantize(list(_rotation), ndigits[1]))
+        bone_xml.set('s', pdx_math.quantize([_scale[0]], ndigits[2]))
+
+    # interleave all animation data into flat sample buffers
+    samples_xml = Xml.SubElement(root_xml, 'samples')
+    for sample_type, sample_data in get_animation_samples(channels, framecount).items():
+        samples_xml.set(sample_type, sample_data)
+
+    return root_xml
+
+
+""" ====================================================================================================================
+    Pose cache.
+========================================================================================================================
+"""
+
+
+class PDXPoseCache(object):
+    """
+        Sampled scene poses per frame for one set of bones, so no frame is evaluated twice while the scene is unchanged.
+        The cache knows nothing of the scene, hosts are responsible for clearing it whenever the scene might change.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.names = []
+        self.frames = dict()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def clear(self):
+        self.key = None
+        self.names = []
+        self.frames.clear()
+
+    def get_poses(self, key, frames, sample_fn):
+        """
+            Returns poses for the frames, as an ordered dictionary of bone name to a list per frame of poses. Only the
+            frames not already cached are sampled, by calling sample_fn with a list of frames, which must return poses
+            in the same layout. The key identifies the bones being sampled, a different key replaces the cache.
+        """
+        if key != self.key:
+            self.clear()
+            self.key = key
+
+        # snapshot cached frames, as the host may clear the cache while sampling
+        names = self.names
+        frame_poses = dict((f, self.frames[f]) for f in frames if f in self.frames)
+
+        missing = sorted(set(f for f in frames if f not in frame_poses))
+        if missing:
+            sampled = sample_fn(missing)
+            names = list(sampled)
+            for i, f in enumerate(missing):
+                frame_poses[f] = [poses[i] for poses in sampled.values()]
+
+            # only keep the new samples if the cache wasn't cleared in the meantime
+            if self.key == key:
+                self.names = names
+                self.frames.update(frame_poses)
+
+        return OrderedDict((name, [frame_poses[f][b] for f in frames]) for b, name in enumerate(names))
+
+
+""" ====================================================================================================================
+    Clip editing.
+
+    Clips are edited as decoded poses, an ordered dictionary of bone name to a list per frame of parent-relative
+    (translation, rotation, scale), the same layout the exporters sample from the scene.
+========================================================================================================================
+"""
+
+
+def get_animation_poses(info, samples):
+    """
+        Decodes the .anim sample buffers into poses for every bone and frame. Channels not animated on a bone hold the
+        initial value from the bone info.
+    """
+    framecount = info.attrib['sa'][0]
+    all_bone_keys = get_animation_keys(info, samples)
+
+    bone_poses = OrderedDict()
+    for bone in info:
+        bone_keys = all_bone_keys[bone.tag]
+        sample_lists = [
+            bone_keys[sample_type] if sample_type in bone_keys else [tuple(bone.attrib[sample_type])] * framecount
+            for sample_type in PDX_SAMPLE_SIZES
+        ]
+        bone_poses[bone.tag] = list(zip(*sample_lists))
+
+    return bone_poses
+
+
+def read_animation(animpath):
+    """
+        Reads an .anim file, returning its fps and decoded poses.
+    """
+    info, samples = read_animfiles([animpath])[0]
+    return info.attrib['fps'][0], get_animation_poses(info, samples)
+
+
+def write_animation(animpath, fps, bone_poses, ndigits=(PDX_ROUND_TRANS, PDX_ROUND_ROT, PDX_ROUND_SCALE)):
+    """
+        Writes decoded poses to an .anim file, with the same rotation clean up and channel pruning as the exporters.
+    """
+    bone_poses = clean_pose_rotations(bone_poses)
+    channels = get_animation_channels(bone_poses, ndigits)
+    pdx_data.write_animfile(animpath, create_anim_xml(fps, bone_poses, channels, ndigits))
+
+
+def get_framecount(bone_poses):
+    return len(next(iter(bone_poses.values()), []))
+
+
+def interpolate_poses(poses_a, poses_b, factors):
+    """
+        Blends two lists of poses pairwise by a list of factors from 0 (A) to 1 (B). Translation and scale are linearly
+        interpolated, rotation is spherically interpolated.
+    """
+    (t_a, q_a, s_a), (t_b, q_b, s_b) = zip(*poses_a), zip(*poses_b)
+    return list(
+        zip(
+            pdx_math.lerp_vectors(t_a, t_b, factors),
+            pdx_math.slerp_quaternions(q_a, q_b, factors),
+            pdx_math.lerp_vectors(s_a, s_b, factors),
+        )
+    )
+
+
+def resample_poses(bone_poses, fps, new_fps):
+    """
+        Resamples poses from one frame rate to another, keeping the first and last frames and the overall duration.
+        Clips too short to span two frames at the new frame rate are reduced to their first frame. The new duration in
+        frames is rounded to the nearest whole frame, exact halves round down (the same under Py2 and Py3).
+    """
+    framecount = get_framecount(bone_poses)
+    new_framecount = int(math.ceil((framecount - 1) * new_fps / fps - 0.5)) + 1
+    if framecount < 2 or new_framecount == framecount:
+        return OrderedDict((name, list(poses)) for name, poses in bone_poses.items())
+
+    # too short to hold more than one frame at the new frame rate
+    if new_framecount < 2:
+        return OrderedDict((name, poses[:1]) for name, poses in bone_poses.items())
+
+    # source frame either side of each new frame, and how far between them it falls
+    times = [j * (framecount - 1) / (new_framecount - 1) for j in range(new_framecount)]
+    lower = [min(int(time), framecount - 2) for time in times]
+    factors = [time - i for time, i in zip(times, lower)]
+
+    return OrderedDict(
+        (name, interpolate_poses([poses[i] for i in lower], [poses[i + 1] for i in lower], factors))
+        for name, poses in bone_poses.items()
+    )
+
+
+def trim_poses(bone_poses, start=0, end=None):
+    """
+        Keeps the frames from start to end inclusive, counted from 0. Negative frames count back from the last frame.
+    """
+    end = get_framecount(bone_poses) - 1 if end is None else end
+    stop = end + 1 if end != -1 else None
+
+    return OrderedDict((name, poses[start:stop]) for name, poses in bone_poses.items())
+
+
+def concat_poses(all_bone_poses):
+    """
+        Joins a list of clips end to end. Every clip must animate the same bones, in the same order.
+    """
+    bone_names = list(all_bone_poses[0])
+    for bone_poses in all_bone_poses[1:]:
+        if list(bone_poses) != bone_names:
+            raise ValueError("Mismatched bones, unable to concatenate animations.")
+
+    return OrderedDict(
+        (name, [pose for bone_poses in all_bone_poses for pose in bone_poses[name]]) for name in bone_names
+    )
+
+
+def loop_close_poses(bone_poses, blend_frames=1):
+    """
+        Makes a clip loop seamlessly by blending its last frames towards the first, so the final frame matches the
+        first. The blend ramps up linearly over blend_frames frames.
+    """
+    framecount = get_framecount(bone_poses)
+    blend_frames = min(max(blend_frames, 1), framecount - 1)
+    if blend_frames < 1:
+        return OrderedDict((name, list(poses)) for name, poses in bone_poses.items())
+
+    first_blended = framecount - blend_frames
+    factors = [(k + 1) / blend_frames for k in range(blend_frames)]
+
+    looped = OrderedDict()
+    for name, poses in bone_poses.items():
+        blended = interpolate_poses(poses[first_blended:], [poses[0]] * blend_frames, factors)
+        looped[name] = poses[:first_blended] + blended
+
+    return looped
+
+
+def process_animation(animpath, fps=None, start=0, end=None, loop_frames=0):
+    """
+        Applies clip edits to an .anim file in order, trimming, resampling then loop closing. Returns the new fps and
+        poses.
+    """
+    anim_fps, bone_poses = read_animation(animpath)
+
+    bone_poses = trim_poses(bone_poses, start, end)
+    if fps is not None and fps != anim_fps:
+        bone_poses = resample_poses(bone_poses, anim_fps, fps)
+        anim_fps = fps
+    if loop_frames:
+        bone_poses = loop_close_poses(bone_poses, loop_frames)
+
+    return anim_fps, bone_poses
+
+
+def _process_job(job):
+    # process pool worker, clips that are to be joined are returned rather than written
+    animpath, outpath, options = job
+    fps, bone_poses = process_animation(animpath, **options)
+    if outpath is None:
+        return fps, bone_poses
+
+    write_animation(outpath, fps, bone_poses)
+    return outpath
+
+
+""" ====================================================================================================================
+    Main.
+========================================================================================================================
+"""
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Resample, trim, loop and join Paradox .anim files.")
+    parser.add_argument('input', help="an .anim file, or a directory of them")
+    parser.add_argument('output', help="directory to write processed .anim files to")
+    parser.add_argument('--fps', type=float, help="resample to this frame rate")
+    parser.add_argument('--start', type=int, default=0, help="first frame to keep, counted from 0")
+    parser.add_argument('--end', type=int, help="last frame to keep, counted from 0")
+    parser.add_argument('--loop', type=int, default=0, metavar='FRAMES', help="blend the last frames into the first")
+    parser.add_argument('--concat', metavar='NAME', help="join all processed animations into a single file")
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(), help="worker process count")
+    args = parser.parse_args(args)
+
+    if os.path.isdir(args.input):
+        animpaths = sorted(
+            os.path.join(args.input, f) for f in os.listdir(args.input) if os.path.splitext(f)[1].lower() == '.anim'
+        )
+    else:
+        animpaths = [args.input]
+    if not animpaths:
+        parser.error("No .anim files found in {0}".format(args.input))
+    if not os.path.isdir(args.output):
+        os.makedirs(args.output)
+
+    options = dict(fps=args.fps, start=args.start, end=args.end, loop_frames=args.loop)
+    jobs = [
+        (animpath, None if args.concat else os.path.join(args.output, os.path.basename(animpath)), options)
+        for animpath in animpaths
+    ]
+
+    if args.processes > 1 and len(jobs) > 1:
+        pool = multiprocessing.Pool(min(args.processes, len(jobs)))
+        try:
+            results = pool.map(_process_job, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_process_job(job) for job in jobs]
+
+    if args.concat:
+        all_fps = set(fps for fps, _ in results)
+        if len(all_fps) != 1:
+            parser.error("Animations have mixed speeds, unable to join together. {0}".format(sorted(all_fps)))
+        outpath = os.path.join(args.output, os.path.splitext(args.concat)[0] + '.anim')
+        write_animation(outpath, all_fps.pop(), concat_poses([bone_poses for _, bone_poses in results]))
+        results = [outpath]
+
+    for outpath in results:
+        print(outpath)
+
+
+if __name__ == '__main__':
+    """
+       When called from the command line, processes .anim files with the clip editing functions above
+    """
+    main()
@@ -106,11 +106,22 @@ def register():
     bpy.types.Scene.io_pdx_group = PointerProperty(type=PDXObject_Group)
     bpy.types.Scene.io_pdx_export = PointerProperty(type=PDXExport_settings)
 
+    # keep the bone name to armature lookup and sampled pose cache in sync with scene changes
+    bpy.app.handlers.depsgraph_update_post.append(blender_import_export.rig_index_update_handler)
+    bpy.app.handlers.depsgraph_update_post.append(blender_import_export.pose_cache_update_handler)
+    bpy.app.handlers.load_post.append(blender_import_export.pose_cache_update_handler)
+
 
 def unregister():
     for cls in classes:
         bpy.utils.unregister_class(cls)
 
+    # remove handlers by name, the module may have been reloaded since registering
+    for handlers in [bpy.app.handlers.depsgraph_update_post, bpy.app.handlers.load_post]:
+        for handler in list(handlers):
+            if handler.__name__ in ['rig_index_update_handler', 'pose_cache_update_handler']:
+                handlers.remove(handler)
+
     # remove tool properties from scene
     del bpy.types.Scene.io_pdx_settings
     del bpy.types.Scene.io_pdx_material
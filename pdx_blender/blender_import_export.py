@@ -24,6 +24,11 @@ import math
 from mathutils import Vector, Matrix, Quaternion
 
 from .. import pdx_data
+from ..pdx_data import clean_imported_name
+from .. import pdx_anim
+from ..pdx_anim import PDX_ROUND_ROT, PDX_ROUND_TRANS, PDX_ROUND_SCALE
+from .. import pdx_math
+from .. import pdx_skeleton
 from .. import IO_PDX_LOG
 
 
@@ -39,9 +44,7 @@ PDX_MESHINDEX = 'meshindex'
 PDX_MAXSKININFS = 4
 
 PDX_DECIMALPTS = 5
-PDX_ROUND_ROT = 4
-PDX_ROUND_TRANS = 3
-PDX_ROUND_SCALE = 2
+PDX_MINSKINWEIGHT = 10.0 ** -PDX_DECIMALPTS  # skin weights at or below this are pruned on export
 
 # fmt: off
 SPACE_MATRIX = Matrix((
@@ -58,6 +61,15 @@ BONESPACE_MATRIX = Matrix((
 ))
 # fmt: on
 
+# simple datatype for animation clips
+AnimClip = namedtuple('AnimClip', ['name', 'start', 'end'])
+
+# lookup of bone names to armatures, see get_rig_index
+RIG_INDEX = None
+
+# sampled animation poses, reused between exports until the scene changes
+POSE_CACHE = pdx_anim.PDXPoseCache()
+
 
 """ ====================================================================================================================
     Helper functions.
@@ -65,37 +77,79 @@ BONESPACE_MATRIX = Matrix((
 """
 
 
-def util_round(data, ndigits=0):
-    return tuple(round(x, ndigits) for x in data)
+def get_bmesh(mesh_data):
+    """
+        Returns a BMesh from existing mesh data
+    """
+    bm = bmesh.new()
+    bm.from_mesh(mesh_data)
 
+    return bm
 
-def clean_imported_name(name):
-    # strip any namespace names, taking the final name only
-    clean_name = name.split(':')[-1]
 
-    # replace hierarchy separator character used by Maya in the case of non-unique leaf node names
-    clean_name = clean_name.replace('|', '_')
+def get_rig_index():
+    """
+        Returns a dictionary of bone name to armature object name, for every armature in the file.
+        This is built once and then reused until cleared, by an operation or a depsgraph update to an armature.
+    """
+    global RIG_INDEX
 
-    return clean_name
+    if RIG_INDEX is None:
+        RIG_INDEX = dict()
+        for obj in bpy.data.objects:
+            if type(obj.data) == bpy.types.Armature:
+                for bone in obj.data.bones:
+                    # the first armature found with a bone name takes precedence
+                    RIG_INDEX.setdefault(bone.name, obj.name)
 
+    return RIG_INDEX
 
-def get_bmesh(mesh_data):
+
+def clear_rig_index():
+    global RIG_INDEX
+    RIG_INDEX = None
+
+
+@bpy.app.handlers.persistent
+def rig_index_update_handler(scene, depsgraph=None):
     """
-        Returns a BMesh from existing mesh data
+        Handler for bpy.app.handlers.depsgraph_update_post, clears the rig index when armatures might have changed.
     """
-    bm = bmesh.new()
-    bm.from_mesh(mesh_data)
+    if depsgraph is None or any(
+        isinstance(update.id, (bpy.types.Armature, bpy.types.Object)) for update in depsgraph.updates
+    ):
+        clear_rig_index()
 
-    return bm
+
+def is_pose_update(update):
+    """
+        Checks if a depsgraph update can change sampled poses. Any object transform (including constraint targets), any
+        change to an armature object or its data, and any action edit.
+    """
+    if isinstance(update.id, (bpy.types.Armature, bpy.types.Action)):
+        return True
+    if isinstance(update.id, bpy.types.Object):
+        return update.is_updated_transform or update.id.type == 'ARMATURE'
+
+    return False
+
+
+@bpy.app.handlers.persistent
+def pose_cache_update_handler(scene=None, depsgraph=None):
+    """
+        Handler for bpy.app.handlers.depsgraph_update_post and load_post, clears the pose cache when poses might have
+        changed. Edits that can't affect poses, eg. to meshes or materials, keep the cache.
+    """
+    if depsgraph is None or any(is_pose_update(update) for update in depsgraph.updates):
+        POSE_CACHE.clear()
 
 
 def get_rig_from_bone_name(bone_name):
-    scene_rigs = [obj for obj in bpy.data.objects if type(obj.data) == bpy.types.Armature]
+    rig = bpy.data.objects.get(get_rig_index().get(bone_name, ''))
 
-    for rig in scene_rigs:
-        armt = rig.data
-        if bone_name in [b.name for b in armt.bones]:
-            return rig
+    # guard against the index being stale, eg. objects renamed or bones edited since it was built
+    if rig is not None and type(rig.data) == bpy.types.Armature and bone_name in rig.data.bones:
+        return rig
 
 
 def get_rig_from_mesh(blender_obj):
@@ -247,11 +301,13 @@ def get_mesh_info(blender_obj, mat_index, skip_merge_vertices=False, round_data=
     bm.verts.index_update()
 
     # build a blank dictionary of mesh information for the exporter
-    mesh_dict = {x: [] for x in ['p', 'n', 'ta', 'u0', 'u1', 'u2', 'u3', 'tri', 'min', 'max']}
+    mesh_dict = {x: [] for x in ['p', 'n', 'ta', 'u0', 'u1', 'u2', 'u3', 'tri', 'boundingsphere', 'min', 'max']}
 
-    # collect all unique verts in the order that we process them
-    export_verts = []
-    unique_verts = set()
+    # collect the attributes of every tri-vert in the order that we process them, these are rounded in bulk afterwards
+    trivert_ids = []
+    trivert_data = {x: [] for x in ['p', 'n', 'ta', 'bs']}
+    trivert_uvs = [[] for _ in uv_setnames]
+    trivert_refs = []
 
     for tri in bm.faces:  # all Bmesh faces were triangulated previously
         if tri.material_index != mat_index:
@@ -264,89 +320,69 @@ def get_mesh_info(blender_obj, mat_index, skip_merge_vertices=False, round_data=
         sorted_indices = [i[0] for i in _sorted]    # track sorting change
         sorted_loops = [i[1] for i in _sorted]
 
-        dict_vert_idx = []
+        # to build the tri-face correctly, we need to use the original unsorted vertex order to reference verts
+        first = len(trivert_ids)
+        trivert_refs.extend(
+            [first + sorted_indices[0], first + sorted_indices[2], first + sorted_indices[1]]
+        )  # convert handedness to Game space
 
         for loop in sorted_loops:
-            vert = loop.vert
-            vert_id = vert.index
+            trivert_ids.append(loop.vert.index)
+            mesh_loop = mesh.loops[loop.index]  # assumes mesh-loop and bmesh-loop share indices!
 
             # position
-            _position = vert.co
-            _position = tuple(swap_coord_space(_position))  # convert to Game space
-            if round_data:
-                _position = util_round(_position, PDX_DECIMALPTS)
+            trivert_data['p'].extend(swap_coord_space(loop.vert.co))  # convert to Game space
 
             # normal
             # FIXME : seems like custom normal per face-vertex is not available through bmesh?
             # _normal = loop.calc_normal()
-            _normal = mesh.loops[loop.index].normal  # assumes mesh-loop and bmesh-loop share indices!
-            _normal = tuple(swap_coord_space(_normal))  # convert to Game space
-            if round_data:
-                _normal = util_round(_normal, PDX_DECIMALPTS)
+            trivert_data['n'].extend(swap_coord_space(mesh_loop.normal))  # convert to Game space
 
             # uv
-            _uv_coords = ()
             for i, uv_set in enumerate(uv_setnames):
                 uv_layer = bm.loops.layers.uv[uv_set]
-                uv = loop[uv_layer].uv
-                uv = tuple(swap_coord_space(tuple(uv)))  # convert to Game space
-                if round_data:
-                    uv = util_round(uv, PDX_DECIMALPTS)
-                _uv_coords += (uv,)
+                trivert_uvs[i].extend(swap_coord_space(tuple(loop[uv_layer].uv)))  # convert to Game space
 
             # tangent (omitted if there were no UVs)
             if uv_setnames:
                 # _tangent = loop.calc_tangent()
-                _bitangent_sign = mesh.loops[loop.index].bitangent_sign
-                _tangent = mesh.loops[loop.index].tangent  # assumes mesh-loop and bmesh-loop share indices!
-                _tangent = tuple(swap_coord_space(_tangent))  # convert to Game space
-                if round_data:
-                    _tangent = util_round(_tangent, PDX_DECIMALPTS)
-
-            # check if this tri-vert is new and unique, or can if we can just use an existing vertex
-            new_vert = UniqueVertex(vert_id, _position, _normal, _uv_coords)
-
-            # test if we have already stored this vertex in the unique set
-            i = None
-            if not skip_merge_vertices:
-                if new_vert in unique_verts:
-                    # no new data to be added to the mesh dict, the tri will reference an existing vert
-                    i = export_verts.index(new_vert)
-
-            if i is None:
-                # collect the new vertex
-                unique_verts.add(new_vert)
-                export_verts.append(new_vert)
-
-                # add this vert data to the mesh dict
-                mesh_dict['p'].extend(_position)
-                mesh_dict['n'].extend(_normal)
-                for i, uv_set in enumerate(uv_setnames):
-                    mesh_dict['u' + str(i)].extend(_uv_coords[i])
-                if uv_setnames:
-                    mesh_dict['ta'].extend(_tangent)
-                    mesh_dict['ta'].append(_bitangent_sign)  # UV winding order
-                # the tri will reference the last added vertex
-                i = len(export_verts) - 1
-
-            # store the tri-vert reference
-            dict_vert_idx.append(i)
-
-        # tri-faces
-        mesh_dict['tri'].extend(
-            # to build the tri-face correctly, we need to use the original unsorted vertex order to reference verts
-            [dict_vert_idx[sorted_indices[0]], dict_vert_idx[sorted_indices[2]], dict_vert_idx[sorted_indices[1]]]
-        )  # convert handedness to Game space
-
-    # calculate min and max bounds of mesh
-    x_vtx_pos = set([mesh_dict['p'][j] for j in range(0, len(mesh_dict['p']), 3)])
-    y_vtx_pos = set([mesh_dict['p'][j + 1] for j in range(0, len(mesh_dict['p']), 3)])
-    z_vtx_pos = set([mesh_dict['p'][j + 2] for j in range(0, len(mesh_dict['p']), 3)])
-    mesh_dict['min'] = [min(x_vtx_pos), min(y_vtx_pos), min(z_vtx_pos)]
-    mesh_dict['max'] = [max(x_vtx_pos), max(y_vtx_pos), max(z_vtx_pos)]
-
-    # create an ordered list of vertex ids that we have gathered into the mesh dict
-    vert_id_list = [vert.id for vert in export_verts]
+                trivert_data['ta'].extend(swap_coord_space(mesh_loop.tangent))  # convert to Game space
+                trivert_data['bs'].append(mesh_loop.bitangent_sign)  # UV winding order
+
+    # round all attributes as whole arrays, UV winding order is a sign so is never rounded
+    if round_data:
+        for key in ['p', 'n', 'ta']:
+            trivert_data[key] = pdx_math.quantize(trivert_data[key], PDX_DECIMALPTS)
+        trivert_uvs = [pdx_math.quantize(uvs, PDX_DECIMALPTS) for uvs in trivert_uvs]
+
+    p_keys = pdx_math.pack(trivert_data['p'], 3)
+    n_keys = pdx_math.pack(trivert_data['n'], 3)
+    ta_keys = pdx_math.pack(trivert_data['ta'], 3)
+    uv_keys = list(zip(*[pdx_math.pack(uvs, 2) for uvs in trivert_uvs])) or [()] * len(trivert_ids)
+
+    # weld tri-verts into unique verts, in the order that we processed them, tris will reference the existing verts
+    unique_verts = [UniqueVertex(*vert_data) for vert_data in zip(trivert_ids, p_keys, n_keys, uv_keys)]
+    first_triverts, trivert_export_idx = pdx_math.weld(unique_verts, merge=not skip_merge_vertices)
+    vert_id_list = []
+
+    for k in first_triverts:
+        new_vert = unique_verts[k]
+        vert_id_list.append(new_vert.id)
+
+        # add this vert data to the mesh dict
+        mesh_dict['p'].extend(new_vert.p)
+        mesh_dict['n'].extend(new_vert.n)
+        for j, uv in enumerate(new_vert.uv):
+            mesh_dict['u' + str(j)].extend(uv)
+        if ta_keys:
+            mesh_dict['ta'].extend(ta_keys[k])
+            mesh_dict['ta'].append(trivert_data['bs'][k])
+
+    # tri-faces
+    mesh_dict['tri'] = [trivert_export_idx[k] for k in trivert_refs]
+
+    # calculate min and max bounds and the bounding sphere of mesh
+    mesh_dict.update(pdx_math.get_bounds(mesh_dict['p']))
 
     # cleanup
     bm.free()
@@ -357,74 +393,75 @@ def get_mesh_info(blender_obj, mat_index, skip_merge_vertices=False, round_data=
     return mesh_dict, vert_id_list
 
 
-def get_mesh_skin_info(blender_obj, vertex_ids=None):
-    # bpy.ops.object.vertex_group_limit_total(group_select_mode='', limit=4)
-
-    skin_mod = [mod for mod in blender_obj.modifiers if type(mod) == bpy.types.ArmatureModifier]
-    if not skin_mod:
-        return None
-
-    # a mesh can only be connected to one armature modifier
-    skin = skin_mod[0]
-    # get the armature referenced by the modifier
-    rig = skin.object
+def get_mesh_skin_weights(blender_obj, prune_threshold=0.0, ndigits=None):
+    """
+        Returns dense skin data for every vertex of the mesh, as flat lists of PDX_MAXSKININFS bone indices and weights
+        per vertex. This is gathered in a single pass and can then be sliced per material by get_mesh_skin_info.
+        Vertices skinned to too many bones are limited to the largest weights and renormalized.
+        Weights at or below prune_threshold are dropped, and all weights are rounded to ndigits if given.
+    """
+    rig = get_rig_from_mesh(blender_obj)
     if rig is None:
         return None
 
-    # build a dictionary of skin information for the exporter
-    skin_dict = {x: [] for x in ['bones', 'ix', 'w']}
-
-    # set number of joint influences per vert
-    skin_dict['bones'].append(PDX_MAXSKININFS)
-
-    # find bone/vertex-group influences
-    bone_names = [bone.name for bone in get_skeleton_hierarchy(rig)]
-    group_names = [group.name for group in blender_obj.vertex_groups]
+    # map vertex group indices to bone indices, as it's not guaranteed that group indices and bone indices line up
+    bone_indices = {bone.name: i for i, bone in enumerate(get_skeleton_hierarchy(rig))}
+    group_to_bone = [bone_indices.get(group.name) for group in blender_obj.vertex_groups]
 
-    # parse all verts in order if we didn't supply a subset of vert ids
+    # build a sparse list of influences per vertex
     mesh = blender_obj.data
-    if vertex_ids is None:
-        vertex_ids = range(len(mesh.vertices))
+    vert_influences = []
 
-    # iterate over influences to find weights, per vertex
-    vert_weights = {v: {} for v in vertex_ids}
-    for vert_id, vtx in enumerate(mesh.vertices):
+    for vtx in mesh.vertices:
+        influences = []
         for vtx_group in vtx.groups:
-            group_index = vtx_group.group
-            # get bone index by group name lookup, as it's not guaranteed that group indices and bone indices line up
-            try:
-                bone_index = bone_names.index(group_names[group_index])
-            except ValueError:
+            bone_index = group_to_bone[vtx_group.group]
+            if bone_index is None:
                 raise RuntimeError(
                     "Mesh {0} has vertices skinned to a group ({1}) targeting a missing or excluded armature bone!"
                     "Check all bones using the '{2}' property.".format(
-                        mesh.name, group_names[group_index], PDX_IGNOREJOINT
+                        mesh.name, blender_obj.vertex_groups[vtx_group.group].name, PDX_IGNOREJOINT
                     )
                 )
-            if group_index < len(blender_obj.vertex_groups):
-                # check we actually want this vertex (in case of material split meshes)
-                if vert_id in vertex_ids:
-                    # store any non-zero weights, by influence, per vertex
-                    weight = vtx_group.weight
-                    if weight != 0.0:
-                        vert_weights[vert_id][bone_index] = vtx_group.weight
-
-    # collect data from the weights dict into the skin dict
-    for vtx in vertex_ids:
-        for influence, weight in vert_weights[vtx].items():
-            skin_dict['ix'].append(influence)
-            skin_dict['w'].append(weight)
-        if len(vert_weights[vtx]) <= PDX_MAXSKININFS:
-            # pad out with null data to fill the maximum influence count
-            padding = PDX_MAXSKININFS - len(vert_weights[vtx])
-            skin_dict['ix'].extend([-1] * padding)
-            skin_dict['w'].extend([0.0] * padding)
-        else:
-            # warn if vertex influence count exceeds the max
-            raise RuntimeError(
-                "Mesh {0} has vertices skinned to more than {1} vertex groups! This is not supported. "
-                "Use 'Weight Tools > Limit Total' to reduce influence count.".format(mesh.name, PDX_MAXSKININFS)
+            # store any non-zero weights, by influence
+            if vtx_group.weight != 0.0:
+                influences.append((bone_index, vtx_group.weight))
+        vert_influences.append(influences)
+
+    # limit to the maximum influence count, padding out with null data
+    ix, w, report = pdx_math.limit_influences(
+        vert_influences, PDX_MAXSKININFS, prune_threshold=prune_threshold, ndigits=ndigits
+    )
+    if report['limited']:
+        IO_PDX_LOG.warning(
+            "Mesh {0} has {1} vertices skinned to more than {2} vertex groups or below the prune threshold, these were "
+            "limited and renormalized. (max weight error {3:.4f})".format(
+                mesh.name, report['limited'], PDX_MAXSKININFS, report['max_error']
             )
+        )
+
+    return {'ix': ix, 'w': w}
+
+
+def get_mesh_skin_info(blender_obj, vertex_ids=None, skin_weights=None):
+    if skin_weights is None:
+        skin_weights = get_mesh_skin_weights(blender_obj, PDX_MINSKINWEIGHT, PDX_DECIMALPTS)
+    if skin_weights is None:
+        return None
+
+    # build a dictionary of skin information for the exporter
+    skin_dict = {x: [] for x in ['bones', 'ix', 'w']}
+
+    # set number of joint influences per vert
+    skin_dict['bones'].append(PDX_MAXSKININFS)
+
+    # parse all verts in order if we didn't supply a subset of vert ids
+    if vertex_ids is None:
+        vertex_ids = range(len(blender_obj.data.vertices))
+
+    # slice the dense skin data down to the vertices we want (in case of material split meshes)
+    skin_dict['ix'] = pdx_math.gather(skin_weights['ix'], PDX_MAXSKININFS, vertex_ids)
+    skin_dict['w'] = pdx_math.gather(skin_weights['w'], PDX_MAXSKININFS, vertex_ids)
 
     return skin_dict
 
@@ -437,25 +474,25 @@ def get_mesh_skeleton_info(blender_obj):
     # find all bones in hierarchy to be exported
     all_bones = get_skeleton_hierarchy(rig)
 
+    skeleton = pdx_skeleton.PDXSkeleton.from_hierarchy(
+        [bone.name for bone in all_bones], [bone.parent.name if bone.parent else None for bone in all_bones]
+    )
+
+    # bone inverse world-space transforms, transposed to row-vector layout and converted to Game space as a batch
+    inverse_matrices = []
+    for bone in all_bones:
+        mat = (rig.matrix_world @ bone.matrix_local).inverted_safe().transposed()
+        inverse_matrices.append([i for vector in mat for i in vector])  # flatten matrix to list
+    inverse_matrices = pdx_math.convert_space(inverse_matrices, get_space_matrix())
+    transforms = pdx_math.matrices_to_tx(inverse_matrices)
+
     # build a list of bone information dictionaries for the exporter
-    bone_list = [{'name': x.name} for x in all_bones]
-    for i, bone in enumerate(all_bones):
-        # bone index
-        bone_list[i]['ix'] = [i]
-
-        # bone parent index
-        if bone.parent:
-            bone_list[i]['pa'] = [all_bones.index(bone.parent)]
-
-        # bone inverse world-space transform
-        mat = swap_coord_space(rig.matrix_world @ bone.matrix_local).inverted_safe()  # convert to Game space
-        mat.transpose()
-        mat = [i for vector in mat for i in vector]  # flatten matrix to list
-        bone_list[i]['tx'] = []
-        bone_list[i]['tx'].extend(mat[0:3])
-        bone_list[i]['tx'].extend(mat[4:7])
-        bone_list[i]['tx'].extend(mat[8:11])
-        bone_list[i]['tx'].extend(mat[12:15])
+    bone_list = []
+    for i, name in enumerate(skeleton.names):
+        bone_info = {'name': name, 'ix': [i], 'tx': transforms[i]}
+        if skeleton.parents[i] >= 0:
+            bone_info['pa'] = [skeleton.parents[i]]
+        bone_list.append(bone_info)
 
     return bone_list
 
@@ -478,60 +515,87 @@ def get_skeleton_hierarchy(rig):
     return valid_bones
 
 
-def get_scene_animdata(rig, export_bones, startframe, endframe, round_data=True):
-    # store transform for each bone over the frame range
-    frames_data = defaultdict(list)
-
-    for f in range(startframe, endframe + 1):
+def get_scene_posedata(rig, export_bones, frames):
+    """
+        Samples the parent-relative transform of each export bone on each of the given frames, in Game space. Returns an
+        ordered dictionary of bone name to a list per frame of (translation, rotation, scale).
+        Only the frame change happens per frame, every pose matrix is read with a single foreach_get and the transforms
+        for all bones and frames are then calculated together.
+    """
+    pose_bones = rig.pose.bones
+    pose_index = {pose_bone.name: i for i, pose_bone in enumerate(pose_bones)}
+    bone_indices = [pose_index[bone.name] for bone in export_bones]
+    parent_indices = [pose_index[bone.parent.name] if bone.parent else -1 for bone in export_bones]
+
+    # gather pose matrices for every frame, these are in row-vector layout when read as a flat buffer
+    pose_buffer = [0.0] * (len(pose_bones) * 16)
+    bone_matrices, parent_matrices = [], []
+    for f in frames:
         bpy.context.scene.frame_set(f)
-        for bone in export_bones:
-            pose_bone = rig.pose.bones[bone.name]
-
-            # build a matrix describing the transform from parent bone
-            parent_matrix = Matrix()
-            if pose_bone.parent:
-                # parent_matrix = pose_bone.parent.matrix.copy()
-                parent_matrix = rig.convert_space(
-                    pose_bone=pose_bone.parent, matrix=pose_bone.parent.matrix, from_space='POSE', to_space='WORLD'
-                )
+        pose_bones.foreach_get('matrix', pose_buffer)
+        pose_matrices = pdx_math.pack(pose_buffer, 16)
 
-            # offset_matrix = parent_matrix.inverted_safe() @ pose_bone.matrix
-            pose_matrix = rig.convert_space(
-                pose_bone=pose_bone, matrix=pose_bone.matrix, from_space='POSE', to_space='WORLD'
-            )
-            offset_matrix = parent_matrix.inverted_safe() @ pose_matrix
-            _translation, _rotation, _scale = swap_coord_space(offset_matrix).decompose()  # Convert to Game space
+        # root bones are relative to world space, the armature transform cancels out for all other bones
+        rig_inverse = pdx_math.invert_matrices([[i for vector in rig.matrix_world.transposed() for i in vector]])[0]
+        bone_matrices.extend(pose_matrices[i] for i in bone_indices)
+        parent_matrices.extend(pose_matrices[i] if i >= 0 else rig_inverse for i in parent_indices)
 
-            frames_data[bone.name].append((_translation, _rotation, _scale))
+    # build matrices describing the transform from parent bone, convert to Game space and decompose
+    offset_matrices = pdx_math.multiply_matrices(bone_matrices, pdx_math.invert_matrices(parent_matrices))
+    offset_matrices = pdx_math.convert_space(offset_matrices, get_space_matrix())
+    translations, rotations, scales = pdx_math.decompose_matrices(offset_matrices)
 
-    # create an ordered dictionary of all animated bones to store sample data
-    all_bone_keyframes = OrderedDict()
-    for bone in export_bones:
-        all_bone_keyframes[bone.name] = dict()
+    # quaternions are already xyzw
+    num_bones = len(export_bones)
+    bone_poses = OrderedDict()
+    for b, bone in enumerate(export_bones):
+        bone_poses[bone.name] = list(zip(translations[b::num_bones], rotations[b::num_bones], scales[b::num_bones]))
 
-    # determine if any transform attributes were animated over this frame range for each bone
-    for bone in export_bones:
-        # convert data from list of tuples [(t,q,s)] to three nested lists [t][q][s]
-        t_list, q_list, s_list = zip(*frames_data[bone.name])
+    return bone_poses
 
-        if round_data:
-            t_list = [util_round(t, PDX_ROUND_TRANS) for t in t_list]
-            q_list = [util_round(q, PDX_ROUND_ROT) for q in q_list]
-            s_list = [util_round(s, PDX_ROUND_SCALE) for s in s_list]
-        else:
-            t_list = [t.freeze() for t in t_list]  # call freeze so Blender data can be hashed into a set
-            q_list = [q.freeze() for q in q_list]
-            s_list = [s.freeze() for s in s_list]
 
-        # convert quaternions from wxyz to xyzw
-        q_list = [(q[1], q[2], q[3], q[0]) for q in q_list]
+def get_cached_posedata(rig, export_bones, frames):
+    """
+        As get_scene_posedata, but reuses any frames already sampled from the same bones since the scene last changed.
+    """
+    curr_frame = bpy.context.scene.frame_current
+    key = (rig.name, tuple(bone.name for bone in export_bones))
+    bone_poses = POSE_CACHE.get_poses(key, frames, lambda missing: get_scene_posedata(rig, export_bones, missing))
+    if bpy.context.scene.frame_current != curr_frame:
+        bpy.context.scene.frame_set(curr_frame)
+
+    return bone_poses
+
+
+def get_animation_clips(rig, track=None):
+    """
+        Returns a list of AnimClip tuples, one per NLA strip on the armature, sorted by start frame.
+        Only strips on the given NLA track are returned if one is given.
+    """
+    anim_clips = []
+
+    if rig.animation_data:
+        for nla_track in rig.animation_data.nla_tracks:
+            if nla_track.mute or (track is not None and nla_track != track):
+                continue
+            for strip in nla_track.strips:
+                if not strip.mute:
+                    anim_clips.append(AnimClip(strip.name, int(strip.frame_start), int(strip.frame_end)))
+
+    # sort clips by start frame
+    anim_clips.sort(key=lambda clip: clip.start)
+
+    return anim_clips
+
 
-        # store any animated transform samples per attribute
-        for attr, attr_list in zip(['t', 'q', 's'], [t_list, q_list, s_list]):
-            if len(set(attr_list)) != 1:
-                all_bone_keyframes[bone.name][attr] = attr_list
+def get_space_matrix():
+    """
+        Returns the space conversion matrix as a flat list in row-vector layout, for use with the pdx_math matrix
+        functions. Converting a row-vector matrix by this is equivalent to swap_coord_space on the Blender matrix.
+    """
+    mat = SPACE_MATRIX.inverted_safe().transposed()
 
-    return all_bone_keyframes
+    return [i for vector in mat for i in vector]
 
 
 def swap_coord_space(data):
@@ -684,7 +748,7 @@ def create_locator(PDX_locator, PDX_bone_dict):
 
     # check for a parent relationship
     parent = getattr(PDX_locator, 'pa', None)
-    parent_Xform = Matrix()
+    parent_inverse = Matrix()
 
     if parent is not None:
         # parent the locator to a bone in the armature
@@ -695,17 +759,10 @@ def create_locator(PDX_locator, PDX_bone_dict):
             new_loc.parent_type = 'BONE'
             new_loc.matrix_world = Matrix()  # reset transform after parenting
 
-        # then determine the locators transform
+        # then determine the locators transform, note we transpose the matrix on creation
         transform = PDX_bone_dict[parent[0]]
-        # note we transpose the matrix on creation
-        parent_Xform = Matrix(
-            (
-                (transform[0], transform[3], transform[6], transform[9]),
-                (transform[1], transform[4], transform[7], transform[10]),
-                (transform[2], transform[5], transform[8], transform[11]),
-                (0.0, 0.0, 0.0, 1.0),
-            )
-        )
+        parent_inverse = pdx_math.invert_matrices(pdx_math.tx_to_matrices([transform]))[0]
+        parent_inverse = Matrix(pdx_math.pack(parent_inverse, 4)).transposed()
 
     # compose transform parts
     _scale = Matrix.Scale(1, 4)
@@ -716,20 +773,25 @@ def create_locator(PDX_locator, PDX_bone_dict):
 
     loc_matrix = _translation @ _rotation @ _scale
 
-    # apply parent transform (must be multiplied in transposed form, then re-transposed before being applied)
-    final_matrix = (loc_matrix.transposed() @ parent_Xform.inverted_safe().transposed()).transposed()
+    # apply parent transform
+    final_matrix = parent_inverse @ loc_matrix
 
     new_loc.matrix_world = swap_coord_space(final_matrix)  # convert to Blender space
     new_loc.rotation_mode = 'XYZ'
 
-    bpy.context.view_layer.update()
-
     return new_loc
 
 
 def create_skeleton(PDX_bone_list, convert_bonespace=False):
     # keep track of bones as we create them
     bone_list = [None for _ in range(0, len(PDX_bone_list))]
+    skeleton = pdx_skeleton.PDXSkeleton.from_pdx_bones(PDX_bone_list)
+
+    # rescale transforms so we always import bones at 1.0 scale, then get the bind pose and convert to Blender space
+    safe_skeleton = pdx_skeleton.PDXSkeleton(
+        skeleton.names, skeleton.parents, pdx_math.remove_tx_scale(skeleton.transforms)
+    )
+    bone_matrices = pdx_math.convert_space(safe_skeleton.get_bind_matrices()[0], get_space_matrix())
 
     # check this skeleton is not already built in the scene
     matching_rigs = [get_rig_from_bone_name(clean_imported_name(bone.name)) for bone in PDX_bone_list]
@@ -755,7 +817,6 @@ def create_skeleton(PDX_bone_list, convert_bonespace=False):
     bpy.ops.object.mode_set(mode='EDIT')
     for bone in PDX_bone_list:
         index = bone.ix[0]
-        transform = bone.tx
         parent = getattr(bone, 'pa', None)
 
         # determine unique bone name
@@ -773,49 +834,25 @@ def create_skeleton(PDX_bone_list, convert_bonespace=False):
             new_bone.parent = parent_bone
             new_bone.use_connect = False
 
-        # determine bone head transform
-        mat = Matrix(
-            (
-                (transform[0], transform[3], transform[6], transform[9]),
-                (transform[1], transform[4], transform[7], transform[10]),
-                (transform[2], transform[5], transform[8], transform[11]),
-                (0.0, 0.0, 0.0, 1.0),
-            )
-        )
-        # rescale or recompose matrix so we always import bones at 1.0 scale
-        loc, rot, scale = mat.decompose()
-        try:
-            safemat = Matrix.Scale(1.0 / scale[0], 4) @ mat
-        except ZeroDivisionError:  # guard against zero scale bones...
-            safemat = Matrix.Translation(loc) @ rot.to_matrix().to_4x4() @ Matrix.Scale(1.0, 4)
-
         # determine avg distance to any children
-        bone_children = [b for b in PDX_bone_list if getattr(b, 'pa', [None]) == bone.ix]
+        head = safe_transforms[index][9:12]
         bone_dists = []
-        for child in bone_children:
-            child_transform = child.tx
-            c_mat = Matrix(
-                (
-                    (child_transform[0], child_transform[3], child_transform[6], child_transform[9]),
-                    (child_transform[1], child_transform[4], child_transform[7], child_transform[10]),
-                    (child_transform[2], child_transform[5], child_transform[8], child_transform[11]),
-                    (0.0, 0.0, 0.0, 1.0),
-                )
-            )
-            c_dist = c_mat.to_translation() - safemat.to_translation()
-            bone_dists.append(math.sqrt(c_dist.x ** 2 + c_dist.y ** 2 + c_dist.z ** 2))
+        for child in skeleton.children[index]:
+            child_head = skeleton.transforms[child][9:12]
+            bone_dists.append(math.sqrt(sum((c - h) ** 2 for c, h in zip(child_head, head))))
 
         avg_dist = 5.0
-        if bone_children:
+        if bone_dists:
             avg_dist = sum(bone_dists) / len(bone_dists)
         avg_dist = min(max(1.0, avg_dist), 10.0) * 0.05
 
         # set bone tail offset first
         new_bone.tail = Vector((0.0, 0.0, avg_dist))
         # set matrix directly as this includes bone roll/rotation
-        new_bone.matrix = swap_coord_space(safemat.inverted_safe())  # convert to Blender space
+        mat = Matrix(pdx_math.pack(bone_matrices[index], 4)).transposed()
         if convert_bonespace:
-            new_bone.matrix = swap_coord_space(safemat.inverted_safe()) @ BONESPACE_MATRIX  # convert to Blender space
+            mat = mat @ BONESPACE_MATRIX
+        new_bone.matrix = mat
 
     # set or correct some bone settings based on hierarchy
     for bone in bone_list:
@@ -826,6 +863,7 @@ def create_skeleton(PDX_bone_list, convert_bonespace=False):
 
     bpy.ops.object.mode_set(mode='OBJECT')
     bpy.context.view_layer.update()
+    clear_rig_index()
 
     return new_rig
 
@@ -834,39 +872,27 @@ def create_skin(PDX_skin, PDX_bones, obj, rig, max_infs=None):
     if max_infs is None:
         max_infs = PDX_MAXSKININFS
 
-    # create dictionary of skinning info per bone
-    skin_dict = dict()
-
     num_infs = PDX_skin.bones[0]
     armt_bones = rig.data.bones
 
-    for vtx in range(0, int(len(PDX_skin.ix) / max_infs)):
-        skin_dict[vtx] = dict(joints=[], weights=[])
+    # normalise joint weights, for all vertices at once
+    weights = pdx_math.normalize_weights(PDX_skin.w, max_infs, count=num_infs)
 
-    # gather joint index and weighting that each vertex is skinned to
-    for vtx, j in enumerate(range(0, len(PDX_skin.ix), max_infs)):
-        skin_dict[vtx]['joints'] = PDX_skin.ix[j : j + num_infs]
-        skin_dict[vtx]['weights'] = PDX_skin.w[j : j + num_infs]
+    # bucket vertices skinned to the same joint with the same weight, stripping zero weight entries
+    skin_buckets = defaultdict(list)
+    for k in range(num_infs):
+        for vtx, (j, w) in enumerate(zip(PDX_skin.ix[k::max_infs], weights[k::max_infs])):
+            if j >= 0 and w != 0.0:
+                skin_buckets[(j, w)].append(vtx)
 
     # create skin weight vertex groups
     for bone in armt_bones:
         obj.vertex_groups.new(name=bone.name)
 
-    # set all skin weights
-    for v in range(len(skin_dict.keys())):
-        joints = [PDX_bones[j].name for j in skin_dict[v]['joints']]
-        weights = skin_dict[v]['weights']
-        # normalise joint weights
-        try:
-            norm_weights = [float(w) / sum(weights) for w in weights]
-        except Exception as err:
-            norm_weights = weights
-            IO_PDX_LOG.error(err)
-        # strip zero weight entries
-        joint_weights = [(j, w) for j, w in zip(joints, norm_weights) if w != 0.0]
-
-        for joint, weight in joint_weights:
-            obj.vertex_groups[clean_imported_name(joint)].add([v], weight, 'REPLACE')
+    # set all skin weights, one call per bucket of vertices
+    group_names = {j: clean_imported_name(PDX_bones[j].name) for j, _ in skin_buckets}
+    for (j, weight), vertices in skin_buckets.items():
+        obj.vertex_groups[group_names[j]].add(vertices, weight, 'REPLACE')
 
     # create an armature modifier for the mesh object
     skin_mod = obj.modifiers.new(rig.name + '_skin', 'ARMATURE')
@@ -997,8 +1023,39 @@ def create_fcurve(armature, bone_name, data_type, index):
     return f_curve
 
 
+def set_fcurve_keys(f_curve, frames, values):
+    """
+        Writes keyframes to an fcurve in bulk, replacing any existing keyframes within the range of frames. Keyframes
+        outside the range are left untouched, keeping their interpolation and handles.
+    """
+    keyframes = f_curve.keyframe_points
+    first, last = min(frames), max(frames)
+
+    # remove existing keyframes in the imported range, from the end so indices stay valid
+    existing = [0.0] * (len(keyframes) * 2)
+    keyframes.foreach_get('co', existing)
+    for index in reversed(range(len(keyframes))):
+        if first <= existing[index * 2] <= last:
+            keyframes.remove(keyframes[index], fast=True)
+
+    # append the new keyframes, then set all coordinates in one call, only the appended ones change
+    count = len(keyframes)
+    keyframes.add(len(frames))
+    coords = [0.0] * (len(keyframes) * 2)
+    keyframes.foreach_get('co', coords)
+    coords[count * 2 :] = pdx_math.flatten(zip(frames, values))
+    keyframes.foreach_set('co', coords)
+    f_curve.update()
+
+
 def create_anim_keys(armature, bone_name, key_dict, timestart, pose):
+    """
+        Keys the local transform of a bone on every frame of the sample data. Local transforms are calculated directly
+        from the samples and the bones rest transform, so the scene is never evaluated per frame.
+        The pose dictionary holds each bones initial parent-relative transform, which provides any unkeyed attributes.
+    """
     pose_bone = armature.pose.bones[bone_name]
+    edit_bone = pose_bone.bone
 
     # validate keyframe counts per attribute
     duration = list(set(len(keyframes) for keyframes in key_dict.values()))
@@ -1009,28 +1066,23 @@ def create_anim_keys(armature, bone_name, key_dict, timestart, pose):
     # calculate start and end frames
     timestart = int(timestart)
     timeend = timestart + duration
+    frames = list(range(timestart, timeend))
 
-    # build a matrix describing the transform from parent bone in the initial pose
-    pose_bone_initial = pose[bone_name]
-    parent_initial = Matrix()
-    if pose_bone.parent:
-        parent_initial = pose[pose_bone.parent.name]
+    # the bones rest transform relative to its parent, inverted to convert parent-relative offsets to local transforms
+    rest_matrix = edit_bone.matrix_local
+    if edit_bone.parent:
+        rest_matrix = edit_bone.parent.matrix_local.inverted_safe() @ rest_matrix
+    rest_inverse = rest_matrix.inverted_safe()
 
-    parent_to_pose = parent_initial.inverted_safe() @ pose_bone_initial
-    # decompose (so we can over write with animated components)
+    # decompose the initial pose (so we can over write with animated components)
+    parent_to_pose = pose[bone_name]
     _scale = Matrix.Scale(parent_to_pose.to_scale()[0], 4)
     _rotation = parent_to_pose.to_quaternion().to_matrix().to_4x4()
     _translation = Matrix.Translation(parent_to_pose.to_translation())
 
-    # set transform per frame and insert keys on data channels
-    for k, frame in enumerate(range(timestart, timeend)):
-        bpy.context.scene.frame_set(frame)
-
-        # determine if we have a parent matrix
-        parent_world = Matrix()
-        if pose_bone.parent:
-            parent_world = pose_bone.parent.matrix
-
+    # calculate local transform per frame
+    key_values = {'s': [], 'q': [], 't': []}
+    for k in range(duration):
         # over-ride initial pose offset based on keyed attributes
         if 's' in key_dict:
             _scale = Matrix.Scale(key_dict['s'][k][0], 4)
@@ -1048,19 +1100,19 @@ def create_anim_keys(armature, bone_name, key_dict, timestart, pose):
             _translation = Matrix.Translation(key_dict['t'][k])
             _translation = swap_coord_space(_translation)  # convert to Blender space
 
-        # recompose
+        # recompose, then remove the rest transform
         offset_matrix = _translation @ _rotation @ _scale
+        loc, rot, scale = (rest_inverse @ offset_matrix).decompose()
+        key_values['t'].append(loc)
+        key_values['q'].append(rot)
+        key_values['s'].append(scale)
 
-        # apply offset matrix
-        pose_bone.matrix = parent_world @ offset_matrix
-
-        # set keyframes on the new transform
-        if 's' in key_dict:
-            pose_bone.keyframe_insert(data_path="scale", index=-1)
-        if 'q' in key_dict:
-            pose_bone.keyframe_insert(data_path="rotation_quaternion", index=-1)
-        if 't' in key_dict:
-            pose_bone.keyframe_insert(data_path="location", index=-1)
+    # set keyframes on the keyed data channels
+    for sample_type, data_path, size in [('s', 'scale', 3), ('q', 'rotation_quaternion', 4), ('t', 'location', 3)]:
+        if sample_type in key_dict:
+            for index in range(size):
+                f_curve = create_fcurve(armature, bone_name, data_path, index)
+                set_fcurve_keys(f_curve, frames, [value[index] for value in key_values[sample_type]])
 
 
 """ ====================================================================================================================
@@ -1075,6 +1127,7 @@ def import_meshfile(meshpath, imp_mesh=True, imp_skel=True, imp_locs=True, bones
 
     # read the file into an XML structure
     asset_elem = pdx_data.read_meshfile(meshpath)
+    clear_rig_index()
 
     # find shapes and locators
     shapes = asset_elem.find('object')
@@ -1132,12 +1185,14 @@ def import_meshfile(meshpath, imp_mesh=True, imp_skel=True, imp_locs=True, bones
         for loc in locators:
             pdx_locator = pdx_data.PDXData(loc)
             obj = create_locator(pdx_locator, scene_bone_dict)
+        # evaluate all new locator transforms in a single update
+        bpy.context.view_layer.update()
 
     bpy.ops.object.select_all(action='DESELECT')
     IO_PDX_LOG.info("import finished! ({0:.4f} sec)".format(time.time() - start))
 
 
-def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge_verts=True):
+def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge_verts=True, lodperc=None):
     start = time.time()
     IO_PDX_LOG.info("exporting {0}".format(meshpath))
 
@@ -1148,6 +1203,10 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
     # create root element for objects
     object_xml = Xml.SubElement(root_xml, 'object')
 
+    # set LOD switches, as a percentage size of the objects bounding sphere
+    if lodperc:
+        object_xml.set('lodperc', pdx_math.get_lod_switches(lodperc))
+
     # populate object data
     blender_meshobjs = list_scene_pdx_meshes()
     # sort meshes for export by index
@@ -1163,6 +1222,11 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
         # one object can have multiple materials on a per face basis
         materials = list(obj.data.materials)
 
+        # gather skin data for all vertices once, this is sliced per material below
+        skin_weights = None
+        if exp_skel:
+            skin_weights = get_mesh_skin_weights(obj, PDX_MINSKINWEIGHT, PDX_DECIMALPTS)
+
         if exp_mesh and materials:
             for mat_idx, blender_mat in enumerate(materials):
                 # create parent element for this mesh (mesh here being faces sharing a material, within one object)
@@ -1173,7 +1237,7 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
                 mesh_info_dict, vert_ids = get_mesh_info(obj, mat_idx, not merge_verts, False)
 
                 # populate mesh attributes
-                for key in ['p', 'n', 'ta', 'u0', 'u1', 'u2', 'u3', 'tri']:
+                for key in ['p', 'n', 'ta', 'u0', 'u1', 'u2', 'u3', 'tri', 'boundingsphere']:
                     if key in mesh_info_dict and mesh_info_dict[key]:
                         meshnode_xml.set(key, mesh_info_dict[key])
 
@@ -1193,7 +1257,7 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
                     materialnode_xml.set(slot, [os.path.split(texture)[1]])
 
                 # create parent element for skin data, if the mesh is skinned
-                skin_info_dict = get_mesh_skin_info(obj, vert_ids)
+                skin_info_dict = get_mesh_skin_info(obj, vert_ids, skin_weights) if skin_weights else None
                 if exp_skel and skin_info_dict:
                     IO_PDX_LOG.info("writing skinning data -")
                     skinnode_xml = Xml.SubElement(meshnode_xml, 'skin')
@@ -1246,20 +1310,7 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
     IO_PDX_LOG.info("export finished! ({0:.4f} sec)".format(time.time() - start))
 
 
-def import_animfile(animpath, timestart=1):
-    start = time.time()
-    IO_PDX_LOG.info("importing {0}".format(animpath))
-
-    # read the file into an XML structure
-    asset_elem = pdx_data.read_meshfile(animpath)
-
-    # find animation info and samples
-    info = asset_elem.find('info')
-    samples = asset_elem.find('samples')
-    framecount = info.attrib['sa'][0]
-
-    # set scene animation and playback settings
-    fps = int(info.attrib['fps'][0])
+def set_animation_fps(fps):
     IO_PDX_LOG.info("setting playback speed - {0}".format(fps))
     try:
         bpy.context.scene.render.fps = fps
@@ -1268,19 +1319,19 @@ def import_animfile(animpath, timestart=1):
         raise RuntimeError("Unsupported animation speed. {0}".format(fps))
     bpy.context.scene.render.fps_base = 1.0
 
-    IO_PDX_LOG.info("setting playback range - ({0},{1})".format(timestart, (timestart + framecount - 1)))
-    bpy.context.scene.frame_start = timestart
-    bpy.context.scene.frame_end = timestart + framecount - 1
-    bpy.context.scene.frame_set(timestart)
 
-    # find armature and bones being animated in the scene
-    IO_PDX_LOG.info("finding armature and bones -")
-    matching_rigs = [get_rig_from_bone_name(clean_imported_name(bone.tag)) for bone in info]
+def get_rig_from_bone_names(bone_names):
+    # find the unique armature in the scene with these bones
+    clear_rig_index()
+    matching_rigs = [get_rig_from_bone_name(clean_imported_name(bone_name)) for bone_name in bone_names]
     matching_rigs = list(set(rig for rig in matching_rigs if rig))
     if len(matching_rigs) != 1:
         raise RuntimeError("Missing unique armature required for animation: {0}".format(matching_rigs))
-    rig = matching_rigs[0]
 
+    return matching_rigs[0]
+
+
+def clear_pose(rig):
     # clear any current pose before attempting to load the animation
     bpy.context.view_layer.objects.active = rig
     bpy.ops.object.mode_set(mode='POSE')
@@ -1288,6 +1339,11 @@ def import_animfile(animpath, timestart=1):
     bpy.ops.pose.transforms_clear()
     bpy.ops.object.mode_set(mode='OBJECT')
 
+
+def set_animation_keys(rig, info, samples, timestart):
+    """
+        Keys the initial pose and all sample data of an animation onto the armatures current action, from timestart.
+    """
     # check armature has all required bones
     bone_errors = []
     initial_pose = dict()
@@ -1316,49 +1372,29 @@ def import_animfile(animpath, timestart=1):
 
             # this matrix describes the transform from parent bone in the initial starting pose
             offset_matrix = swap_coord_space(_translation @ _rotation @ _scale)  # convert to Blender space
-            # determine if we have a parent matrix
-            parent_matrix = Matrix()
+            # determine the bones rest transform relative to its parent
+            rest_matrix = edit_bone.matrix_local
             if edit_bone.parent:
-                parent_matrix = edit_bone.parent.matrix_local
+                rest_matrix = edit_bone.parent.matrix_local.inverted_safe() @ rest_matrix
 
-            # apply transform and set initial pose keyframe (not all bones in this initial pose will be animated)
-            pose_bone.matrix = (offset_matrix.transposed() @ parent_matrix.transposed()).transposed()
-            pose_bone.keyframe_insert(data_path="scale", index=-1, group=bone_name)
-            pose_bone.keyframe_insert(data_path="rotation_quaternion", index=-1, group=bone_name)
-            pose_bone.keyframe_insert(data_path="location", index=-1, group=bone_name)
+            # apply local transform and set initial pose keyframe (not all bones in this initial pose will be animated)
+            pose_bone.matrix_basis = rest_matrix.inverted_safe() @ offset_matrix
+            pose_bone.keyframe_insert(data_path="scale", index=-1, frame=timestart, group=bone_name)
+            pose_bone.keyframe_insert(data_path="rotation_quaternion", index=-1, frame=timestart, group=bone_name)
+            pose_bone.keyframe_insert(data_path="location", index=-1, frame=timestart, group=bone_name)
 
             # record the initial pose as the basis for subsequent keyframes
-            initial_pose[bone_name] = pose_bone.matrix
+            initial_pose[bone_name] = offset_matrix
 
     # break on bone errors
     if bone_errors:
         raise RuntimeError("Missing bones required for animation: {0}".format(bone_errors))
 
-    # check which transform types are animated on each bone
-    all_bone_keyframes = OrderedDict()
-    for bone in info:
-        bone_name = clean_imported_name(bone.tag)
-        key_data = dict()
-        all_bone_keyframes[bone_name] = key_data
-
-        for sample_type in bone.attrib['sa'][0]:
-            key_data[sample_type] = []
-
-    # then traverse the samples data to store keys per bone
-    s_index, q_index, t_index = 0, 0, 0
-    for _ in range(0, framecount):
-        for bone_name in all_bone_keyframes:
-            bone_key_data = all_bone_keyframes[bone_name]
-
-            if 's' in bone_key_data:
-                bone_key_data['s'].append(samples.attrib['s'][s_index : s_index + 1])
-                s_index += 1
-            if 'q' in bone_key_data:
-                bone_key_data['q'].append(samples.attrib['q'][q_index : q_index + 4])
-                q_index += 4
-            if 't' in bone_key_data:
-                bone_key_data['t'].append(samples.attrib['t'][t_index : t_index + 3])
-                t_index += 3
+    # read the samples data into keys per bone
+    all_bone_keyframes = OrderedDict(
+        (clean_imported_name(bone_name), bone_keys)
+        for bone_name, bone_keys in pdx_anim.get_animation_keys(info, samples).items()
+    )
 
     for bone_name in all_bone_keyframes:
         bone_keys = all_bone_keyframes[bone_name]
@@ -1367,6 +1403,34 @@ def import_animfile(animpath, timestart=1):
             IO_PDX_LOG.info("setting {0} keyframes on bone '{1}'".format(list(bone_keys.keys()), bone_name))
             create_anim_keys(rig, bone_name, bone_keys, timestart, initial_pose)
 
+
+def import_animfile(animpath, timestart=1):
+    start = time.time()
+    IO_PDX_LOG.info("importing {0}".format(animpath))
+
+    # read the file into an XML structure
+    asset_elem = pdx_data.read_meshfile(animpath)
+
+    # find animation info and samples
+    info = asset_elem.find('info')
+    samples = asset_elem.find('samples')
+    framecount = info.attrib['sa'][0]
+
+    # set scene animation and playback settings
+    set_animation_fps(int(info.attrib['fps'][0]))
+
+    IO_PDX_LOG.info("setting playback range - ({0},{1})".format(timestart, (timestart + framecount - 1)))
+    bpy.context.scene.frame_start = timestart
+    bpy.context.scene.frame_end = timestart + framecount - 1
+    bpy.context.scene.frame_set(timestart)
+
+    # find armature and bones being animated in the scene
+    IO_PDX_LOG.info("finding armature and bones -")
+    rig = get_rig_from_bone_names([bone.tag for bone in info])
+    clear_pose(rig)
+
+    set_animation_keys(rig, info, samples, timestart)
+
     bpy.context.scene.frame_set(timestart)
     bpy.context.view_layer.update()
 
@@ -1374,33 +1438,62 @@ def import_animfile(animpath, timestart=1):
     IO_PDX_LOG.info("import finished! ({0:.4f} sec)".format(time.time() - start))
 
 
-def export_animfile(animpath, timestart=1, timeend=10):
+def import_animfiles(animpaths, timestart=1):
+    """
+        Imports many .anim files onto one armature in a single operation. Each animation is keyed into its own action,
+        and the actions are laid end to end as NLA strips from timestart. Undo is suspended during the import.
+    """
     start = time.time()
-    IO_PDX_LOG.info("exporting {0}".format(animpath))
+    IO_PDX_LOG.info("importing {0} animations".format(len(animpaths)))
 
-    curr_frame = bpy.context.scene.frame_start
-    if timestart != int(timestart) or timeend != int(timeend):
-        raise RuntimeError(
-            "Invalid animation range selected ({0},{1}). Only whole frames are supported.".format(timestart, timeend)
-        )
-    timestart = int(timestart)
-    timeend = int(timeend)
+    # read all files into XML structures
+    anim_data = pdx_anim.read_animfiles(animpaths)
 
-    # create an XML structure to store the object hierarchy
-    root_xml = Xml.Element('File')
-    root_xml.set('pdxasset', [1, 0])
+    # set scene animation settings, all animations must share a speed
+    all_fps = set(int(info.attrib['fps'][0]) for info, _ in anim_data)
+    if len(all_fps) != 1:
+        raise RuntimeError("Animations have mixed speeds, unable to import together. {0}".format(sorted(all_fps)))
+    set_animation_fps(all_fps.pop())
+
+    # find armature and bones being animated in the scene, once for all animations
+    IO_PDX_LOG.info("finding armature and bones -")
+    rig = get_rig_from_bone_names(set(bone.tag for info, _ in anim_data for bone in info))
+    clear_pose(rig)
+    if rig.animation_data is None:
+        rig.animation_data_create()
+    anim_data_block = rig.animation_data
+    nla_track = anim_data_block.nla_tracks.new()
+
+    use_global_undo = bpy.context.preferences.edit.use_global_undo
+    bpy.context.preferences.edit.use_global_undo = False
+    try:
+        clip_start = timestart
+        for animpath, (info, samples) in zip(animpaths, anim_data):
+            animation_name = os.path.split(os.path.splitext(animpath)[0])[1]
+            IO_PDX_LOG.info("importing {0} at frame {1}".format(animation_name, clip_start))
 
-    # create root element for animation info
-    info_xml = Xml.SubElement(root_xml, 'info')
+            # key each animation into a new action, then add it to the NLA
+            anim_data_block.action = bpy.data.actions.new(animation_name)
+            set_animation_keys(rig, info, samples, clip_start)
+            nla_track.strips.new(animation_name, clip_start, anim_data_block.action)
 
-    # fill in animation info and initial pose
-    IO_PDX_LOG.info("writing animation info -")
-    fps = bpy.context.scene.render.fps
-    info_xml.set('fps', [float(fps)])
+            clip_start += info.attrib['sa'][0]
+
+        anim_data_block.action = None
+    finally:
+        bpy.context.preferences.edit.use_global_undo = use_global_undo
+
+    IO_PDX_LOG.info("setting playback range - ({0},{1})".format(timestart, clip_start - 1))
+    bpy.context.scene.frame_start = timestart
+    bpy.context.scene.frame_end = clip_start - 1
+    bpy.context.scene.frame_set(timestart)
+    bpy.context.view_layer.update()
 
-    frame_samples = (timeend + 1) - timestart
-    info_xml.set('sa', [frame_samples])
+    bpy.ops.object.select_all(action='DESELECT')
+    IO_PDX_LOG.info("import finished! ({0:.4f} sec)".format(time.time() - start))
 
+
+def get_animation_rig():
     # find the scene armature with animation property (assume this is unique)
     rig = None
 
@@ -1412,76 +1505,110 @@ def export_animfile(animpath, timestart=1, timeend=10):
     if rig is None:
         raise RuntimeError("Please select a specific armature before exporting.")
 
+    return rig
+
+
+def write_animfiles(rig, anim_ranges, prune_bones=False):
+    """
+        Writes one .anim file per (animpath, start, end) range. The scene is sampled once over every frame used by any
+        range, and each file is then sliced from those samples. Constant channels are not written, and bones without
+        any animated channels are left out entirely when prune_bones is set.
+    """
+    for animpath, timestart, timeend in anim_ranges:
+        if timestart != int(timestart) or timeend != int(timeend):
+            raise RuntimeError(
+                "Invalid animation range selected ({0},{1}). Only whole frames are supported.".format(timestart, timeend)
+            )
+    anim_ranges = [(animpath, int(timestart), int(timeend)) for animpath, timestart, timeend in anim_ranges]
+
+    fps = bpy.context.scene.render.fps
+    ndigits = (PDX_ROUND_TRANS, PDX_ROUND_ROT, PDX_ROUND_SCALE)
+
     # populate bone data, assume that the rig to be exported is selected
     export_bones = get_skeleton_hierarchy(rig)
-    info_xml.set('j', [len(export_bones)])
 
-    # parse the scene animation data
-    all_bone_keyframes = get_scene_animdata(rig, export_bones, timestart, timeend)
+    # parse the scene animation data, once for all ranges and reusing any frames sampled by an earlier export
+    frames = sorted(set(f for _, timestart, timeend in anim_ranges for f in range(timestart, timeend + 1)))
+    frame_index = {f: i for i, f in enumerate(frames)}
+    IO_PDX_LOG.info("sampling {0} frames -".format(len(frames)))
+    bone_poses = get_cached_posedata(rig, export_bones, frames)
+
+    for animpath, timestart, timeend in anim_ranges:
+        IO_PDX_LOG.info("writing {0} -".format(animpath))
+        first, last = frame_index[timestart], frame_index[timeend] + 1
+        clip_poses = OrderedDict((name, poses[first:last]) for name, poses in bone_poses.items())
+        # each clip starts from a positive w, independent of any frames sampled before it for other ranges
+        clip_poses = pdx_anim.clean_pose_rotations(clip_poses)
+
+        all_bone_keyframes = pdx_anim.get_animation_channels(clip_poses, ndigits)
+        pruned_size = pdx_anim.get_pruned_size(clip_poses, all_bone_keyframes)
+        IO_PDX_LOG.info("pruned constant channels, saving {0} bytes".format(pruned_size))
+        if prune_bones:
+            clip_poses, all_bone_keyframes = pdx_anim.prune_static_bones(clip_poses, all_bone_keyframes)
 
-    # for each bone, write sample types and describe the initial offset from parent
-    IO_PDX_LOG.info("writing initial bone transforms -")
-    bpy.context.scene.frame_set(timestart)
-    for bone in export_bones:
-        pose_bone = rig.pose.bones[bone.name]
-        bone_xml = Xml.SubElement(info_xml, pose_bone.name)
-
-        # check sample types
-        sample_types = ''
-        for attr in ['t', 'q', 's']:
-            if attr in all_bone_keyframes[pose_bone.name]:
-                sample_types += attr
-        bone_xml.set('sa', [sample_types])
-
-        # determine if we have a parent matrix
-        parent_matrix = Matrix()
-        if pose_bone.parent:
-            parent_matrix = pose_bone.parent.matrix.copy()
-
-        # calculate the inital pose offset for this bone
-        offset_matrix = parent_matrix.inverted_safe() @ pose_bone.matrix
-        _translation, _rotation, _scale = swap_coord_space(offset_matrix).decompose()  # convert to Game space
-
-        # convert quaternions from wxyz to xyzw
-        _rotation = [list(_rotation)[1], list(_rotation)[2], list(_rotation)[3], list(_rotation)[0]]
-        # animation supports uniform scale only
-        _scale = [_scale[0]]
-
-        # round to required precisions and set attribute
-        bone_xml.set('t', util_round(_translation, PDX_ROUND_TRANS))
-        bone_xml.set('q', util_round(_rotation, PDX_ROUND_ROT))
-        bone_xml.set('s', util_round(_scale, PDX_ROUND_SCALE))
-
-    # create root element for animation keyframe data
-    samples_xml = Xml.SubElement(root_xml, 'samples')
-    IO_PDX_LOG.info("writing keyframes -")
-    for bone_name in all_bone_keyframes:
-        bone_keys = all_bone_keyframes[bone_name]
-        if bone_keys:
-            IO_PDX_LOG.info("writing {0} keyframes for bone '{1}'".format(list(bone_keys.keys()), bone_name))
-
-    # pack all scene animation data into flat keyframe lists
-    t_packed, q_packed, s_packed = [], [], []
-    for i in range(frame_samples):
-        for bone in all_bone_keyframes:
-            if 't' in all_bone_keyframes[bone]:
-                t_packed.extend(all_bone_keyframes[bone]['t'].pop(0))  # TODO : pop first item is slow?
-            if 'q' in all_bone_keyframes[bone]:
-                q_packed.extend(all_bone_keyframes[bone]['q'].pop(0))
-            if 's' in all_bone_keyframes[bone]:
-                s_packed.append(all_bone_keyframes[bone]['s'].pop(0)[0])  # support uniform scale only
-
-    if t_packed:
-        samples_xml.set('t', t_packed)
-    if q_packed:
-        samples_xml.set('q', q_packed)
-    if s_packed:
-        samples_xml.set('s', s_packed)
+        for bone_name in all_bone_keyframes:
+            bone_keys = all_bone_keyframes[bone_name]
+            if bone_keys:
+                IO_PDX_LOG.info("writing {0} keyframes for bone '{1}'".format(list(bone_keys.keys()), bone_name))
 
-    # write the binary file from our XML structure
-    pdx_data.write_animfile(animpath, root_xml)
+        # write the binary file from our XML structure
+        root_xml = pdx_anim.create_anim_xml(fps, clip_poses, all_bone_keyframes, ndigits)
+        pdx_data.write_animfile(animpath, root_xml)
+
+
+def export_animfile(animpath, timestart=1, timeend=10, prune_bones=False):
+    start = time.time()
+    IO_PDX_LOG.info("exporting {0}".format(animpath))
+
+    write_animfiles(get_animation_rig(), [(animpath, timestart, timeend)], prune_bones)
+
+    bpy.ops.object.select_all(action='DESELECT')
+    IO_PDX_LOG.info("export finished! ({0:.4f} sec)".format(time.time() - start))
+
+
+def export_animclips(animdir, clip_names=None, prune_bones=False):
+    """
+        Exports the NLA strips of the active armature, one .anim file per strip named after the strip. Exports all
+        strips unless a list of strip names is given. Each NLA track is soloed in turn while its strips are exported,
+        so strips on other tracks overlapping the same frames are not blended in, and the strips of one track are
+        sampled in a single pass over the scene.
+    """
+    start = time.time()
+    IO_PDX_LOG.info("exporting animation clips to {0}".format(animdir))
+
+    rig = get_animation_rig()
+    anim_clips = [clip for clip in get_animation_clips(rig) if clip_names is None or clip.name in clip_names]
+    if not anim_clips:
+        raise RuntimeError("No NLA strips found to export on armature {0}.".format(rig.name))
+    if rig.animation_data.action:
+        IO_PDX_LOG.warning(
+            "Armature {0} has an active action ({1}) which is blended over all NLA strips.".format(
+                rig.name, rig.animation_data.action.name
+            )
+        )
+
+    nla_tracks = [track for track in rig.animation_data.nla_tracks if not track.mute]
+    solo_tracks = [track for track in rig.animation_data.nla_tracks if track.is_solo]
 
-    bpy.context.scene.frame_set(curr_frame)
+    try:
+        for track in nla_tracks:
+            track_clips = [clip for clip in get_animation_clips(rig, track) if clip in anim_clips]
+            if not track_clips:
+                continue
+
+            # soloing a track changes the evaluated poses, so any cached samples are no longer valid
+            track.is_solo = True
+            POSE_CACHE.clear()
+
+            anim_ranges = [(os.path.join(animdir, clip.name + '.anim'), clip.start, clip.end) for clip in track_clips]
+            write_animfiles(rig, anim_ranges, prune_bones)
+    finally:
+        # restore the original solo state, only one track can be soloed at a time
+        for track in rig.animation_data.nla_tracks:
+            track.is_solo = False
+        for track in solo_tracks:
+            track.is_solo = True
+        POSE_CACHE.clear()
 
     bpy.ops.object.select_all(action='DESELECT')
     IO_PDX_LOG.info("export finished! ({0:.4f} sec)".format(time.time() - start))
@@ -13,7 +13,7 @@ from textwrap import wrap
 
 import bpy
 from bpy.types import Operator, Panel, UIList
-from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
+from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty, CollectionProperty
 from bpy_extras.io_utils import ImportHelper, ExportHelper
 
 from .. import bl_info, IO_PDX_LOG, IO_PDX_SETTINGS
@@ -25,10 +25,12 @@ try:
     importlib.reload(blender_import_export)
     from .blender_import_export import (
         create_shader,
+        export_animclips,
         export_animfile,
         export_meshfile,
         get_mesh_index,
         import_animfile,
+        import_animfiles,
         import_meshfile,
         list_scene_pdx_meshes,
         PDX_SHADER,
@@ -421,6 +423,15 @@ class IOPDX_OT_import_anim(Operator, ImportHelper):
         name="Import file Path",
         maxlen=1024,
     )
+    # multiple file selection
+    files : CollectionProperty(
+        type=bpy.types.OperatorFileListElement,
+        options={'HIDDEN', 'SKIP_SAVE'},
+    )
+    directory : StringProperty(
+        subtype='DIR_PATH',
+        options={'HIDDEN'},
+    )
 
     # list of operator properties
     int_start : IntProperty(
@@ -435,11 +446,19 @@ class IOPDX_OT_import_anim(Operator, ImportHelper):
         box.prop(self, 'int_start')
 
     def execute(self, context):
+        animpaths = [os.path.join(self.directory, file_elem.name) for file_elem in self.files if file_elem.name]
+
         try:
-            import_animfile(
-                self.filepath,
-                timestart=self.int_start
-            )
+            if len(animpaths) > 1:
+                import_animfiles(
+                    animpaths,
+                    timestart=self.int_start
+                )
+            else:
+                import_animfile(
+                    self.filepath,
+                    timestart=self.int_start
+                )
             self.report({'INFO'}, '[io_pdx_mesh] Finsihed importing {}'.format(self.filepath))
             IO_PDX_SETTINGS.last_import_anim = self.filepath
 
@@ -497,6 +516,12 @@ class IOPDX_OT_export_mesh(Operator, ExportHelper):
         description='Merge vertices',
         default=True,
     )
+    str_lodperc : StringProperty(
+        name='LOD switches',
+        description='LOD switches, the percentage size of the bounding sphere at which each LOD switches to the next. '
+                    'Separate values with commas, eg. 50, 25',
+        default='',
+    )
 
     def draw(self, context):
         box = self.layout.box()
@@ -505,6 +530,7 @@ class IOPDX_OT_export_mesh(Operator, ExportHelper):
         box.prop(self, 'chk_skel')
         box.prop(self, 'chk_locs')
         box.prop(self, 'chk_merge')
+        box.prop(self, 'str_lodperc')
 
     def execute(self, context):
         try:
@@ -513,7 +539,8 @@ class IOPDX_OT_export_mesh(Operator, ExportHelper):
                 exp_mesh=self.chk_mesh,
                 exp_skel=self.chk_skel,
                 exp_locs=self.chk_locs,
-                merge_verts=self.chk_merge
+                merge_verts=self.chk_merge,
+                lodperc=self.str_lodperc.replace(',', ' ').split()
             )
             self.report({'INFO'}, '[io_pdx_mesh] Finsihed exporting {}'.format(self.filepath))
             IO_PDX_SETTINGS.last_export_mesh = self.filepath
@@ -562,6 +589,11 @@ class IOPDX_OT_export_anim(Operator, ExportHelper):
         description='End frame',
         default=100,
     )
+    chk_prune_bones : BoolProperty(
+        name='Prune static bones',
+        description='Leave out bones without any animated channels, these are then held in their bind pose by the game',
+        default=False,
+    )
 
     def draw(self, context):
         settings = context.scene.io_pdx_export
@@ -573,6 +605,7 @@ class IOPDX_OT_export_anim(Operator, ExportHelper):
         col.enabled = settings.custom_range
         col.prop(self, 'int_start')
         col.prop(self, 'int_end')
+        box.prop(self, 'chk_prune_bones')
 
     def execute(self, context):
         settings = context.scene.io_pdx_export
@@ -582,13 +615,15 @@ class IOPDX_OT_export_anim(Operator, ExportHelper):
                 export_animfile(
                     self.filepath,
                     timestart=self.int_start,
-                    timeend=self.int_end
+                    timeend=self.int_end,
+                    prune_bones=self.chk_prune_bones
                 )
             else:
                 export_animfile(
                     self.filepath,
                     timestart=context.scene.frame_start,
-                    timeend=context.scene.frame_end
+                    timeend=context.scene.frame_end,
+                    prune_bones=self.chk_prune_bones
                 )
             self.report({'INFO'}, '[io_pdx_mesh] Finsihed exporting {}'.format(self.filepath))
             IO_PDX_SETTINGS.last_export_anim = self.filepath
@@ -609,6 +644,56 @@ class IOPDX_OT_export_anim(Operator, ExportHelper):
         return {'RUNNING_MODAL'}
 
 
+class IOPDX_OT_export_animclips(Operator):
+    bl_idname = 'io_pdx_mesh.export_animclips'
+    bl_description = bl_label = 'Export PDX animation clips'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    # fileselect_add uses these to pick a directory
+    filter_folder : BoolProperty(
+        default=True,
+        options={'HIDDEN'},
+    )
+    directory : StringProperty(
+        name="Export directory",
+        subtype='DIR_PATH',
+        maxlen=1024,
+    )
+
+    # list of operator properties
+    chk_prune_bones : BoolProperty(
+        name='Prune static bones',
+        description='Leave out bones without any animated channels, these are then held in their bind pose by the game',
+        default=False,
+    )
+
+    def draw(self, context):
+        box = self.layout.box()
+        box.label(text='Settings:', icon='EXPORT')
+        box.label(text='One file per NLA strip of the active armature.')
+        box.prop(self, 'chk_prune_bones')
+
+    def execute(self, context):
+        try:
+            export_animclips(self.directory, prune_bones=self.chk_prune_bones)
+            self.report({'INFO'}, '[io_pdx_mesh] Finsihed exporting {}'.format(self.directory))
+
+        except Exception as err:
+            IO_PDX_LOG.warning("FAILED to export {0}".format(self.directory))
+            IO_PDX_LOG.error(err)
+            self.report({'WARNING'}, 'Animation export failed!')
+            self.report({'ERROR'}, str(err))
+            raise
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        self.directory = os.path.dirname(IO_PDX_SETTINGS.last_export_anim or '')
+        context.window_manager.fileselect_add(self)
+
+        return {'RUNNING_MODAL'}
+
+
 class IOPDX_OT_show_axis(Operator):
     bl_idname = 'io_pdx_mesh.show_axis'
     bl_description = bl_label = 'Show / hide local axis'
@@ -671,6 +756,8 @@ class IOPDX_PT_PDXblender_file(PDXUI, Panel):
         row = self.layout.row(align=True)
         row.operator('io_pdx_mesh.export_mesh', icon='MESH_CUBE', text='Save mesh ...')
         row.operator('io_pdx_mesh.export_anim', icon='RENDER_ANIMATION', text='Save anim ...')
+        row = self.layout.row(align=True)
+        row.operator('io_pdx_mesh.export_animclips', icon='NLA', text='Save NLA strips ...')
 
 
 class IOPDX_PT_PDXblender_tools(PDXUI, Panel):
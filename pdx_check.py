@@ -0,0 +1,202 @@
+"""
+    Paradox asset files, DCC independent skeleton and animation compatibility checks.
+
+    Finds animations that would fail to import onto any skeleton in a library, before an artist hits the import error.
+    Files are only probed for their bone names and counts, all mesh and sample data is skipped over without being read.
+    Usable from the command line, exiting with an error code if any problems are found, eg.
+        python pdx_check.py ./gfx/models/units ./gfx/models/units/anims
+
+    author : ross-g
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import argparse
+import multiprocessing
+from collections import namedtuple
+
+try:
+    from . import pdx_data
+    from .pdx_data import clean_imported_name
+except (ImportError, ValueError):
+    import pdx_data
+    from pdx_data import clean_imported_name
+
+
+""" ====================================================================================================================
+    Variables.
+========================================================================================================================
+"""
+
+# results of checking one animation against a library of skeletons, it fits none of them if meshpaths is empty
+AnimCheck = namedtuple('AnimCheck', ['animpath', 'meshpaths', 'closest_meshpath', 'missing_bones', 'bone_count'])
+
+
+""" ====================================================================================================================
+    Functions.
+========================================================================================================================
+"""
+
+
+def get_mesh_bones(meshpath):
+    """
+        Returns a list of bone names per skeleton in a .mesh file, in file order. Only the file structure is read.
+        Names are cleaned as they are on import, so they match the names of imported scene bones.
+    """
+    asset_elem = pdx_data.read_meshfile(meshpath, properties=[])
+    return [[clean_imported_name(bone.tag) for bone in skeleton] for skeleton in asset_elem.iter('skeleton')]
+
+
+def get_anim_bones(animpath):
+    """
+        Returns the bone count stored in an .anim file, and its bone names in file order. Sample data is not read.
+        Names are cleaned as they are when the animation is imported and matched to scene bones.
+    """
+    info = pdx_data.read_meshfile(animpath, properties=['j']).find('info')
+    return info.attrib['j'][0], [clean_imported_name(bone.tag) for bone in info]
+
+
+def get_bone_index(mesh_bones):
+    """
+        Builds a lookup of bone name to the set of skeletons containing it, from a list of bone names per skeleton.
+    """
+    bone_index = dict()
+    for i, bones in enumerate(mesh_bones):
+        for name in bones:
+            bone_index.setdefault(name, set()).add(i)
+
+    return bone_index
+
+
+def check_animation(anim_bones, mesh_bones, bone_index):
+    """
+        Finds the skeletons, by index, that contain every bone of an animation. If there are none, also returns the
+        closest skeleton and the animation bones it is missing, or None and every bone if there are no skeletons.
+    """
+    skeletons = set(range(len(mesh_bones)))
+    for name in anim_bones:
+        skeletons.intersection_update(bone_index.get(name, ()))
+        if not skeletons:
+            break
+    if skeletons:
+        return sorted(skeletons), None, []
+    if not mesh_bones:
+        return [], None, list(anim_bones)
+
+    # the closest skeleton contains the most bones of the animation
+    counts = [0] * len(mesh_bones)
+    for name in anim_bones:
+        for i in bone_index.get(name, ()):
+            counts[i] += 1
+    closest = max(range(len(mesh_bones)), key=lambda i: counts[i])
+    closest_bones = set(mesh_bones[closest])
+
+    return [], closest, [name for name in anim_bones if name not in closest_bones]
+
+
+def check_library(meshpaths, animpaths, processes=None):
+    """
+        Checks every animation against every skeleton in the given .mesh files, files are probed in parallel.
+        Each skeleton is checked on its own, so an animation fits a .mesh file if it fits any one of its skeletons.
+        Meshes without a skeleton are ignored. Returns an AnimCheck per animation.
+    """
+    pool = multiprocessing.Pool(processes)
+    try:
+        mesh_bones = pool.map(get_mesh_bones, meshpaths, chunksize=16)
+        anim_data = pool.map(get_anim_bones, animpaths, chunksize=16)
+    finally:
+        pool.close()
+        pool.join()
+
+    # one entry per skeleton, mapped back to the .mesh file it came from
+    skeleton_meshpaths, skeleton_bones = [], []
+    for meshpath, skeletons in zip(meshpaths, mesh_bones):
+        for bones in skeletons:
+            if bones:
+                skeleton_meshpaths.append(meshpath)
+                skeleton_bones.append(bones)
+    bone_index = get_bone_index(skeleton_bones)
+
+    results = []
+    for animpath, (bone_count, anim_bones) in zip(animpaths, anim_data):
+        skeletons, closest, missing_bones = check_animation(anim_bones, skeleton_bones, bone_index)
+
+        # list each .mesh file once, even if several of its skeletons fit
+        fit_meshpaths = []
+        for i in skeletons:
+            if skeleton_meshpaths[i] not in fit_meshpaths:
+                fit_meshpaths.append(skeleton_meshpaths[i])
+
+        results.append(
+            AnimCheck(
+                animpath,
+                fit_meshpaths,
+                None if closest is None else skeleton_meshpaths[closest],
+                missing_bones,
+                (bone_count, len(anim_bones)),
+            )
+        )
+
+    return results
+
+
+def find_files(paths, extension):
+    """
+        Returns all files with the extension from a list of files and directories, searching directories recursively.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                found.extend(os.path.join(root, f) for f in files if os.path.splitext(f)[1].lower() == extension)
+        elif os.path.splitext(path)[1].lower() == extension:
+            found.append(path)
+
+    return sorted(found)
+
+
+""" ====================================================================================================================
+    Main.
+========================================================================================================================
+"""
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Check Paradox .anim files are compatible with .mesh skeletons.")
+    parser.add_argument('paths', nargs='+', help=".mesh and .anim files, or directories to search for them")
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(), help="worker process count")
+    parser.add_argument('--verbose', action='store_true', help="also list the skeletons each animation fits")
+    args = parser.parse_args(args)
+
+    meshpaths, animpaths = find_files(args.paths, '.mesh'), find_files(args.paths, '.anim')
+    results = check_library(meshpaths, animpaths, args.processes)
+
+    errors = 0
+    for result in results:
+        animpath, bone_count, num_bones = result.animpath, result.bone_count[0], result.bone_count[1]
+        if bone_count != num_bones:
+            errors += 1
+            print("{0}: bone count mismatch, j is {1} but found {2} bones".format(animpath, bone_count, num_bones))
+
+        if result.closest_meshpath is not None:
+            errors += 1
+            print("{0}: incompatible, closest skeleton {1} is missing bones:".format(animpath, result.closest_meshpath))
+            for name in result.missing_bones:
+                print("    {0}".format(name))
+        elif not result.meshpaths:
+            errors += 1
+            print("{0}: incompatible, no skeletons found to check against".format(animpath))
+        elif args.verbose:
+            print("{0}: fits {1}".format(animpath, ', '.join(result.meshpaths)))
+
+    print("checked {0} animations against {1} meshes, {2} problems".format(len(animpaths), len(meshpaths), errors))
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    """
+       When called from the command line, checks all animations against all skeletons in the given files and folders
+    """
+    sys.exit(main())
@@ -13,6 +13,7 @@ from __future__ import print_function
 import os
 import sys
 import struct
+from array import array
 
 try:
     import xml.etree.cElementTree as Xml
@@ -92,6 +93,22 @@ class PDXData(object):
         return "\n".join(string)
 
 
+""" ====================================================================================================================
+    Helper functions.
+========================================================================================================================
+"""
+
+
+def clean_imported_name(name):
+    # strip any namespace names, taking the final name only
+    clean_name = name.split(':')[-1]
+
+    # replace hierarchy separator character used by Maya in the case of non-unique leaf node names
+    clean_name = clean_name.replace('|', '_')
+
+    return clean_name
+
+
 """ ====================================================================================================================
     Functions for reading and parsing binary data.
 ========================================================================================================================
@@ -209,10 +226,56 @@ def parseData(bdata, pos):
     return datavalues, pos
 
 
-def read_meshfile(filepath):
+def skipProperty(bdata, pos):
+    # starting at '!'
+    pos += 1
+
+    # get length of property name
+    prop_name_length = struct.unpack_from('b', bdata, offset=pos)[0]
+    pos += 1
+
+    # get property name as string
+    prop_name = parseString(bdata, pos, prop_name_length)
+    pos += prop_name_length
+
+    # skip over property data without reading the values
+    pos = skipData(bdata, pos)
+
+    return prop_name, pos
+
+
+def skipData(bdata, pos):
+    # determine the  data type
+    datatype = struct.unpack_from('c', bdata, offset=pos)[0].decode()
+    pos += 1
+
+    # count
+    size = struct.unpack_from('i', bdata, offset=pos)[0]
+    pos += 4
+
+    if datatype in ['i', 'f']:
+        # values are all 4 bytes
+        pos += size * 4
+
+    elif datatype == 's':
+        # string length, we are assuming that we always have a count of 1 string
+        str_data_length = struct.unpack_from('i', bdata, offset=pos)[0]
+        pos += 4 + str_data_length
+
+    else:
+        raise NotImplementedError(
+            "Unknown data type encountered. {} at position {}\n{}".format(datatype, pos, bdata[pos - 10 : pos + 10])
+        )
+
+    return pos
+
+
+def read_meshfile(filepath, properties=None):
     """
         Reads through a .mesh file and gathers all the data into hierarchical element structure.
         The resulting XML is not natively writable to string as it contains Python data types.
+        If a collection of property names is given, only those properties are read and all other data is skipped over,
+        which is much faster when only the structure or a few small properties are needed.
     """
     # read the data
     with open(filepath, 'rb') as fp:
@@ -241,6 +304,13 @@ def read_meshfile(filepath):
     while pos < eof:
         # we have a property
         if struct.unpack_from('c', fdata, offset=pos)[0].decode() == '!':
+            if properties is not None:
+                # check the property name, only reading values if required
+                prop_name, skip_pos = skipProperty(fdata, pos)
+                if prop_name not in properties:
+                    pos = skip_pos
+                    continue
+
             # check the property type and values
             prop_name, prop_values, pos = parseProperty(fdata, pos)
 
@@ -329,6 +399,18 @@ def writeString(string):
 def writeData(data_array):
     datastring = b''
 
+    # typed arrays are written directly from their buffer
+    if isinstance(data_array, array):
+        if data_array.typecode not in ['i', 'f'] or data_array.itemsize != 4:
+            raise NotImplementedError("Unknown array type encountered. {}".format(data_array.typecode))
+
+        datastring += struct.pack('c', str(data_array.typecode).encode())
+        datastring += struct.pack('i', len(data_array))
+        # Py2 arrays have no tobytes
+        datastring += data_array.tobytes() if hasattr(data_array, 'tobytes') else data_array.tostring()
+
+        return datastring
+
     # determine the data type in the array
     types = set([type(d) for d in data_array])
     if len(types) == 1:
@@ -407,6 +489,9 @@ def write_meshfile(filepath, root_xml):
     if object_xml is not None:
         current_depth = 1
         datastring += writeObject(object_xml, current_depth)
+        for prop in ['lodperc']:
+            if object_xml.get(prop) is not None:
+                datastring += writeProperty(prop, object_xml.get(prop))
 
         # write each shape node
         for shape_xml in object_xml:
@@ -421,7 +506,7 @@ def write_meshfile(filepath, root_xml):
                 if child_xml.tag == 'mesh':
                     mesh_xml = child_xml
                     # write mesh properties
-                    for prop in ['p', 'n', 'ta', 'u0', 'u1', 'tri']:
+                    for prop in ['p', 'n', 'ta', 'u0', 'u1', 'tri', 'boundingsphere']:
                         if mesh_xml.get(prop) is not None:
                             datastring += writeProperty(prop, mesh_xml.get(prop))
 
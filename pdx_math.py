@@ -0,0 +1,592 @@
+"""
+    Paradox asset files, DCC independent maths.
+
+    Bulk operations over the flat attribute lists used by the .mesh and .anim formats. Everything here works on whole
+    arrays in as few passes as possible, rather than per element, and only uses the standard library so that the same
+    code can run inside both Maya (Python 2) and Blender (Python 3).
+
+    author : ross-g
+"""
+
+from __future__ import division
+
+import math
+from itertools import repeat
+
+
+""" ====================================================================================================================
+    Quantization.
+========================================================================================================================
+"""
+
+
+def quantize(data, ndigits=0):
+    """
+        Rounds a flat sequence of floats to a given precision in decimal digits, as a single batched operation.
+        This uses the builtin round, so results are bit-identical to rounding each element individually.
+    """
+    if not hasattr(data, '__len__'):
+        data = list(data)
+
+    return list(map(round, data, repeat(ndigits, len(data))))
+
+
+def pack(data, stride):
+    """
+        Groups a flat sequence into tuples of stride elements, eg. [x0, y0, z0, x1, ...] becomes [(x0, y0, z0), ...]
+        Any trailing elements that do not fill a complete tuple are dropped.
+    """
+    return list(zip(*[iter(data)] * stride))
+
+
+def flatten(data):
+    """
+        Inverse of pack, turns a sequence of tuples into a flat list.
+    """
+    return [x for item in data for x in item]
+
+
+def quantize_keys(data, ndigits, stride):
+    """
+        Rounds a flat sequence and packs it into hashable tuples, one per element of stride size.
+        Suitable for use as dictionary keys when welding vertices or testing samples for equality.
+    """
+    return pack(quantize(data, ndigits), stride)
+
+
+def weld(keys, merge=True):
+    """
+        Welds a sequence of hashable keys, eg. quantized vertex attributes, into unique items in order of appearance.
+        Returns the index of the first occurrence of each unique item, and the unique item index of every key.
+        Every key becomes a unique item if merge is False.
+    """
+    unique = dict()
+    first_indices, item_indices = [], []
+
+    for k, key in enumerate(keys):
+        i = unique.get(key) if merge else None
+        if i is None:
+            i = len(first_indices)
+            unique.setdefault(key, i)
+            first_indices.append(k)
+        item_indices.append(i)
+
+    return first_indices, item_indices
+
+
+""" ====================================================================================================================
+    Bounds.
+========================================================================================================================
+"""
+
+
+def get_aabb(positions):
+    """
+        Returns the min and max corners of the axis aligned bounding box around a flat list of 3d positions.
+    """
+    xs, ys, zs = positions[0::3], positions[1::3], positions[2::3]
+
+    return [min(xs), min(ys), min(zs)], [max(xs), max(ys), max(zs)]
+
+
+def get_bounding_sphere(positions):
+    """
+        Returns a bounding sphere [x, y, z, radius] around a flat list of 3d positions.
+        Uses Ritters linear-time approximation, which is then compared against the sphere centred on the AABB and the
+        tighter of the two is returned. Either way the result is guaranteed to contain every position.
+    """
+    points = pack(positions, 3)
+    if not points:
+        return [0.0, 0.0, 0.0, 0.0]
+
+    def dist_sq(a, b):
+        return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+    # find an approximately most distant pair of points, these seed the initial sphere
+    p0 = points[0]
+    p1 = max(points, key=lambda p: dist_sq(p, p0))
+    p2 = max(points, key=lambda p: dist_sq(p, p1))
+    cx, cy, cz = (p1[0] + p2[0]) * 0.5, (p1[1] + p2[1]) * 0.5, (p1[2] + p2[2]) * 0.5
+    radius = dist_sq(p1, p2) ** 0.5 * 0.5
+    radius_sq = radius * radius
+
+    # grow the sphere to enclose any points still outside it
+    for p in points:
+        d_sq = (p[0] - cx) ** 2 + (p[1] - cy) ** 2 + (p[2] - cz) ** 2
+        if d_sq > radius_sq:
+            d = d_sq ** 0.5
+            new_radius = (radius + d) * 0.5
+            k = (new_radius - radius) / d
+            cx, cy, cz = cx + (p[0] - cx) * k, cy + (p[1] - cy) * k, cz + (p[2] - cz) * k
+            radius, radius_sq = new_radius, new_radius * new_radius
+
+    # the sphere around the AABB centre is occasionally tighter, eg for long thin meshes
+    bb_min, bb_max = get_aabb(positions)
+    centre = [(lo + hi) * 0.5 for lo, hi in zip(bb_min, bb_max)]
+    aabb_radius = max(dist_sq(p, centre) for p in points) ** 0.5
+
+    if aabb_radius < radius:
+        return centre + [aabb_radius]
+    return [cx, cy, cz, radius]
+
+
+def get_bounds(positions):
+    """
+        Returns a dictionary of bounds information for a mesh, from a flat list of 3d positions.
+    """
+    bb_min, bb_max = get_aabb(positions)
+
+    return {'min': bb_min, 'max': bb_max, 'boundingsphere': get_bounding_sphere(positions)}
+
+
+def get_lod_switches(lodperc):
+    """
+        Validates a list of LOD switch values, each given as the percentage size of the objects bounding sphere at which
+        the engine switches to the next LOD. Values are returned as floats, in the order given (from LOD 0 to LOD N).
+    """
+    switches = [float(x) for x in lodperc]
+    if any(x <= 0.0 for x in switches):
+        raise ValueError("LOD switch values must be greater than zero. {0}".format(switches))
+
+    return switches
+
+
+def gather(data, stride, indices):
+    """
+        Selects elements of stride size from a flat sequence by index, returning a new flat list.
+        eg. slicing per-vertex data down to the verts referenced by one material, in their export order.
+    """
+    packed = pack(data, stride)
+
+    return [x for i in indices for x in packed[i]]
+
+
+""" ====================================================================================================================
+    Skinning.
+========================================================================================================================
+"""
+
+
+def get_sparse_influences(weights, num_influences, influence_map=None):
+    """
+        Converts a dense, flat (vertices x num_influences) weight matrix into a sparse one, a list per vertex of
+        (influence index, weight) pairs for all non-zero weights, in influence order.
+        An optional influence_map remaps matrix columns to output indices, eg. skin cluster influences to bone indices.
+    """
+    columns = range(num_influences) if influence_map is None else influence_map
+    sparse = [[(j, weight) for j, weight in zip(columns, row) if weight != 0.0] for row in pack(weights, num_influences)]
+
+    if influence_map is not None:
+        sparse = [sorted(influences) for influences in sparse]
+
+    return sparse
+
+
+def limit_influences(influences, max_influences, prune_threshold=0.0, ndigits=None):
+    """
+        Limits a sparse skin weight matrix, a list per vertex of (influence index, weight) pairs, to a fixed number of
+        influences per vertex. Weights at or below the prune threshold are removed, then only the largest weights are
+        kept. Any vertex that lost weights is renormalized, then all weights are optionally quantized.
+        Returns flat lists of influence indices and weights (max_influences per vertex, padded with -1 and 0.0) and a
+        report dictionary with the count of changed vertices and the maximum error introduced into any single weight.
+    """
+    ix, w = [], []
+    padding = [(-1, 0.0)] * max_influences
+    report = {'vertices': len(influences), 'limited': 0, 'max_error': 0.0}
+
+    for vert_influences in influences:
+        nonzero = [(j, weight) for j, weight in vert_influences if weight != 0.0]
+        kept = [(j, weight) for j, weight in nonzero if weight > prune_threshold]
+        if nonzero and not kept:
+            kept = [max(nonzero, key=lambda x: x[1])]  # never prune a vertex down to no influences at all
+
+        # keep the largest weights, preserving influence order
+        if len(kept) > max_influences:
+            largest = sorted(range(len(kept)), key=lambda k: kept[k][1], reverse=True)[:max_influences]
+            kept = [kept[k] for k in sorted(largest)]
+
+        changed = len(kept) != len(nonzero)
+        if changed:
+            report['limited'] += 1
+            total = sum(weight for _, weight in kept)
+            if total > 0.0:
+                kept = [(j, weight / total) for j, weight in kept]
+
+        if ndigits is not None:
+            kept = [(j, round(weight, ndigits)) for j, weight in kept]
+
+        # measure error against the original weights, normalized
+        if changed or ndigits is not None:
+            original_total = sum(weight for _, weight in nonzero) or 1.0
+            final = dict(kept)
+            for j, weight in nonzero:
+                error = abs(final.get(j, 0.0) - weight / original_total) if changed else abs(final[j] - weight)
+                if error > report['max_error']:
+                    report['max_error'] = error
+
+        kept.extend(padding[len(kept):])
+        for j, weight in kept:
+            ix.append(j)
+            w.append(weight)
+
+    return ix, w, report
+
+
+def normalize_weights(w, stride, count=None):
+    """
+        Normalizes flat per-vertex weights, stride entries per vertex, so each vertex sums to one. Only the first count
+        entries per vertex are considered if given. Vertices with zero total weight are left unchanged.
+    """
+    count = stride if count is None else count
+    totals = [sum(row[:count]) for row in pack(w, stride)]
+
+    normalized = list(w)
+    for k in range(count):
+        normalized[k::stride] = [weight / total if total else weight for weight, total in zip(w[k::stride], totals)]
+
+    return normalized
+
+
+def scatter_weights(ix, w, stride, num_columns, count=None):
+    """
+        Scatters per-vertex influence indices and weights, stride entries per vertex, into a dense, flat
+        (vertices x num_columns) weight matrix. Only the first count entries per vertex are used if given.
+        Null influences (-1) or indices outside the matrix are skipped, repeated indices accumulate their weights.
+    """
+    count = stride if count is None else count
+    num_verts = len(ix) // stride
+    matrix = [0.0] * (num_verts * num_columns)
+
+    for k in range(count):
+        for row, j, weight in zip(range(0, len(matrix), num_columns), ix[k::stride], w[k::stride]):
+            if 0 <= j < num_columns:
+                matrix[row + j] += weight
+
+    return matrix
+
+
+""" ====================================================================================================================
+    Matrices.
+
+    Matrices are flat lists of 16 floats in row-major order, using the row-vector convention (as Maya does) so the
+    translation is stored in elements [12:15]. Blender matrices must be transposed to match.
+========================================================================================================================
+"""
+
+
+def tx_to_matrices(transforms):
+    """
+        Converts a list of 12 float (4 rows x 3 columns) transforms, as used by .mesh bones, to a list of matrices.
+    """
+    # fmt: off
+    return [
+        [tx[0], tx[1], tx[2], 0.0, tx[3], tx[4], tx[5], 0.0, tx[6], tx[7], tx[8], 0.0, tx[9], tx[10], tx[11], 1.0]
+        for tx in transforms
+    ]
+    # fmt: on
+
+
+def matrices_to_tx(matrices):
+    """
+        Converts a list of matrices to the 12 float (4 rows x 3 columns) transform layout used by .mesh bones.
+    """
+    return [list(m[0:3]) + list(m[4:7]) + list(m[8:11]) + list(m[12:15]) for m in matrices]
+
+
+def multiply_matrices(matrices_a, matrices_b):
+    """
+        Multiplies two lists of matrices pairwise, A[n] * B[n].
+    """
+    product = []
+
+    for a, b in zip(matrices_a, matrices_b):
+        columns = (b[0::4], b[1::4], b[2::4], b[3::4])
+        product.append(
+            [sum(x * y for x, y in zip(a[r : r + 4], col)) for r in range(0, 16, 4) for col in columns]
+        )
+
+    return product
+
+
+def convert_space(matrices, space_matrix):
+    """
+        Converts a list of matrices into another coordinate space, S * M * S^-1 for each matrix.
+    """
+    space_inverse = invert_matrices([space_matrix])[0]
+    count = len(matrices)
+
+    return multiply_matrices(multiply_matrices([space_matrix] * count, matrices), [space_inverse] * count)
+
+
+def remove_tx_scale(transforms):
+    """
+        Rescales a list of 12 float transforms so the first axis of each has unit length, this is the scale bones are
+        always imported at. Transforms with zero scale are returned unchanged.
+    """
+    rescaled = []
+
+    for tx in transforms:
+        scale = (tx[0] ** 2 + tx[1] ** 2 + tx[2] ** 2) ** 0.5
+        rescaled.append([x / scale for x in tx] if scale else list(tx))
+
+    return rescaled
+
+
+def invert_matrices(matrices):
+    """
+        Inverts a list of affine matrices, the last column of each is assumed to be (0, 0, 0, 1).
+        Singular matrices are treated as having an identity rotation and scale.
+    """
+    inverted = []
+
+    for m in matrices:
+        a, b, c, d, e, f, g, h, i = m[0], m[1], m[2], m[4], m[5], m[6], m[8], m[9], m[10]
+        tx, ty, tz = m[12], m[13], m[14]
+
+        # 3x3 inverse, by cofactors
+        c00, c01, c02 = e * i - f * h, f * g - d * i, d * h - e * g
+        det = a * c00 + b * c01 + c * c02
+        if abs(det) < 1e-12:
+            r = [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+        else:
+            inv_det = 1.0 / det
+            # fmt: off
+            r = [
+                c00 * inv_det, (c * h - b * i) * inv_det, (b * f - c * e) * inv_det,
+                c01 * inv_det, (a * i - c * g) * inv_det, (c * d - a * f) * inv_det,
+                c02 * inv_det, (b * g - a * h) * inv_det, (a * e - b * d) * inv_det,
+            ]
+            # fmt: on
+
+        # inverse translation, in the inverted space
+        itx = -(tx * r[0] + ty * r[3] + tz * r[6])
+        ity = -(tx * r[1] + ty * r[4] + tz * r[7])
+        itz = -(tx * r[2] + ty * r[5] + tz * r[8])
+
+        # fmt: off
+        inverted.append([
+            r[0], r[1], r[2], 0.0,
+            r[3], r[4], r[5], 0.0,
+            r[6], r[7], r[8], 0.0,
+            itx, ity, itz, 1.0
+        ])
+        # fmt: on
+
+    return inverted
+
+
+def decompose_matrices(matrices):
+    """
+        Decomposes a list of affine matrices into lists of translations, rotations as (x, y, z, w) quaternions with a
+        positive w, and per axis scales. A negative determinant flips the sign of every scale axis.
+    """
+    translations, rotations, scales = [], [], []
+
+    for m in matrices:
+        rows = [m[0:3], m[4:7], m[8:11]]
+        scale = [(row[0] * row[0] + row[1] * row[1] + row[2] * row[2]) ** 0.5 for row in rows]
+        det = (
+            rows[0][0] * (rows[1][1] * rows[2][2] - rows[1][2] * rows[2][1])
+            - rows[0][1] * (rows[1][0] * rows[2][2] - rows[1][2] * rows[2][0])
+            + rows[0][2] * (rows[1][0] * rows[2][1] - rows[1][1] * rows[2][0])
+        )
+        if det < 0.0:
+            scale = [-s for s in scale]
+
+        # rotation matrix, indexed as a[i][j] in the column-vector convention
+        r = [[x / s if s else 0.0 for x in row] for row, s in zip(rows, scale)]
+        a00, a01, a02 = r[0][0], r[1][0], r[2][0]
+        a10, a11, a12 = r[0][1], r[1][1], r[2][1]
+        a20, a21, a22 = r[0][2], r[1][2], r[2][2]
+
+        trace = a00 + a11 + a22
+        if trace > 0.0:
+            k = 0.5 / (trace + 1.0) ** 0.5
+            q = [(a21 - a12) * k, (a02 - a20) * k, (a10 - a01) * k, 0.25 / k]
+        elif a00 > a11 and a00 > a22:
+            k = 2.0 * max(1.0 + a00 - a11 - a22, 1e-12) ** 0.5
+            q = [0.25 * k, (a01 + a10) / k, (a02 + a20) / k, (a21 - a12) / k]
+        elif a11 > a22:
+            k = 2.0 * max(1.0 + a11 - a00 - a22, 1e-12) ** 0.5
+            q = [(a01 + a10) / k, 0.25 * k, (a12 + a21) / k, (a02 - a20) / k]
+        else:
+            k = 2.0 * max(1.0 + a22 - a00 - a11, 1e-12) ** 0.5
+            q = [(a02 + a20) / k, (a12 + a21) / k, 0.25 * k, (a10 - a01) / k]
+
+        length = (q[0] * q[0] + q[1] * q[1] + q[2] * q[2] + q[3] * q[3]) ** 0.5
+        if q[3] < 0.0:
+            length = -length
+
+        translations.append(tuple(m[12:15]))
+        rotations.append(tuple(x / length for x in q))
+        scales.append(tuple(scale))
+
+    return translations, rotations, scales
+
+
+def compose_matrices(translations, rotations, scales):
+    """
+        Composes lists of translations, rotations as (x, y, z, w) quaternions and scales into a list of affine matrices,
+        applying scale, then rotation, then translation. Scales are per axis, or a single uniform value.
+    """
+    matrices = quaternions_to_matrices(rotations)
+
+    for m, t, s in zip(matrices, translations, scales):
+        sx, sy, sz = (s[0], s[0], s[0]) if len(s) == 1 else s
+        m[0:3] = [x * sx for x in m[0:3]]
+        m[4:7] = [x * sy for x in m[4:7]]
+        m[8:11] = [x * sz for x in m[8:11]]
+        m[12:15] = t
+
+    return matrices
+
+
+""" ====================================================================================================================
+    Rotations.
+
+    Quaternions are (x, y, z, w) tuples. Euler rotations are (x, y, z) angles in radians, with a rotate order naming the
+    axes in the order they are applied, eg. 'xyz' rotates about X first (as Maya does).
+========================================================================================================================
+"""
+
+
+def normalize_quaternions(quaternions):
+    """
+        Rescales a list of quaternions to unit length. Zero length quaternions are returned as the identity rotation.
+    """
+    normalized = []
+
+    for q in quaternions:
+        length = sum(x * x for x in q) ** 0.5
+        normalized.append(tuple(x / length for x in q) if length else (0.0, 0.0, 0.0, 1.0))
+
+    return normalized
+
+
+def make_quaternions_continuous(quaternions, previous=None):
+    """
+        Flips the sign of quaternions as needed so each is in the same hemisphere as the one before it. A quaternion and
+        its negation describe the same rotation, so this removes sign flips from a channel without changing the pose.
+        The first quaternion is aligned to previous if given, eg. the identity rotation for a positive w.
+    """
+    continuous = []
+
+    for q in quaternions:
+        q = tuple(q)
+        if previous is not None and sum(a * b for a, b in zip(q, previous)) < 0.0:
+            q = tuple(-x for x in q)
+        continuous.append(q)
+        previous = q
+
+    return continuous
+
+
+def quaternions_to_matrices(quaternions):
+    """
+        Converts a list of quaternions to a list of rotation matrices.
+    """
+    matrices = []
+
+    for x, y, z, w in quaternions:
+        xx, yy, zz = x * x, y * y, z * z
+        xy, xz, yz = x * y, x * z, y * z
+        wx, wy, wz = w * x, w * y, w * z
+        # fmt: off
+        matrices.append([
+            1.0 - 2.0 * (yy + zz), 2.0 * (xy + wz), 2.0 * (xz - wy), 0.0,
+            2.0 * (xy - wz), 1.0 - 2.0 * (xx + zz), 2.0 * (yz + wx), 0.0,
+            2.0 * (xz + wy), 2.0 * (yz - wx), 1.0 - 2.0 * (xx + yy), 0.0,
+            0.0, 0.0, 0.0, 1.0
+        ])
+        # fmt: on
+
+    return matrices
+
+
+def matrices_to_eulers(matrices, rotate_order='xyz'):
+    """
+        Converts a list of rotation matrices to a list of Euler rotations in the given rotate order.
+    """
+    i, j, k = ['xyz'.index(axis) for axis in rotate_order.lower()]
+    parity = 1.0 if (i, j, k) in [(0, 1, 2), (1, 2, 0), (2, 0, 1)] else -1.0
+    eulers = []
+
+    for m in matrices:
+        # index as M[row][column] in the column-vector convention
+        def M(row, col):
+            return m[col * 4 + row]
+
+        cos_b = (M(i, i) ** 2 + M(j, i) ** 2) ** 0.5
+        angles = [0.0, 0.0, 0.0]
+        if cos_b > 1e-8:
+            angles[i] = math.atan2(parity * M(k, j), M(k, k))
+            angles[j] = math.atan2(-parity * M(k, i), cos_b)
+            angles[k] = math.atan2(parity * M(j, i), M(i, i))
+        else:
+            # gimbal lock, the first and last rotations share an axis so put all of it on the first
+            angles[i] = math.atan2(-parity * M(j, k), M(j, j))
+            angles[j] = math.atan2(-parity * M(k, i), cos_b)
+        eulers.append(tuple(angles))
+
+    return eulers
+
+
+def filter_eulers(eulers, rotate_order='xyz'):
+    """
+        Makes a list of Euler rotations continuous, choosing the equivalent rotation closest to the previous one on each
+        frame. This removes the flips that come from converting each frame independently.
+    """
+    i, j, k = ['xyz'.index(axis) for axis in rotate_order.lower()]
+    filtered = []
+    previous = None
+
+    def wrap(angle, target):
+        return angle + 2.0 * math.pi * round((target - angle) / (2.0 * math.pi))
+
+    for euler in eulers:
+        if previous is not None:
+            # the same rotation can be described with the middle axis reflected, and the outer axes turned by pi
+            alternate = list(euler)
+            alternate[i] += math.pi
+            alternate[j] = math.pi - alternate[j]
+            alternate[k] += math.pi
+
+            candidates = [[wrap(a, p) for a, p in zip(e, previous)] for e in [euler, alternate]]
+            euler = min(candidates, key=lambda e: sum(abs(a - p) for a, p in zip(e, previous)))
+        previous = tuple(euler)
+        filtered.append(previous)
+
+    return filtered
+
+
+def lerp_vectors(vectors_a, vectors_b, factors):
+    """
+        Linearly interpolates two lists of vectors pairwise, by a list of factors from 0 (A) to 1 (B).
+    """
+    return [tuple(x + (y - x) * f for x, y in zip(a, b)) for a, b, f in zip(vectors_a, vectors_b, factors)]
+
+
+def slerp_quaternions(quaternions_a, quaternions_b, factors):
+    """
+        Spherically interpolates two lists of quaternions pairwise, by a list of factors from 0 (A) to 1 (B). Always
+        takes the shortest path, nearly parallel pairs fall back to a normalized linear interpolation.
+    """
+    interpolated = []
+
+    for a, b, f in zip(quaternions_a, quaternions_b, factors):
+        dot = sum(x * y for x, y in zip(a, b))
+        if dot < 0.0:
+            b, dot = tuple(-y for y in b), -dot
+
+        if dot > 0.9995:
+            wa, wb = 1.0 - f, f
+        else:
+            theta = math.acos(min(dot, 1.0))
+            sin_theta = math.sin(theta)
+            wa, wb = math.sin((1.0 - f) * theta) / sin_theta, math.sin(f * theta) / sin_theta
+
+        q = [x * wa + y * wb for x, y in zip(a, b)]
+        length = sum(x * x for x in q) ** 0.5
+        interpolated.append(tuple(x / length for x in q))
+
+    return interpolated
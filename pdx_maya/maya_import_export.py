@@ -21,9 +21,14 @@ import pymel.core as pmc
 import pymel.core.datatypes as pmdt
 import maya.OpenMaya as OpenMaya  # Maya Python API 1.0
 import maya.OpenMayaAnim as OpenMayaAnim  # Maya Python API 1.0
-from maya.api.OpenMaya import MVector, MMatrix, MTransformationMatrix, MQuaternion  # Maya Python API 2.0
+from maya.api.OpenMaya import MVector, MMatrix, MTransformationMatrix, MQuaternion, MEulerRotation  # Maya Python API 2.0
 
 from .. import pdx_data
+from ..pdx_data import clean_imported_name
+from .. import pdx_anim
+from ..pdx_anim import PDX_ROUND_ROT, PDX_ROUND_TRANS, PDX_ROUND_SCALE
+from .. import pdx_math
+from .. import pdx_skeleton
 from .. import IO_PDX_LOG
 
 # Py2, Py3 compatibility (Maya doesn't yet use Py3, this is purely to stop flake8 complaining)
@@ -43,9 +48,7 @@ PDX_MESHINDEX = 'meshindex'
 PDX_MAXSKININFS = 4
 
 PDX_DECIMALPTS = 5
-PDX_ROUND_ROT = 4
-PDX_ROUND_TRANS = 3
-PDX_ROUND_SCALE = 2
+PDX_MINSKINWEIGHT = 10.0 ** -PDX_DECIMALPTS  # skin weights at or below this are pruned on export
 
 # fmt: off
 SPACE_MATRIX = MMatrix((
@@ -56,9 +59,24 @@ SPACE_MATRIX = MMatrix((
 ))
 # fmt: on
 
+# Maya rotateOrder enum values, as the order axes are applied in
+ROTATE_ORDERS = ['xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx']
+
+# joint attributes keyed by each type of animation sample
+ANIM_ATTRS = OrderedDict([
+    ('s', ['scaleX', 'scaleY', 'scaleZ']),
+    ('q', ['rotateX', 'rotateY', 'rotateZ']),
+    ('t', ['translateX', 'translateY', 'translateZ']),
+])
+
 # simple datatype for animation clips
 AnimClip = namedtuple('AnimClip', ['name', 'start', 'end'])
 
+# sampled animation poses, reused between exports until the bones are dirtied, and the callbacks watching those bones
+# the callback list is kept when the UI reloads this module, so existing callbacks can still be found and removed
+POSE_CACHE = pdx_anim.PDXPoseCache()
+POSE_CACHE_CALLBACKS = globals().get('POSE_CACHE_CALLBACKS', [])
+
 
 """ ====================================================================================================================
     API functions.
@@ -93,38 +111,12 @@ def get_plug(mobject, plug_name):
     return mplug
 
 
-def connect_nodeplugs(source_mobject, source_mplug, dest_mobject, dest_mplug):
-    source_mplug = get_plug(source_mobject, source_mplug)
-    dest_mplug = get_plug(dest_mobject, dest_mplug)
-
-    m_DGMod = OpenMaya.MDGModifier()
-    m_DGMod.connect(source_mplug, dest_mplug)
-    m_DGMod.doIt()
-
-
 """ ====================================================================================================================
     Helper functions.
 ========================================================================================================================
 """
 
 
-def util_round(data, ndigits=0):
-    """
-        Element-wise rounding to a given precision in decimal digits. (reimplementing pmc.util.round for speed)
-    """
-    return tuple(round(x, ndigits) for x in data)
-
-
-def clean_imported_name(name):
-    # strip any namespace names, taking the final name only
-    clean_name = name.split(':')[-1]
-
-    # replace hierarchy separator character used by Maya in the case of non-unique leaf node names
-    clean_name = clean_name.replace('|', '_')
-
-    return clean_name
-
-
 def list_scene_materials():
     return [mat for mat in pmc.ls(materials=True)]
 
@@ -325,11 +317,13 @@ def get_mesh_info(maya_mesh, skip_merge_vertices=False, round_data=False):
         tangents = mesh.getTangents(space='world', uvSet=uv_setnames[0])
 
     # build a blank dictionary of mesh information for the exporter
-    mesh_dict = {x: [] for x in ['p', 'n', 'ta', 'u0', 'u1', 'u2', 'u3', 'tri', 'min', 'max']}
+    mesh_dict = {x: [] for x in ['p', 'n', 'ta', 'u0', 'u1', 'u2', 'u3', 'tri', 'boundingsphere', 'min', 'max']}
 
-    # collect all unique verts in the order that we process them
-    export_verts = []
-    unique_verts = set()
+    # collect the attributes of every tri-vert in the order that we process them, these are rounded in bulk afterwards
+    trivert_ids = []
+    trivert_data = {x: [] for x in ['p', 'n', 'ta', 'bs']}
+    trivert_uvs = [[] for _ in uv_setnames]
+    trivert_refs = []
 
     for face in meshfaces:
         face_id = face.index()
@@ -347,97 +341,87 @@ def get_mesh_info(maya_mesh, skip_merge_vertices=False, round_data=False):
             sorted_indices = [i[0] for i in _sorted]    # track sorting change
             sorted_tri_vert_ids = [i[1] for i in _sorted]
 
-            dict_vert_idx = []
+            # to build the tri-face correctly, we need to use the original unsorted vertex order to reference verts
+            first = len(trivert_ids)
+            trivert_refs.extend(
+                [first + sorted_indices[0], first + sorted_indices[2], first + sorted_indices[1]]
+            )  # convert handedness to Game space
 
             # loop over tri verts
             for vert_id in sorted_tri_vert_ids:
+                trivert_ids.append(vert_id)
                 _local_id = face_vert_ids.index(vert_id)  # face relative vertex index
 
                 # position
-                _position = vertices[vert_id]
-                _position = swap_coord_space(_position)  # convert to Game space
-                if round_data:
-                    _position = util_round(list(_position), PDX_DECIMALPTS)
+                trivert_data['p'].extend(swap_coord_space(vertices[vert_id]))  # convert to Game space
 
                 # normal
                 vert_norm_id = face.normalIndex(_local_id)
-                _normal = list(normals[vert_norm_id])
-                _normal = swap_coord_space(_normal)  # convert to Game space
-                if round_data:
-                    _normal = util_round(list(_normal), PDX_DECIMALPTS)
+                trivert_data['n'].extend(swap_coord_space(list(normals[vert_norm_id])))  # convert to Game space
 
                 # uv
-                _uv_coords = ()
                 for i, uv_set in enumerate(uv_setnames):
                     try:
                         vert_uv_id = face.getUVIndex(_local_id, uv_set)
-                        uv = uv_coords[i][vert_uv_id]
-                        uv = swap_coord_space(uv)  # convert to Game space
-                        if round_data:
-                            uv = util_round(list(uv), PDX_DECIMALPTS)
+                        uv = swap_coord_space(uv_coords[i][vert_uv_id])  # convert to Game space
                     # case where verts are unmapped, eg when two meshes are merged with different UV set counts
                     except RuntimeError:
                         uv = (0.0, 0.0)
-                    _uv_coords += (uv,)
+                    trivert_uvs[i].extend(uv)
 
                 # tangent (omitted if there were no UVs)
                 if uv_setnames and tangents:
                     vert_tangent_id = mesh.getTangentId(face_id, vert_id)
                     _binormal_sign = 1.0 if mFn_Mesh.isRightHandedTangent(vert_tangent_id, uv_setnames[0]) else -1.0
-                    _tangent = list(tangents[vert_tangent_id])
-                    _tangent = swap_coord_space(_tangent)  # convert to Game space
-                    if round_data:
-                        _tangent = util_round(list(_tangent), PDX_DECIMALPTS)
-
-                # check if this tri-vert is new and unique, or can if we can just use an existing vertex
-                new_vert = UniqueVertex(vert_id, _position, _normal, _uv_coords)
-
-                # test if we have already stored this vertex in the unique set
-                i = None
-                if not skip_merge_vertices:
-                    if new_vert in unique_verts:
-                        # no new data to be added to the mesh dict, the tri will reference an existing vert
-                        i = export_verts.index(new_vert)
-
-                if i is None:
-                    # collect the new vertex
-                    unique_verts.add(new_vert)
-                    export_verts.append(new_vert)
-
-                    # add this vert data to the mesh dict
-                    mesh_dict['p'].extend(_position)
-                    mesh_dict['n'].extend(_normal)
-                    for i, uv_set in enumerate(uv_setnames):
-                        mesh_dict['u' + str(i)].extend(_uv_coords[i])
-                    if uv_setnames:
-                        mesh_dict['ta'].extend(_tangent)
-                        mesh_dict['ta'].append(_binormal_sign)  # UV winding order
-                    # the tri will reference the last added vertex
-                    i = len(export_verts) - 1
-
-                # store the tri-vert reference
-                dict_vert_idx.append(i)
-
-            # tri-faces
-            mesh_dict['tri'].extend(
-                # to build the tri-face correctly, we need to use the original unsorted vertex order to reference verts
-                [dict_vert_idx[sorted_indices[0]], dict_vert_idx[sorted_indices[2]], dict_vert_idx[sorted_indices[1]]]
-            )  # convert handedness to Game space
-
-    # calculate min and max bounds of mesh
-    x_vtx_pos = set([mesh_dict['p'][j] for j in xrange(0, len(mesh_dict['p']), 3)])
-    y_vtx_pos = set([mesh_dict['p'][j + 1] for j in xrange(0, len(mesh_dict['p']), 3)])
-    z_vtx_pos = set([mesh_dict['p'][j + 2] for j in xrange(0, len(mesh_dict['p']), 3)])
-    mesh_dict['min'] = [min(x_vtx_pos), min(y_vtx_pos), min(z_vtx_pos)]
-    mesh_dict['max'] = [max(x_vtx_pos), max(y_vtx_pos), max(z_vtx_pos)]
-
-    # create an ordered list of vertex ids that we have gathered into the mesh dict
-    vert_id_list = [vert.id for vert in export_verts]
+                    _tangent = swap_coord_space(list(tangents[vert_tangent_id]))  # convert to Game space
+                    trivert_data['ta'].extend(_tangent)
+                    trivert_data['bs'].append(_binormal_sign)  # UV winding order
+
+    # round all attributes as whole arrays, UV winding order is a sign so is never rounded
+    if round_data:
+        for key in ['p', 'n', 'ta']:
+            trivert_data[key] = pdx_math.quantize(trivert_data[key], PDX_DECIMALPTS)
+        trivert_uvs = [pdx_math.quantize(uvs, PDX_DECIMALPTS) for uvs in trivert_uvs]
+
+    p_keys = pdx_math.pack(trivert_data['p'], 3)
+    n_keys = pdx_math.pack(trivert_data['n'], 3)
+    ta_keys = pdx_math.pack(trivert_data['ta'], 3)
+    uv_keys = list(zip(*[pdx_math.pack(uvs, 2) for uvs in trivert_uvs])) or [()] * len(trivert_ids)
+
+    # weld tri-verts into unique verts, in the order that we processed them, tris will reference the existing verts
+    unique_verts = [UniqueVertex(*vert_data) for vert_data in zip(trivert_ids, p_keys, n_keys, uv_keys)]
+    first_triverts, trivert_export_idx = pdx_math.weld(unique_verts, merge=not skip_merge_vertices)
+    vert_id_list = []
+
+    for k in first_triverts:
+        new_vert = unique_verts[k]
+        vert_id_list.append(new_vert.id)
+
+        # add this vert data to the mesh dict
+        mesh_dict['p'].extend(new_vert.p)
+        mesh_dict['n'].extend(new_vert.n)
+        for j, uv in enumerate(new_vert.uv):
+            mesh_dict['u' + str(j)].extend(uv)
+        if ta_keys:
+            mesh_dict['ta'].extend(ta_keys[k])
+            mesh_dict['ta'].append(trivert_data['bs'][k])
+
+    # tri-faces
+    mesh_dict['tri'] = [trivert_export_idx[k] for k in trivert_refs]
+
+    # calculate min and max bounds and the bounding sphere of mesh
+    mesh_dict.update(pdx_math.get_bounds(mesh_dict['p']))
 
     return mesh_dict, vert_id_list
 
 
-def get_mesh_skin_info(maya_mesh, vertex_ids=None):
+def get_mesh_skin_weights(maya_mesh, prune_threshold=0.0, ndigits=None):
+    """
+        Returns dense skin data for every vertex of the mesh, as flat lists of PDX_MAXSKININFS bone indices and weights
+        per vertex. The full weight matrix is read in a single API call and can then be sliced per material by
+        get_mesh_skin_info. Vertices skinned to too many bones are limited to the largest weights and renormalized.
+        Weights at or below prune_threshold are dropped, and all weights are rounded to ndigits if given.
+    """
     skinclusters = list(set(pmc.listConnections(maya_mesh, type='skinCluster')))
     if not skinclusters:
         return None
@@ -445,60 +429,74 @@ def get_mesh_skin_info(maya_mesh, vertex_ids=None):
     # a mesh can only be connected to one skin cluster
     skin = skinclusters[0]
 
-    # build a dictionary of skin information for the exporter
-    skin_dict = {x: [] for x in ['bones', 'ix', 'w']}
-
-    # set number of joint influences per vert
-    skin_dict['bones'].append(skin.getMaximumInfluences())
-
-    # find all bones in hierarchy
+    # find all bones in hierarchy, and map skin influences to bone indices
     skin_bones = skin.influenceObjects()
     all_bones = get_skeleton_hierarchy(skin_bones)
-
-    # parse all verts in order if we didn't supply a subset of vert ids
-    if vertex_ids is None:
-        vertex_ids = xrange(len(maya_mesh.verts))
-
-    # iterate over influences to find weights, per vertex
-    vert_weights = {v: {} for v in vertex_ids}
+    bone_indices = {bone: i for i, bone in enumerate(all_bones)}
     for bone in skin_bones:
-        try:
-            bone_index = all_bones.index(bone)
-        except ValueError:
+        if bone not in bone_indices:
             raise RuntimeError(
                 "A skinned bone ({0}) is being excluded from export! Check all bones using the '{1}' property.".format(
                     bone, PDX_IGNOREJOINT
                 )
             )
+    # influence order matches MFnSkinCluster.influenceObjects, do not use skin.indexForInfluenceObject
+    influence_map = [bone_indices[bone] for bone in skin_bones]
 
-        # do not use skin.indexForInfluenceObject (bones can be plugged into the cluster but are not influence objects)
-        inf_index = skin_bones.index(bone)
-
-        for vert_id, weight in enumerate(skin.getWeights(maya_mesh, influenceIndex=inf_index)):
-            # check we actually want this vertex (in case of material split meshes)
-            if vert_id in vertex_ids:
-                # store any non-zero weights, by influence, per vertex
-                if weight != 0.0:
-                    vert_weights[vert_id][bone_index] = weight
-
-    # collect data from the weights dict into the skin dict
-    for vtx in vertex_ids:
-        for influence, weight in vert_weights[vtx].iteritems():
-            skin_dict['ix'].append(influence)
-            skin_dict['w'].append(weight)
-        if len(vert_weights[vtx]) <= PDX_MAXSKININFS:
-            # pad out with null data to fill container
-            padding = PDX_MAXSKININFS - len(vert_weights[vtx])
-            skin_dict['ix'].extend([-1] * padding)
-            skin_dict['w'].extend([0.0] * padding)
-        else:
-            # warn if vertex influence count exceeds the max
-            raise RuntimeError(
-                "Mesh '{0}' has vertices skinned to more than {1} bones! This is not supported. "
-                "You must fix skin weights to reduce the influence count.".format(
-                    maya_mesh.getTransform().name(), PDX_MAXSKININFS
-                )
+    # API skin cluster function set
+    skin_obj = get_MObject(skin.name())
+    mFn_SkinCluster = OpenMayaAnim.MFnSkinCluster(skin_obj)
+
+    mesh_dag = get_MDagPath(maya_mesh.name())
+
+    mFn_SingleIdxCo = OpenMaya.MFnSingleIndexedComponent()
+    vertex_IdxCo = mFn_SingleIdxCo.create(OpenMaya.MFn.kMeshVertComponent)
+    mFn_SingleIdxCo.setCompleteData(maya_mesh.numVertices())  # all vertices, must only be set after running create()
+
+    # get weights for all vertices and all influences, vertex major
+    weights = OpenMaya.MDoubleArray()
+    m_Util = OpenMaya.MScriptUtil()
+    m_Util.createFromInt(0)
+    num_infs_ptr = m_Util.asUintPtr()
+    mFn_SkinCluster.getWeights(mesh_dag, vertex_IdxCo, weights, num_infs_ptr)
+    num_infs = OpenMaya.MScriptUtil.getUint(num_infs_ptr)
+
+    # build a sparse list of influences per vertex, then limit to the maximum influence count
+    vert_influences = pdx_math.get_sparse_influences(list(weights), num_infs, influence_map)
+    ix, w, report = pdx_math.limit_influences(
+        vert_influences, PDX_MAXSKININFS, prune_threshold=prune_threshold, ndigits=ndigits
+    )
+    if report['limited']:
+        IO_PDX_LOG.warning(
+            "Mesh '{0}' has {1} vertices skinned to more than {2} bones or below the prune threshold, these were "
+            "limited and renormalized. (max weight error {3:.4f})".format(
+                maya_mesh.getTransform().name(), report['limited'], PDX_MAXSKININFS, report['max_error']
             )
+        )
+
+    # influences are padded out to the maximum count per vertex
+    return {'bones': [PDX_MAXSKININFS], 'ix': ix, 'w': w}
+
+
+def get_mesh_skin_info(maya_mesh, vertex_ids=None, skin_weights=None):
+    if skin_weights is None:
+        skin_weights = get_mesh_skin_weights(maya_mesh, PDX_MINSKINWEIGHT, PDX_DECIMALPTS)
+    if skin_weights is None:
+        return None
+
+    # build a dictionary of skin information for the exporter
+    skin_dict = {x: [] for x in ['bones', 'ix', 'w']}
+
+    # set number of joint influences per vert
+    skin_dict['bones'].extend(skin_weights['bones'])
+
+    # parse all verts in order if we didn't supply a subset of vert ids
+    if vertex_ids is None:
+        vertex_ids = xrange(len(maya_mesh.verts))
+
+    # slice the dense skin data down to the vertices we want (in case of material split meshes)
+    skin_dict['ix'] = pdx_math.gather(skin_weights['ix'], PDX_MAXSKININFS, vertex_ids)
+    skin_dict['w'] = pdx_math.gather(skin_weights['w'], PDX_MAXSKININFS, vertex_ids)
 
     return skin_dict
 
@@ -514,23 +512,22 @@ def get_mesh_skeleton_info(maya_mesh):
     # find all bones in hierarchy to be exported
     all_bones = get_skeleton_hierarchy(skin.influenceObjects())
 
+    skeleton = pdx_skeleton.PDXSkeleton.from_hierarchy(
+        all_bones, [bone.getParent() for bone in all_bones], [bone.name() for bone in all_bones]
+    )
+
+    # bone inverse world-space transforms, convert to Game space as a batch
+    inverse_matrices = [list(MMatrix(bone.getMatrix(worldSpace=True)).inverse()) for bone in all_bones]
+    inverse_matrices = pdx_math.convert_space(inverse_matrices, list(SPACE_MATRIX))
+    transforms = pdx_math.matrices_to_tx(inverse_matrices)
+
     # build a list of bone information dictionaries for the exporter
-    bone_list = [{'name': x.name()} for x in all_bones]
-    for i, bone in enumerate(all_bones):
-        # bone index
-        bone_list[i]['ix'] = [i]
-
-        # bone parent index
-        if bone.getParent():
-            bone_list[i]['pa'] = [all_bones.index(bone.getParent())]
-
-        # bone inverse world-space transform
-        mat = list(swap_coord_space(bone.getMatrix(worldSpace=True)).inverse())
-        bone_list[i]['tx'] = []
-        bone_list[i]['tx'].extend(mat[0:3])
-        bone_list[i]['tx'].extend(mat[4:7])
-        bone_list[i]['tx'].extend(mat[8:11])
-        bone_list[i]['tx'].extend(mat[12:15])
+    bone_list = []
+    for i, name in enumerate(skeleton.names):
+        bone_info = {'name': name, 'ix': [i], 'tx': transforms[i]}
+        if skeleton.parents[i] >= 0:
+            bone_info['pa'] = [skeleton.parents[i]]
+        bone_list.append(bone_info)
 
     return bone_list
 
@@ -546,21 +543,34 @@ def get_skeleton_hierarchy(bone_list):
 
     root_bone = list(root_bone)[0]
 
-    def get_recursive_children(bone, hierarchy):
-        hierarchy.append(bone)
-        children = [
-            jnt
-            for jnt in pmc.listRelatives(bone, children=True, type='joint')
-            if not (hasattr(jnt, PDX_IGNOREJOINT) and getattr(jnt, PDX_IGNOREJOINT).get())
-        ]
+    # walk the joint hierarchy depth first in a single DAG traversal, rather than listing children per joint
+    root_path = get_MDagPath(root_bone.longName())
+    valid_bones = [root_bone]
+    valid_paths = {root_path.fullPathName()}
+    m_DagPath = OpenMaya.MDagPath()
+    m_DagIt = OpenMaya.MItDag(OpenMaya.MItDag.kDepthFirst, OpenMaya.MFn.kJoint)
+    m_DagIt.reset(root_path, OpenMaya.MItDag.kDepthFirst, OpenMaya.MFn.kJoint)
+
+    while not m_DagIt.isDone():
+        if m_DagIt.depth() == 0:
+            m_DagIt.next()
+            continue
 
-        for bone in children:
-            get_recursive_children(bone, hierarchy)
+        m_DagIt.getPath(m_DagPath)
+        path_name = m_DagPath.fullPathName()
 
-        return hierarchy
+        # only follow joints parented directly to a valid joint, prune ignored joints along with their children
+        parent_path = OpenMaya.MDagPath(m_DagPath)
+        parent_path.pop()
+        mFn_DepNode = OpenMaya.MFnDependencyNode(m_DagPath.node())
+        is_ignored = mFn_DepNode.hasAttribute(PDX_IGNOREJOINT) and mFn_DepNode.findPlug(PDX_IGNOREJOINT).asBool()
 
-    valid_bones = []
-    get_recursive_children(root_bone, valid_bones)
+        if parent_path.fullPathName() in valid_paths and not is_ignored:
+            valid_paths.add(path_name)
+            valid_bones.append(pmc.PyNode(path_name))
+        else:
+            m_DagIt.prune()
+        m_DagIt.next()
 
     return valid_bones
 
@@ -576,42 +586,102 @@ def get_animation_fps():
         raise RuntimeError("Unsupported animation speed. {0}".format(time_unit))
 
 
-def get_scene_animdata(export_bones, startframe, endframe, round_data=True):
-    # store transform for each bone over the frame range
-    frames_data = defaultdict(list)
+def get_transform_plugs(bones):
+    """
+        Returns the API plugs needed to evaluate the local transform of each bone, looked up once per bone.
+    """
+    bone_plugs = []
 
-    for f in xrange(startframe, endframe + 1):
-        pmc.currentTime(f, edit=True)
-        for bone in export_bones:
-            # convert to Game space
-            _translation = swap_coord_space(bone.getTranslation())
-            # bone rotation must be pre-multiplied by joint orientation
-            _rotation = swap_coord_space(bone.getRotation(quaternion=True) * bone.getOrientation())
-            _scale = bone.getScale()
+    for bone in bones:
+        bone_obj = get_MObject(bone.longName())
+        translate = [get_plug(bone_obj, attr) for attr in ['translateX', 'translateY', 'translateZ']]
+        rotate = [get_plug(bone_obj, attr) for attr in ['rotateX', 'rotateY', 'rotateZ']]
+        orient = [get_plug(bone_obj, attr) for attr in ['jointOrientX', 'jointOrientY', 'jointOrientZ']]
+        scale = [get_plug(bone_obj, attr) for attr in ['scaleX', 'scaleY', 'scaleZ']]
+        rotate_order = get_plug(bone_obj, 'rotateOrder')
+        bone_plugs.append((translate, rotate, orient, scale, rotate_order))
 
-            frames_data[bone.name()].append((_translation, _rotation, _scale))
+    return bone_plugs
 
-    # create an ordered dictionary of all animated bones to store sample data
-    all_bone_keyframes = OrderedDict()
-    for bone in export_bones:
-        all_bone_keyframes[bone.name()] = dict()
 
-    # determine if any transform attributes were animated over this frame range for each bone
+def sample_bone_transforms(bone_plugs, frame):
+    """
+        Evaluates the local transform of each bone at a frame, through a DG context so the current time is unchanged.
+        Returns a list of (translation, rotation, scale) per bone, with translation and rotation in Game space.
+    """
+    m_Context = OpenMaya.MDGContext(OpenMaya.MTime(frame, OpenMaya.MTime.uiUnit()))
+    transforms = []
+
+    for translate, rotate, orient, scale, rotate_order in bone_plugs:
+        # plug values are in internal units, so rotations are in radians
+        _translation = MVector(*[plug.asDouble(m_Context) for plug in translate])
+        _rotation = MEulerRotation(*([plug.asDouble(m_Context) for plug in rotate] + [rotate_order.asShort(m_Context)]))
+        _orientation = MEulerRotation(*[plug.asDouble(m_Context) for plug in orient])
+        _scale = tuple(plug.asDouble(m_Context) for plug in scale)
+
+        # convert to Game space, bone rotation must be pre-multiplied by joint orientation
+        transforms.append(
+            (
+                swap_coord_space(_translation),
+                swap_coord_space(_rotation.asQuaternion() * _orientation.asQuaternion()),
+                _scale,
+            )
+        )
+
+    return transforms
+
+
+def get_scene_posedata(export_bones, frames):
+    """
+        Samples the local transform of each export bone on each of the given frames, in Game space. Returns an ordered
+        dictionary of bone name to a list per frame of (translation, rotation, scale).
+    """
+    bone_poses = OrderedDict((bone.name(), []) for bone in export_bones)
+    bone_plugs = get_transform_plugs(export_bones)
+
+    # evaluate frames without changing the current time, and stop the viewport redrawing regardless
+    pmc.refresh(suspend=True)
+    try:
+        for f in frames:
+            for bone, transform in zip(export_bones, sample_bone_transforms(bone_plugs, f)):
+                bone_poses[bone.name()].append(transform)
+    finally:
+        pmc.refresh(suspend=False)
+
+    return bone_poses
+
+
+def watch_pose_cache(export_bones):
+    """
+        Clears the pose cache as soon as any of the bones are dirtied, by animation edits, time changes or otherwise.
+        Replaces any callbacks watching previously cached bones.
+    """
+    for _, callback_id in POSE_CACHE_CALLBACKS:
+        try:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        except RuntimeError:
+            # already removed by Maya along with its node
+            pass
+    del POSE_CACHE_CALLBACKS[:]
+
     for bone in export_bones:
-        # convert data from list of tuples [(t,q,s)] to three nested lists [t][q][s]
-        t_list, q_list, s_list = zip(*frames_data[bone.name()])
+        bone_obj = get_MObject(bone.longName())
+        callback_id = OpenMaya.MNodeMessage.addNodeDirtyCallback(bone_obj, lambda *args: POSE_CACHE.clear())
+        POSE_CACHE_CALLBACKS.append((OpenMaya.MObjectHandle(bone_obj), callback_id))
+
 
-        if round_data:
-            t_list = [util_round(list(t), PDX_ROUND_TRANS) for t in t_list]
-            q_list = [util_round(list(q), PDX_ROUND_ROT) for q in q_list]
-            s_list = [util_round(list(s), PDX_ROUND_SCALE) for s in s_list]
+def get_cached_posedata(export_bones, frames):
+    """
+        As get_scene_posedata, but reuses any frames already sampled from the same bones since they were last dirtied.
+    """
+    key = tuple(bone.longName() for bone in export_bones)
 
-        # store any animated transform samples per attribute
-        for attr, attr_list in zip(['t', 'q', 's'], [t_list, q_list, s_list]):
-            if len(set(attr_list)) != 1:
-                all_bone_keyframes[bone.name()][attr] = attr_list
+    # start a new cache if the bones changed, or any were deleted (eg. by opening a new scene)
+    if key != POSE_CACHE.key or not all(bone_handle.isValid() for bone_handle, _ in POSE_CACHE_CALLBACKS):
+        POSE_CACHE.clear()
+        watch_pose_cache(export_bones)
 
-    return all_bone_keyframes
+    return POSE_CACHE.get_poses(key, frames, lambda missing: get_scene_posedata(export_bones, missing))
 
 
 def swap_coord_space(data):
@@ -732,7 +802,7 @@ def create_locator(PDX_locator, PDX_bone_dict):
 
     # parent locator to scene bone, or apply parents transform
     parent = getattr(PDX_locator, 'pa', None)
-    parent_Xform = pmdt.Matrix()
+    parent_inverse = pmdt.Matrix()
 
     if parent is not None:
         parent_bone = pmc.ls(parent[0], type='joint')
@@ -742,14 +812,7 @@ def create_locator(PDX_locator, PDX_bone_dict):
             # parent bone doesn't exist in scene, build its transform
             if parent[0] in PDX_bone_dict:
                 transform = PDX_bone_dict[parent[0]]
-                # fmt: off
-                parent_Xform = pmdt.Matrix(
-                    transform[0], transform[1], transform[2], 0.0,
-                    transform[3], transform[4], transform[5], 0.0,
-                    transform[6], transform[7], transform[8], 0.0,
-                    transform[9], transform[10], transform[11], 1.0
-                )
-                # fmt: on
+                parent_inverse = pmdt.Matrix(*pdx_math.invert_matrices(pdx_math.tx_to_matrices([transform]))[0])
             else:
                 IO_PDX_LOG.info(
                     "ERROR! unable to create locator '{0}' (missing parent '{1}' in file data)".format(
@@ -771,7 +834,7 @@ def create_locator(PDX_locator, PDX_bone_dict):
     mFn_Xform.setTranslation(vector, space)
 
     # apply parent transform
-    new_loc.setMatrix(new_loc.getMatrix() * parent_Xform.inverse())
+    new_loc.setMatrix(new_loc.getMatrix() * parent_inverse)
 
     # convert to Maya space
     new_loc.setMatrix(swap_coord_space(new_loc.getMatrix()))
@@ -781,10 +844,13 @@ def create_skeleton(PDX_bone_list):
     # keep track of bones as we create them
     bone_list = [None for _ in xrange(0, len(PDX_bone_list))]
 
+    # get the bind pose from the bone transforms and convert to Maya space as a batch
+    skeleton = pdx_skeleton.PDXSkeleton.from_pdx_bones(PDX_bone_list)
+    bone_matrices = pdx_math.convert_space(skeleton.get_bind_matrices()[0], list(SPACE_MATRIX))
+
     pmc.select(clear=True)
     for bone in PDX_bone_list:
         index = bone.ix[0]
-        transform = bone.tx
         parent = getattr(bone, 'pa', None)
 
         # determine unique bone name
@@ -804,17 +870,8 @@ def create_skeleton(PDX_bone_list):
         pmc.parent(new_bone, world=True)
         bone_list[index] = new_bone
 
-        # set transform
-        # fmt: off
-        mat = pmdt.Matrix(
-            transform[0], transform[1], transform[2], 0.0,
-            transform[3], transform[4], transform[5], 0.0,
-            transform[6], transform[7], transform[8], 0.0,
-            transform[9], transform[10], transform[11], 1.0
-        )
-        # fmt: on
-        # convert to Maya space
-        new_bone.setMatrix(swap_coord_space(mat.inverse()), worldSpace=True)  # set to matrix inverse in world-space
+        # set transform, to the bones matrix inverse in world-space
+        new_bone.setMatrix(MMatrix(pdx_math.pack(bone_matrices[index], 4)), worldSpace=True)
         pmc.select(clear=True)
 
         # connect to parent
@@ -833,17 +890,9 @@ def create_skin(PDX_skin, mesh, skeleton, max_infs=None):
     if max_infs is None:
         max_infs = PDX_MAXSKININFS
 
-    # create dictionary of skinning info per vertex
-    skin_dict = dict()
-
     num_infs = PDX_skin.bones[0]
-    for vtx in xrange(0, len(PDX_skin.ix) / max_infs):
-        skin_dict[vtx] = dict(joints=[], weights=[])
-
-    # gather joint index and weighting that each vertex is skinned to
-    for vtx, j in enumerate(xrange(0, len(PDX_skin.ix), max_infs)):
-        skin_dict[vtx]['joints'] = PDX_skin.ix[j : j + num_infs]
-        skin_dict[vtx]['weights'] = PDX_skin.w[j : j + num_infs]
+    num_verts = len(PDX_skin.ix) // max_infs
+    num_joints = len(skeleton)
 
     # select mesh and joints
     pmc.select(skeleton, mesh)
@@ -860,26 +909,19 @@ def create_skin(PDX_skin, mesh, skeleton, max_infs=None):
 
     mesh_dag = get_MDagPath(mesh.name())
 
-    indices = OpenMaya.MIntArray()
-    for vtx in xrange(len(skin_dict.keys())):
-        indices.append(vtx)
     mFn_SingleIdxCo = OpenMaya.MFnSingleIndexedComponent()
     vertex_IdxCo = mFn_SingleIdxCo.create(OpenMaya.MFn.kMeshVertComponent)
-    mFn_SingleIdxCo.addElements(indices)  # must only add indices after running create()
+    mFn_SingleIdxCo.setCompleteData(num_verts)  # all vertices, must only be set after running create()
 
     infs = OpenMaya.MIntArray()
-    for j in xrange(len(skeleton)):
+    for j in xrange(num_joints):
         infs.append(j)
 
-    weights = OpenMaya.MDoubleArray()
-    for vtx in xrange(len(skin_dict.keys())):
-        jts = skin_dict[vtx]['joints']
-        wts = skin_dict[vtx]['weights']
-        for j in xrange(len(skeleton)):
-            if j in jts:
-                weights.append(wts[jts.index(j)])
-            else:
-                weights.append(0.0)
+    # scatter the joint index and weighting that each vertex is skinned to into a dense (vertices x joints) buffer
+    weights_list = pdx_math.scatter_weights(PDX_skin.ix, PDX_skin.w, max_infs, num_joints, count=num_infs)
+    m_Util = OpenMaya.MScriptUtil()
+    m_Util.createFromList(weights_list, len(weights_list))
+    weights = OpenMaya.MDoubleArray(m_Util.asDoublePtr(), len(weights_list))
 
     # set skin weights
     mFn_SkinCluster.setWeights(mesh_dag, vertex_IdxCo, infs, weights)
@@ -1028,41 +1070,72 @@ def create_mesh(PDX_mesh, name=None):
     return new_mesh
 
 
-def create_animcurve(joint, attr):
-    mFn_AnimCurve = OpenMayaAnim.MFnAnimCurve()
+def create_animcurves(joint_attrs):
+    """
+        Finds or creates an animation curve for each (joint, attribute) pair, returning their function sets in order.
+        Existing animation curves are reused, new curves are all created and connected by a single DG modifier.
+    """
+    m_DGMod = OpenMaya.MDGModifier()
+    anim_curves = []
+
+    for joint, attr in joint_attrs:
+        in_plug = get_plug(joint, attr)
+        mFn_AnimCurve = None
+
+        # check for any existing animation curve, disconnecting anything else driving the attribute
+        if in_plug.isConnected():
+            mplugs = OpenMaya.MPlugArray()
+            in_plug.connectedTo(mplugs, True, False)
+            for i in range(0, mplugs.length()):
+                mObj = mplugs[i].node()
+                if mObj.hasFn(OpenMaya.MFn.kAnimCurve) and mFn_AnimCurve is None:
+                    mFn_AnimCurve = OpenMayaAnim.MFnAnimCurve(mObj)
+                else:
+                    m_DGMod.disconnect(mplugs[i], in_plug)
+
+        if mFn_AnimCurve is None:
+            # use the attribute on the joint to determine which type of anim curve to create
+            mFn_AnimCurve = OpenMayaAnim.MFnAnimCurve()
+            plug_type = mFn_AnimCurve.timedAnimCurveTypeForPlug(in_plug)
+
+            # create the curve and connect its output to the attribute on the joint
+            anim_curve = mFn_AnimCurve.create(plug_type, m_DGMod)
+            m_DGMod.renameNode(anim_curve, '{0}_{1}'.format(OpenMaya.MFnDependencyNode(joint).name(), attr))
+            m_DGMod.connect(get_plug(anim_curve, 'output'), in_plug)
+
+        anim_curves.append(mFn_AnimCurve)
+
+    m_DGMod.doIt()
 
-    # use the attribute on the joint to determine which type of anim curve to create
-    in_plug = get_plug(joint, attr)
-    plug_type = mFn_AnimCurve.timedAnimCurveTypeForPlug(in_plug)
+    return anim_curves
 
-    # create the curve and get its output attribute
-    anim_curve = mFn_AnimCurve.create(plug_type)
-    mFn_AnimCurve.setName('{0}_{1}'.format(OpenMaya.MFnDependencyNode(joint).name(), attr))
 
-    # check for and remove any existing animation curve
-    if in_plug.isConnected():
-        mplugs = OpenMaya.MPlugArray()
-        in_plug.connectedTo(mplugs, True, False)
-        for i in range(0, mplugs.length()):
-            m_DGMod = OpenMaya.MDGModifier()
-            m_DGMod.deleteNode(mplugs[i].node())
-    # check for and return any existing animation curve
-    # if in_plug.isConnected():
-    #     mplugs = OpenMaya.MPlugArray()
-    #     in_plug.connectedTo(mplugs, True, False)
-    #     for i in range(0, mplugs.length()):
-    #         mObj = mplugs[i].node()
-    #         if mObj.hasFn(OpenMaya.MFn.kAnimCurve):
-    #             return None, OpenMayaAnim.MFnAnimCurve(mObj)
+def get_joint_animcurves(bone_types):
+    """
+        Finds or creates the animation curves for many joints at once. Takes a dictionary of joint to the sample types
+        animated on it, and returns a dictionary of joint to a dictionary of attribute to animation curve.
+    """
+    joint_attrs, curve_keys = [], []
+    for joint, sample_types in bone_types.items():
+        jnt_obj = get_MObject(joint.name())
+        for sample_type, attrs in ANIM_ATTRS.items():
+            if sample_type in sample_types:
+                joint_attrs.extend((jnt_obj, attr) for attr in attrs)
+                curve_keys.extend((joint, attr) for attr in attrs)
 
-    # connect the new animation curve to the attribute on the joint
-    connect_nodeplugs(anim_curve, 'output', joint, attr)
+    joint_curves = dict((joint, {}) for joint in bone_types)
+    for (joint, attr), mFn_AnimCurve in zip(curve_keys, create_animcurves(joint_attrs)):
+        joint_curves[joint][attr] = mFn_AnimCurve
 
-    return anim_curve, mFn_AnimCurve
+    return joint_curves
 
 
-def create_anim_keys(joint_name, key_dict, timestart):
-    jnt_obj = get_MObject(joint_name)
+def create_anim_keys(joint, anim_curves, key_dict, timestart, keep_existing=False):
+    """
+        Keys the joint from timestart with the sample data, using the animation curves from get_joint_animcurves. Keys
+        on the curves are replaced, unless keep_existing is set, in which case they are added alongside current keys.
+    """
+    jnt_obj = get_MObject(joint.name())
 
     # calculate start and end frames
     timestart = int(timestart)
@@ -1076,81 +1149,35 @@ def create_anim_keys(joint_name, key_dict, timestart):
     # define anim curve tangent
     k_Tangent = OpenMayaAnim.MFnAnimCurve.kTangentLinear
 
-    if 's' in key_dict:  # scale data
-        animated_attrs = dict(scaleX=None, scaleY=None, scaleZ=None)
-
-        for attrib in animated_attrs:
-            # create the curve and API function set
-            anim_curve, mFn_AnimCurve = create_animcurve(jnt_obj, attrib)
-            animated_attrs[attrib] = mFn_AnimCurve
-
-        # create data arrays per animating attribute
-        x_scale_data = OpenMaya.MDoubleArray()
-        y_scale_data = OpenMaya.MDoubleArray()
-        z_scale_data = OpenMaya.MDoubleArray()
+    # create data arrays per animating attribute
+    attr_data = OrderedDict()
 
-        for scale_data in key_dict['s']:
-            # convert to Game space
-            x_scale_data.append(scale_data[0])
-            y_scale_data.append(scale_data[0])
-            z_scale_data.append(scale_data[0])
-
-        # add keys to the new curves
-        for attrib, data_array in zip(animated_attrs, [x_scale_data, y_scale_data, z_scale_data]):
-            mFn_AnimCurve = animated_attrs[attrib]
-            mFn_AnimCurve.addKeys(time_array, data_array, k_Tangent, k_Tangent)
+    if 's' in key_dict:  # scale data
+        for attrib in ANIM_ATTRS['s']:
+            attr_data[attrib] = [scale_data[0] for scale_data in key_dict['s']]
 
     if 'q' in key_dict:  # quaternion data
-        animated_attrs = dict(rotateX=None, rotateY=None, rotateZ=None)
-
-        for attrib in animated_attrs:
-            # create the curve and API function set
-            anim_curve, mFn_AnimCurve = create_animcurve(jnt_obj, attrib)
-            animated_attrs[attrib] = mFn_AnimCurve
-
-        # create data arrays per animating attribute
-        x_rot_data = OpenMaya.MDoubleArray()
-        y_rot_data = OpenMaya.MDoubleArray()
-        z_rot_data = OpenMaya.MDoubleArray()
-
-        for quat_data in key_dict['q']:
-            # convert to Game space
-            q = swap_coord_space(MQuaternion(*quat_data))
-            # convert from quaternion to euler, this gives values in radians (which Maya uses internally)
-            euler_data = q.asEulerRotation()
-            x_rot_data.append(euler_data.x)
-            y_rot_data.append(euler_data.y)
-            z_rot_data.append(euler_data.z)
-
-        # add keys to the new curves
-        for attrib, data_array in zip(animated_attrs, [x_rot_data, y_rot_data, z_rot_data]):
-            mFn_AnimCurve = animated_attrs[attrib]
-            mFn_AnimCurve.addKeys(time_array, data_array, k_Tangent, k_Tangent)
+        # convert to Maya space and then to eulers in the joints rotate order, this gives values in radians (which Maya
+        # uses internally), filtered so the curves don't flip between equivalent rotations from frame to frame
+        rotate_order = ROTATE_ORDERS[get_plug(jnt_obj, 'rotateOrder').asShort()]
+        quaternions = pdx_math.make_quaternions_continuous(key_dict['q'])
+        rot_matrices = pdx_math.convert_space(pdx_math.quaternions_to_matrices(quaternions), list(SPACE_MATRIX))
+        eulers = pdx_math.filter_eulers(pdx_math.matrices_to_eulers(rot_matrices, rotate_order), rotate_order)
+        for axis, attrib in enumerate(ANIM_ATTRS['q']):
+            attr_data[attrib] = [euler[axis] for euler in eulers]
 
     if 't' in key_dict:  # translation data
-        animated_attrs = dict(translateX=None, translateY=None, translateZ=None)
-
-        for attrib in animated_attrs:
-            # create the curve and API function set
-            anim_curve, mFn_AnimCurve = create_animcurve(jnt_obj, attrib)
-            animated_attrs[attrib] = mFn_AnimCurve
-
-        # create data arrays per animating attribute
-        x_trans_data = OpenMaya.MDoubleArray()
-        y_trans_data = OpenMaya.MDoubleArray()
-        z_trans_data = OpenMaya.MDoubleArray()
-
-        for trans_data in key_dict['t']:
-            # convert to Game space
-            t = swap_coord_space(MVector(*trans_data))
-            x_trans_data.append(t[0])
-            y_trans_data.append(t[1])
-            z_trans_data.append(t[2])
+        # convert to Maya space
+        translations = [swap_coord_space(MVector(*trans_data)) for trans_data in key_dict['t']]
+        for axis, attrib in enumerate(ANIM_ATTRS['t']):
+            attr_data[attrib] = [t[axis] for t in translations]
 
-        # add keys to the new curves
-        for attrib, data_array in zip(animated_attrs, [x_trans_data, y_trans_data, z_trans_data]):
-            mFn_AnimCurve = animated_attrs[attrib]
-            mFn_AnimCurve.addKeys(time_array, data_array, k_Tangent, k_Tangent)
+    # add keys to the curves
+    for attrib, data in attr_data.items():
+        data_array = OpenMaya.MDoubleArray()
+        for value in data:
+            data_array.append(value)
+        anim_curves[attrib].addKeys(time_array, data_array, k_Tangent, k_Tangent, keep_existing)
 
 
 """ ====================================================================================================================
@@ -1245,7 +1272,9 @@ def import_meshfile(meshpath, imp_mesh=True, imp_skel=True, imp_locs=True, progr
         progress.finished()
 
 
-def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge_verts=True, progress_fn=None):
+def export_meshfile(
+    meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge_verts=True, lodperc=None, progress_fn=None
+):
     start = time.time()
     IO_PDX_LOG.info("exporting {0}".format(meshpath))
 
@@ -1260,6 +1289,10 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
     # create root element for objects
     object_xml = Xml.SubElement(root_xml, 'object')
 
+    # set LOD switches, as a percentage size of the objects bounding sphere
+    if lodperc:
+        object_xml.set('lodperc', pdx_math.get_lod_switches(lodperc))
+
     # populate object data
     maya_meshes = list_scene_pdx_meshes()
     # sort meshes for export by index
@@ -1274,6 +1307,11 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
         # one shape can have multiple materials on a per meshface basis
         shading_groups = list(set(shape.connections(type='shadingEngine')))
 
+        # gather skin data for all vertices once, this is sliced per material below
+        skin_weights = None
+        if exp_skel:
+            skin_weights = get_mesh_skin_weights(shape, PDX_MINSKINWEIGHT, PDX_DECIMALPTS)
+
         if exp_mesh and shading_groups:
             # this type of ObjectSet associates shaders with geometry
             for group in shading_groups:
@@ -1296,7 +1334,7 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
                 mesh_info_dict, vert_ids = get_mesh_info(mesh, not merge_verts, True)
 
                 # populate mesh attributes
-                for key in ['p', 'n', 'ta', 'u0', 'u1', 'u2', 'u3', 'tri']:
+                for key in ['p', 'n', 'ta', 'u0', 'u1', 'u2', 'u3', 'tri', 'boundingsphere']:
                     if key in mesh_info_dict and mesh_info_dict[key]:
                         meshnode_xml.set(key, mesh_info_dict[key])
 
@@ -1318,7 +1356,7 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
                     materialnode_xml.set(slot, [os.path.split(texture)[1]])
 
                 # create parent element for skin data, if the mesh is skinned
-                skin_info_dict = get_mesh_skin_info(shape, vert_ids)
+                skin_info_dict = get_mesh_skin_info(shape, vert_ids, skin_weights) if skin_weights else None
                 if exp_skel and skin_info_dict:
                     IO_PDX_LOG.info("writing skinning data -")
                     if progress_fn:
@@ -1378,24 +1416,7 @@ def export_meshfile(meshpath, exp_mesh=True, exp_skel=True, exp_locs=True, merge
         progress.finished()
 
 
-def import_animfile(animpath, timestart=1, progress_fn=None):
-    start = time.time()
-    IO_PDX_LOG.info("importing {0}".format(animpath))
-
-    progress = None
-    if progress_fn:
-        progress = progress_fn('Importing', 10)
-
-    # read the file into an XML structure
-    asset_elem = pdx_data.read_meshfile(animpath)
-
-    # find animation info and samples
-    info = asset_elem.find('info')
-    samples = asset_elem.find('samples')
-    framecount = info.attrib['sa'][0]
-
-    # set scene animation and playback settings
-    fps = int(info.attrib['fps'][0])
+def set_animation_fps(fps):
     IO_PDX_LOG.info("setting playback speed - {0}".format(fps))
     try:
         pmc.currentUnit(time=('{0}fps'.format(fps)))
@@ -1409,83 +1430,103 @@ def import_animfile(animpath, timestart=1, progress_fn=None):
         else:
             raise RuntimeError("Unsupported animation speed. ({0} fps)".format(fps))
 
-    if progress_fn:
-        progress.update(1, 'setting playback speed')
+
+def set_playback_range(timestart, timeend):
+    IO_PDX_LOG.info("setting playback range - ({0},{1})".format(timestart, timeend))
     pmc.playbackOptions(edit=True, playbackSpeed=1.0)
     pmc.playbackOptions(edit=True, animationStartTime=0.0)
-
-    IO_PDX_LOG.info("setting playback range - ({0},{1})".format(timestart, (timestart + framecount - 1)))
-    if progress_fn:
-        progress.update(1, 'setting playback range')
     pmc.playbackOptions(edit=True, minTime=timestart)
-    pmc.playbackOptions(edit=True, maxTime=(timestart + framecount - 1))
+    pmc.playbackOptions(edit=True, maxTime=timeend)
 
-    pmc.currentTime(timestart, edit=True)
 
-    # find bones being animated in the scene
-    IO_PDX_LOG.info("finding bones -")
-    if progress_fn:
-        progress.update(1, 'finding bones')
+def get_animation_joints(bone_names, progress=None):
+    """
+        Finds the scene joint for each bone name, returning an ordered dictionary of cleaned bone name to joint.
+    """
     bone_errors = []
-    bone_list = []
-    for bone in info:
-        bone_joint = None
-        bone_name = clean_imported_name(bone.tag)
+    bone_joints = OrderedDict()
+    for bone_name in bone_names:
+        bone_name = clean_imported_name(bone_name)
         try:
             matching_bones = pmc.ls(bone_name, type=pmc.nt.Joint, long=True)  # type: pmc.nodetypes.joint
-            bone_joint = matching_bones[0]
+            bone_joints[bone_name] = matching_bones[0]
         except IndexError:
             bone_errors.append(bone_name)
             IO_PDX_LOG.warning("failed to find bone '{0}'".format(bone_name))
-            if progress_fn:
+            if progress:
                 progress.update(1, 'failed to find bone!')
 
-        # set initial transform and remove any joint orientation (this is baked into rotation values in the .anim file)
-        if bone_joint:
-            # compose transform parts
-            _scale = [bone.attrib['s'][0], bone.attrib['s'][0], bone.attrib['s'][0]]
-            _rotation = MQuaternion(*bone.attrib['q'])
-            _translation = MVector(*bone.attrib['t'])
-
-            # convert to Game space
-            bone_joint.setScale(_scale)
-            bone_joint.setRotation(swap_coord_space(_rotation))
-            bone_joint.setTranslation(swap_coord_space(_translation))
-
-            # zero out joint orientation
-            bone_joint.jointOrient.set(0.0, 0.0, 0.0)
-
-            bone_list.append(bone_joint)
-
     # break on bone errors
     if bone_errors:
         raise RuntimeError("Missing bones required for animation:\n{0}".format(bone_errors))
 
-    # check which transform types are animated on each bone
-    all_bone_keyframes = OrderedDict()
+    return bone_joints
+
+
+def set_initial_pose(info, bone_joints):
+    # set initial transform and remove any joint orientation (this is baked into rotation values in the .anim file)
     for bone in info:
-        bone_name = clean_imported_name(bone.tag)
-        key_data = dict()
-        all_bone_keyframes[bone_name] = key_data
+        bone_joint = bone_joints[clean_imported_name(bone.tag)]
 
-        for sample_type in bone.attrib['sa'][0]:
-            key_data[sample_type] = []
+        # compose transform parts
+        _scale = [bone.attrib['s'][0], bone.attrib['s'][0], bone.attrib['s'][0]]
+        _rotation = MQuaternion(*bone.attrib['q'])
+        _translation = MVector(*bone.attrib['t'])
+
+        # convert to Game space
+        bone_joint.setScale(_scale)
+        bone_joint.setRotation(swap_coord_space(_rotation))
+        bone_joint.setTranslation(swap_coord_space(_translation))
+
+        # zero out joint orientation
+        bone_joint.jointOrient.set(0.0, 0.0, 0.0)
 
-    # then traverse the samples data to store keys per bone
-    s_index, q_index, t_index = 0, 0, 0
-    for _ in xrange(0, framecount):
-        for bone_name in all_bone_keyframes:
-            bone_key_data = all_bone_keyframes[bone_name]
-
-            if 's' in bone_key_data:
-                bone_key_data['s'].append(samples.attrib['s'][s_index : s_index + 1])
-                s_index += 1
-            if 'q' in bone_key_data:
-                bone_key_data['q'].append(samples.attrib['q'][q_index : q_index + 4])
-                q_index += 4
-            if 't' in bone_key_data:
-                bone_key_data['t'].append(samples.attrib['t'][t_index : t_index + 3])
-                t_index += 3
+
+def import_animfile(animpath, timestart=1, progress_fn=None):
+    start = time.time()
+    IO_PDX_LOG.info("importing {0}".format(animpath))
+
+    progress = None
+    if progress_fn:
+        progress = progress_fn('Importing', 10)
+
+    # read the file into an XML structure
+    asset_elem = pdx_data.read_meshfile(animpath)
+
+    # find animation info and samples
+    info = asset_elem.find('info')
+    samples = asset_elem.find('samples')
+    framecount = info.attrib['sa'][0]
+
+    # set scene animation and playback settings
+    set_animation_fps(int(info.attrib['fps'][0]))
+    if progress_fn:
+        progress.update(1, 'setting playback speed')
+
+    if progress_fn:
+        progress.update(1, 'setting playback range')
+    set_playback_range(timestart, timestart + framecount - 1)
+
+    pmc.currentTime(timestart, edit=True)
+
+    # find bones being animated in the scene
+    IO_PDX_LOG.info("finding bones -")
+    if progress_fn:
+        progress.update(1, 'finding bones')
+    bone_joints = get_animation_joints([bone.tag for bone in info], progress)
+    bone_list = list(bone_joints.values())
+    set_initial_pose(info, bone_joints)
+
+    # read the samples data into keys per bone
+    all_bone_keyframes = OrderedDict(
+        (clean_imported_name(bone_name), bone_keys)
+        for bone_name, bone_keys in pdx_anim.get_animation_keys(info, samples).items()
+    )
+
+    # find or create animation curves for all animated bones at once
+    joint_curves = get_joint_animcurves(
+        OrderedDict((bone_joints[bone_name], bone_keys) for bone_name, bone_keys in all_bone_keyframes.items())
+    )
 
     for bone_name in all_bone_keyframes:
         bone_keys = all_bone_keyframes[bone_name]
@@ -1494,8 +1535,8 @@ def import_animfile(animpath, timestart=1, progress_fn=None):
             IO_PDX_LOG.info("setting {0} keyframes on bone '{1}'".format(list(bone_keys.keys()), bone_name))
             if progress_fn:
                 progress.update(1, 'setting keyframes on bone')
-            bone_long_name = pmc.ls(bone_name, type=pmc.nt.Joint, long=True)[0].name()
-            create_anim_keys(bone_long_name, bone_keys, timestart)
+            joint = bone_joints[bone_name]
+            create_anim_keys(joint, joint_curves[joint], bone_keys, timestart)
 
     animation_name = os.path.split(os.path.splitext(animpath)[0])[1]
     edit_animation_clip(bone_list, animation_name, timestart, (timestart + framecount - 1))
@@ -1506,37 +1547,111 @@ def import_animfile(animpath, timestart=1, progress_fn=None):
         progress.finished()
 
 
-def export_animfile(animpath, timestart=1, timeend=10, progress_fn=None):
+def import_animfiles(animpaths, timestart=1, progress_fn=None):
+    """
+        Imports many .anim files onto one skeleton in a single operation. Animations are keyed end to end from timestart
+        and each is recorded as an AnimClip on the root bone. Undo is suspended during the import.
+    """
     start = time.time()
-    IO_PDX_LOG.info("exporting {0}".format(animpath))
+    IO_PDX_LOG.info("importing {0} animations".format(len(animpaths)))
 
     progress = None
     if progress_fn:
-        progress = progress_fn('Exporting', 10)
+        progress = progress_fn('Importing', len(animpaths) + 2)
 
-    curr_frame = pmc.currentTime(query=True)
-    if timestart != int(timestart) or timeend != int(timeend):
-        raise RuntimeError(
-            "Invalid animation range selected ({0},{1}). Only whole frames are supported.".format(timestart, timeend)
+    # read all files into XML structures
+    anim_data = pdx_anim.read_animfiles(animpaths)
+
+    # set scene animation settings, all animations must share a speed
+    all_fps = set(int(info.attrib['fps'][0]) for info, _ in anim_data)
+    if len(all_fps) != 1:
+        raise RuntimeError("Animations have mixed speeds, unable to import together. {0}".format(sorted(all_fps)))
+    set_animation_fps(all_fps.pop())
+
+    # find bones being animated in the scene, once for all animations
+    IO_PDX_LOG.info("finding bones -")
+    if progress_fn:
+        progress.update(1, 'finding bones')
+    bone_names = OrderedDict((bone.tag, None) for info, _ in anim_data for bone in info)
+    bone_joints = get_animation_joints(bone_names, progress)
+    bone_list = list(bone_joints.values())
+
+    # find every sample type animated on each bone by any animation, and the values of any held by each animation
+    all_anim_keyframes = []
+    keyed_types = defaultdict(set)
+    held_values = defaultdict(set)
+    for info, samples in anim_data:
+        anim_keyframes = OrderedDict(
+            (clean_imported_name(bone_name), bone_keys)
+            for bone_name, bone_keys in pdx_anim.get_animation_keys(info, samples).items()
         )
-    timestart = int(timestart)
-    timeend = int(timeend)
+        for bone in info:
+            bone_name = clean_imported_name(bone.tag)
+            keyed_types[bone_name].update(anim_keyframes[bone_name])
+            for sample_type in pdx_anim.PDX_SAMPLE_SIZES:
+                if sample_type not in anim_keyframes[bone_name]:
+                    held_values[bone_name, sample_type].add(tuple(bone.attrib[sample_type]))
+        all_anim_keyframes.append(anim_keyframes)
+
+    # the initial pose is only set from the first animation, so held values must also be keyed if they differ between
+    # animations, or belong to bones the first animation doesn't include
+    first_bones = set(clean_imported_name(bone.tag) for bone in anim_data[0][0])
+    for (bone_name, sample_type), values in held_values.items():
+        if len(values) > 1 or bone_name not in first_bones:
+            keyed_types[bone_name].add(sample_type)
+
+    pmc.undoInfo(stateWithoutFlush=False)
+    try:
+        set_initial_pose(anim_data[0][0], bone_joints)
 
-    # create an XML structure to store the object hierarchy
-    root_xml = Xml.Element('File')
-    root_xml.set('pdxasset', [1, 0])
+        # find or create animation curves for all keyed bones at once
+        joint_curves = get_joint_animcurves(
+            OrderedDict((bone_joints[bone_name], sample_types) for bone_name, sample_types in keyed_types.items())
+        )
+        keyed_bones = set()
+
+        anim_clips = []
+        clip_start = timestart
+        for animpath, (info, _), anim_keyframes in zip(animpaths, anim_data, all_anim_keyframes):
+            animation_name = os.path.split(os.path.splitext(animpath)[0])[1]
+            framecount = info.attrib['sa'][0]
+            IO_PDX_LOG.info("importing {0} at frame {1}".format(animation_name, clip_start))
+            if progress_fn:
+                progress.update(1, 'setting keyframes')
 
-    # create root element for animation info
-    info_xml = Xml.SubElement(root_xml, 'info')
+            for bone in info:
+                bone_name = clean_imported_name(bone.tag)
+                bone_keys = anim_keyframes[bone_name]
 
-    # fill in animation info and initial pose
-    IO_PDX_LOG.info("writing animation info -")
-    fps = get_animation_fps()  # pmc.mel.currentTimeUnitToFPS()
-    info_xml.set('fps', [float(fps)])
+                # hold this animations initial pose on any keyed attributes it doesn't animate
+                for sample_type in keyed_types[bone_name].difference(bone_keys):
+                    bone_keys[sample_type] = [tuple(bone.attrib[sample_type])] * framecount
+
+                # the first animation keying a bone replaces any existing animation curves, the rest add to them
+                if bone_keys:
+                    joint = bone_joints[bone_name]
+                    create_anim_keys(joint, joint_curves[joint], bone_keys, clip_start, bone_name in keyed_bones)
+                    keyed_bones.add(bone_name)
+
+            anim_clips.append(AnimClip(animation_name, clip_start, clip_start + framecount - 1))
+            clip_start += framecount
+
+        # record all animation clips on the root bone
+        for clip in anim_clips:
+            edit_animation_clip(bone_list, clip.name, clip.start, clip.end)
+    finally:
+        pmc.undoInfo(stateWithoutFlush=True)
+
+    set_playback_range(timestart, clip_start - 1)
+    pmc.currentTime(timestart, edit=True)
 
-    frame_samples = (timeend + 1) - timestart
-    info_xml.set('sa', [frame_samples])
+    pmc.select(None)
+    IO_PDX_LOG.info("import finished! ({0:.4f} sec)".format(time.time() - start))
+    if progress_fn:
+        progress.finished()
 
+
+def get_animation_root_bone():
     # find the scene root bone with animation property (assume this is unique)
     root_bone = None
 
@@ -1556,71 +1671,96 @@ def export_animfile(animpath, timestart=1, timeend=10, progress_fn=None):
             )
         )
 
+    return root_bone
+
+
+def write_animfiles(root_bone, anim_ranges, progress=None, prune_bones=False):
+    """
+        Writes one .anim file per (animpath, start, end) range. The scene is sampled once over every frame used by any
+        range, and each file is then sliced from those samples. Constant channels are not written, and bones without
+        any animated channels are left out entirely when prune_bones is set.
+    """
+    for animpath, timestart, timeend in anim_ranges:
+        if timestart != int(timestart) or timeend != int(timeend):
+            raise RuntimeError(
+                "Invalid animation range selected ({0},{1}). Only whole frames are supported.".format(timestart, timeend)
+            )
+    anim_ranges = [(animpath, int(timestart), int(timeend)) for animpath, timestart, timeend in anim_ranges]
+
+    fps = get_animation_fps()  # pmc.mel.currentTimeUnitToFPS()
+    ndigits = (PDX_ROUND_TRANS, PDX_ROUND_ROT, PDX_ROUND_SCALE)
+
     # populate bone data, assume that the skeleton to be exported starts at the scene root bone
     export_bones = get_skeleton_hierarchy([root_bone])
-    info_xml.set('j', [len(export_bones)])
 
-    # parse the scene animation data
-    all_bone_keyframes = get_scene_animdata(export_bones, timestart, timeend)
+    # parse the scene animation data, once for all ranges and reusing any frames sampled by an earlier export
+    frames = sorted(set(f for _, timestart, timeend in anim_ranges for f in xrange(timestart, timeend + 1)))
+    frame_index = dict((f, i) for i, f in enumerate(frames))
+    IO_PDX_LOG.info("sampling {0} frames -".format(len(frames)))
+    if progress:
+        progress.update(1, 'sampling frames')
+    bone_poses = get_cached_posedata(export_bones, frames)
+
+    for animpath, timestart, timeend in anim_ranges:
+        IO_PDX_LOG.info("writing {0} -".format(animpath))
+        if progress:
+            progress.update(1, 'writing keyframes')
+        first, last = frame_index[timestart], frame_index[timeend] + 1
+        clip_poses = OrderedDict((name, poses[first:last]) for name, poses in bone_poses.items())
+        # each clip starts from a positive w, independent of any frames sampled before it for other ranges
+        clip_poses = pdx_anim.clean_pose_rotations(clip_poses)
+
+        all_bone_keyframes = pdx_anim.get_animation_channels(clip_poses, ndigits)
+        pruned_size = pdx_anim.get_pruned_size(clip_poses, all_bone_keyframes)
+        IO_PDX_LOG.info("pruned constant channels, saving {0} bytes".format(pruned_size))
+        if prune_bones:
+            clip_poses, all_bone_keyframes = pdx_anim.prune_static_bones(clip_poses, all_bone_keyframes)
+
+        for bone_name in all_bone_keyframes:
+            bone_keys = all_bone_keyframes[bone_name]
+            if bone_keys:
+                IO_PDX_LOG.info("writing {0} keyframes for bone '{1}'".format(list(bone_keys.keys()), bone_name))
+
+        # write the binary file from our XML structure
+        root_xml = pdx_anim.create_anim_xml(fps, clip_poses, all_bone_keyframes, ndigits)
+        pdx_data.write_animfile(animpath, root_xml)
+
+
+def export_animfile(animpath, timestart=1, timeend=10, progress_fn=None, prune_bones=False):
+    start = time.time()
+    IO_PDX_LOG.info("exporting {0}".format(animpath))
 
-    # for each bone, write sample types and describe the initial offset from parent
-    IO_PDX_LOG.info("writing initial bone transforms -")
+    progress = None
     if progress_fn:
-        progress.update(1, 'writing initial bone transforms')
-    pmc.currentTime(timestart, edit=True)
-    for bone in export_bones:
-        bone_xml = Xml.SubElement(info_xml, bone.name())
+        progress = progress_fn('Exporting', 10)
 
-        # check sample types
-        sample_types = ''
-        for attr in ['t', 'q', 's']:
-            if attr in all_bone_keyframes[bone.name()]:
-                sample_types += attr
-        bone_xml.set('sa', [sample_types])
+    write_animfiles(get_animation_root_bone(), [(animpath, timestart, timeend)], progress, prune_bones)
 
-        # convert to Game space
-        _translation = swap_coord_space(bone.getTranslation())
-        # bone rotation must be pre-multiplied by joint orientation
-        _rotation = swap_coord_space(bone.getRotation(quaternion=True) * bone.getOrientation())
-        _scale = [bone.getScale()[0]]  # animation supports uniform scale only
-
-        bone_xml.set('t', util_round(list(_translation), PDX_ROUND_TRANS))
-        bone_xml.set('q', util_round(list(_rotation), PDX_ROUND_ROT))
-        bone_xml.set('s', util_round(list(_scale), PDX_ROUND_SCALE))
-
-    # create root element for animation keyframe data
-    samples_xml = Xml.SubElement(root_xml, 'samples')
-    IO_PDX_LOG.info("writing keyframes -")
+    pmc.select(None)
+    IO_PDX_LOG.info("export finished! ({0:.4f} sec)".format(time.time() - start))
     if progress_fn:
-        progress.update(1, 'writing keyframes')
-    for bone_name in all_bone_keyframes:
-        bone_keys = all_bone_keyframes[bone_name]
-        if bone_keys:
-            IO_PDX_LOG.info("writing {0} keyframes for bone '{1}'".format(list(bone_keys.keys()), bone_name))
-
-    # pack all scene animation data into flat keyframe lists
-    t_packed, q_packed, s_packed = [], [], []
-    for i in xrange(frame_samples):
-        for bone in all_bone_keyframes:
-            # TODO: list.pop(0) can be slow? test deque.popleft() for potential speedup
-            if 't' in all_bone_keyframes[bone]:
-                t_packed.extend(all_bone_keyframes[bone]['t'].pop(0))
-            if 'q' in all_bone_keyframes[bone]:
-                q_packed.extend(all_bone_keyframes[bone]['q'].pop(0))
-            if 's' in all_bone_keyframes[bone]:
-                s_packed.append(all_bone_keyframes[bone]['s'].pop(0)[0])  # support uniform scale only
-
-    if t_packed:
-        samples_xml.set('t', t_packed)
-    if q_packed:
-        samples_xml.set('q', q_packed)
-    if s_packed:
-        samples_xml.set('s', s_packed)
+        progress.finished()
 
-    # write the binary file from our XML structure
-    pdx_data.write_animfile(animpath, root_xml)
 
-    pmc.currentTime(curr_frame, edit=True)
+def export_animclips(animdir, clip_names=None, progress_fn=None, prune_bones=False):
+    """
+        Exports animation clips stored on the scene root bone, one .anim file per clip named after the clip, in a single
+        pass over the scene. Exports all clips unless a list of clip names is given.
+    """
+    start = time.time()
+    IO_PDX_LOG.info("exporting animation clips to {0}".format(animdir))
+
+    root_bone = get_animation_root_bone()
+    anim_clips = [clip for clip in get_animation_clips([root_bone]) if clip_names is None or clip.name in clip_names]
+    if not anim_clips:
+        raise RuntimeError("No animation clips found to export on root bone {0}.".format(root_bone))
+
+    progress = None
+    if progress_fn:
+        progress = progress_fn('Exporting', len(anim_clips) + 1)
+
+    anim_ranges = [(os.path.join(animdir, clip.name + '.anim'), clip.start, clip.end) for clip in anim_clips]
+    write_animfiles(root_bone, anim_ranges, progress, prune_bones)
 
     pmc.select(None)
     IO_PDX_LOG.info("export finished! ({0:.4f} sec)".format(time.time() - start))
@@ -34,11 +34,13 @@ try:
     reload(maya_import_export)
     from .maya_import_export import (
         create_shader,
+        export_animclips,
         export_animfile,
         export_meshfile,
         get_animation_clips,
         get_mesh_index,
         import_animfile,
+        import_animfiles,
         import_meshfile,
         list_scene_materials,
         list_scene_pdx_meshes,
@@ -177,6 +179,10 @@ class PDXmaya_ui(QtWidgets.QDialog):
         file_export_anim.triggered.connect(lambda: self.do_export_anim(select_path=True))
         set_action_icon(file_export_anim, 'out_renderLayer.png')
 
+        file_export_animclips = QtWidgets.QAction('Save selected animations ...', self)
+        file_export_animclips.triggered.connect(lambda: self.do_export_animclips(select_path=True))
+        set_action_icon(file_export_animclips, 'out_renderLayer.png')
+
         # tools menu
         tool_ignore_joints = QtWidgets.QAction('Ignore selected joints', self)
         tool_ignore_joints.triggered.connect(lambda: set_ignore_joints(True))
@@ -233,7 +239,7 @@ class PDXmaya_ui(QtWidgets.QDialog):
         # add all actions and separators to menus
         file_menu.addActions([file_import, file_import_mesh, file_import_anim])
         file_menu.addSeparator()
-        file_menu.addActions([file_export, file_export_mesh, file_export_anim])
+        file_menu.addActions([file_export, file_export_mesh, file_export_anim, file_export_animclips])
 
         tools_menu.addActions([tool_ignore_joints, tool_unignore_joints])
         tools_menu.addSeparator()
@@ -314,24 +320,25 @@ class PDXmaya_ui(QtWidgets.QDialog):
     @QtCore.Slot()
     def do_import_anim(self):
         last_dir = IO_PDX_SETTINGS.last_import_anim or ''
-        filepath, filefilter = QtWidgets.QFileDialog.getOpenFileName(
-            self, caption='Select .anim file', dir=last_dir, filter='PDX Animation files (*.anim)'
+        filepaths, filefilter = QtWidgets.QFileDialog.getOpenFileNames(
+            self, caption='Select .anim files', dir=last_dir, filter='PDX Animation files (*.anim)'
         )
 
-        if filepath != '':
-            filepath = os.path.abspath(filepath)
-            if os.path.splitext(filepath)[1] == '.anim':
+        if filepaths:
+            filepaths = [os.path.abspath(filepath) for filepath in filepaths]
+            invalid = [filepath for filepath in filepaths if os.path.splitext(filepath)[1] != '.anim']
+            if not invalid:
                 if self.popup:
                     self.popup.close()
-                self.popup = import_popup(filepath, parent=self)
+                self.popup = import_popup(filepaths, parent=self)
                 self.popup.show()
-                IO_PDX_SETTINGS.last_import_anim = filepath
+                IO_PDX_SETTINGS.last_import_anim = filepaths[0]
             else:
                 reply = QtWidgets.QMessageBox.warning(
                     self, 'READ ERROR',
                     'Unable to read selected file. The filepath ... '
                     '\n\n\t{0}'
-                    '\n ... is not a .anim file!'.format(filepath),
+                    '\n ... is not a .anim file!'.format(invalid[0]),
                     QtWidgets.QMessageBox.Ok, defaultButton=QtWidgets.QMessageBox.Ok
                 )
                 if reply == QtWidgets.QMessageBox.Ok:
@@ -372,6 +379,7 @@ class PDXmaya_ui(QtWidgets.QDialog):
                 exp_skel=export_opts.chk_skeleton.isChecked(),
                 exp_locs=export_opts.chk_locators.isChecked(),
                 merge_verts=export_opts.chk_merge_vtx.isChecked(),
+                lodperc=export_opts.txt_lodperc.text().replace(',', ' ').split(),
                 progress_fn=MayaProgress,
             )
             QtWidgets.QMessageBox.information(self, 'SUCCESS', 'Mesh export finished!\n\n{0}'.format(meshpath))
@@ -417,6 +425,7 @@ class PDXmaya_ui(QtWidgets.QDialog):
                 timestart=pmc.playbackOptions(query=True, minTime=True),
                 timeend=pmc.playbackOptions(query=True, maxTime=True),
                 progress_fn=MayaProgress,
+                prune_bones=export_opts.chk_prune_bones.isChecked(),
             )
             QtWidgets.QMessageBox.information(self, 'SUCCESS', 'Animation export finished!\n\n{0}'.format(animpath))
             IO_PDX_SETTINGS.last_export_anim = animpath
@@ -427,6 +436,60 @@ class PDXmaya_ui(QtWidgets.QDialog):
             MayaProgress.finished()
             raise
 
+    @QtCore.Slot()
+    def do_export_animclips(self, select_path=False):
+        export_opts = self.export_ctrls
+        filepath, filename = export_opts.get_export_path()
+
+        # validate directory
+        if filepath == '' or select_path:
+            last_dir = os.path.dirname(IO_PDX_SETTINGS.last_export_anim or '')
+            filepath = QtWidgets.QFileDialog.getExistingDirectory(self, caption='Select export folder', dir=last_dir)
+            if filepath != '':
+                export_opts.txt_path.setText(filepath)
+        if not os.path.isdir(filepath):
+            reply = QtWidgets.QMessageBox.warning(
+                self, 'WRITE ERROR',
+                'Unable to export content. The filepath ... '
+                '\n\n\t{0}'
+                '\n ... is not a valid location!'.format(filepath),
+                QtWidgets.QMessageBox.Ok, defaultButton=QtWidgets.QMessageBox.Ok
+            )
+            if reply == QtWidgets.QMessageBox.Ok:
+                IO_PDX_LOG.info("Nothing to export.")
+            return
+
+        # one .anim file per selected animation clip, named after the clip
+        clip_names = [item.data(QtCore.Qt.UserRole)[0] for item in export_opts.list_animations.selectedItems()]
+        if not clip_names:
+            reply = QtWidgets.QMessageBox.warning(
+                self, 'WRITE ERROR',
+                'Unable to export content. No animations are selected!',
+                QtWidgets.QMessageBox.Ok, defaultButton=QtWidgets.QMessageBox.Ok
+            )
+            if reply == QtWidgets.QMessageBox.Ok:
+                IO_PDX_LOG.info("Nothing to export.")
+            return
+        animdir = os.path.abspath(filepath)
+
+        try:
+            export_animclips(
+                animdir,
+                clip_names=clip_names,
+                progress_fn=MayaProgress,
+                prune_bones=export_opts.chk_prune_bones.isChecked(),
+            )
+            QtWidgets.QMessageBox.information(
+                self, 'SUCCESS', 'Animation export finished!\n\n{0}'.format('\n'.join(clip_names))
+            )
+            IO_PDX_SETTINGS.last_export_anim = os.path.join(animdir, clip_names[0] + '.anim')
+        except Exception as err:
+            IO_PDX_LOG.warning("FAILED to export {0}".format(animdir))
+            IO_PDX_LOG.error(err)
+            QtWidgets.QMessageBox.critical(self, 'FAILURE', 'Animation export failed!\n\n{0}'.format(err))
+            MayaProgress.finished()
+            raise
+
     def edit_mesh_order(self):
         if self.popup:
             self.popup.close()
@@ -505,6 +568,10 @@ class export_controls(QtWidgets.QWidget):
         self.chk_merge_obj = QtWidgets.QCheckBox('Merge objects')
         self.chk_timeline = QtWidgets.QCheckBox('Export current timeline')
         self.chk_animation = QtWidgets.QCheckBox('Export all selected animations')
+        self.chk_prune_bones = QtWidgets.QCheckBox('Prune static bones')
+        self.chk_prune_bones.setToolTip(
+            'Leave out bones without any animated channels, these are then held in their bind pose by the game.'
+        )
         self.chk_create_extra = QtWidgets.QCheckBox('Create .gfx and .asset')
         for ctrl in [self.chk_mesh, self.chk_skeleton, self.chk_locators, self.chk_merge_vtx]:
             ctrl.setChecked(True)
@@ -518,6 +585,12 @@ class export_controls(QtWidgets.QWidget):
         lbl_file = QtWidgets.QLabel('Filename:')
         self.txt_file = QtWidgets.QLineEdit()
         self.txt_file.setPlaceholderText('placeholder_name.mesh')
+        lbl_lodperc = QtWidgets.QLabel('LOD switches:')
+        self.txt_lodperc = QtWidgets.QLineEdit()
+        self.txt_lodperc.setPlaceholderText('eg. 50, 25')
+        self.txt_lodperc.setToolTip(
+            'LOD switches, the percentage size of the bounding sphere at which each LOD switches to the next.'
+        )
         self.btn_export = QtWidgets.QPushButton('Export ...', self)
 
         # TODO: re-enable these once supported
@@ -527,8 +600,6 @@ class export_controls(QtWidgets.QWidget):
         self.btn_anim_refresh.setDisabled(True)
         self.chk_create_extra.setDisabled(True)
         self.chk_merge_obj.setDisabled(True)
-        self.chk_timeline.setDisabled(True)
-        self.chk_animation.setDisabled(True)
 
         # create layouts
         main_layout = QtWidgets.QHBoxLayout()
@@ -608,16 +679,19 @@ class export_controls(QtWidgets.QWidget):
         grp_export_layout.addWidget(h_line(), 4, 1, 1, 2)
         grp_export_layout.addWidget(self.chk_timeline, 5, 1, 1, 2)
         grp_export_layout.addWidget(self.chk_animation, 6, 1, 1, 2)
-        grp_export_layout.addWidget(h_line(), 7, 1, 1, 2)
-        grp_export_layout.addWidget(self.chk_create_extra, 8, 1, 1, 2)
-        grp_export_layout.addWidget(h_line(), 9, 1, 1, 2)
-        grp_export_layout.addLayout(grp_export_fields_layout, 10, 1, 1, 2)
+        grp_export_layout.addWidget(self.chk_prune_bones, 7, 1, 1, 2)
+        grp_export_layout.addWidget(h_line(), 8, 1, 1, 2)
+        grp_export_layout.addWidget(self.chk_create_extra, 9, 1, 1, 2)
+        grp_export_layout.addWidget(h_line(), 10, 1, 1, 2)
+        grp_export_layout.addLayout(grp_export_fields_layout, 11, 1, 1, 2)
         grp_export_fields_layout.addWidget(lbl_path, 1, 1)
         grp_export_fields_layout.addWidget(self.txt_path, 1, 2)
         grp_export_fields_layout.addWidget(self.btn_path, 1, 3)
         grp_export_fields_layout.addWidget(lbl_file, 2, 1)
         grp_export_fields_layout.addWidget(self.txt_file, 2, 2, 1, 2)
-        grp_export_layout.addWidget(self.btn_export, 11, 1, 1, 2)
+        grp_export_fields_layout.addWidget(lbl_lodperc, 3, 1)
+        grp_export_fields_layout.addWidget(self.txt_lodperc, 3, 2, 1, 2)
+        grp_export_layout.addWidget(self.btn_export, 12, 1, 1, 2)
 
     def connect_signals(self):
         self.list_materials.itemClicked.connect(self.select_mat)
@@ -737,8 +811,11 @@ class export_controls(QtWidgets.QWidget):
         if self.chk_mesh.isChecked() or self.chk_skeleton.isChecked() or self.chk_locators.isChecked():
             self.parent.do_export_mesh()
 
-        if self.chk_timeline.isChecked() or self.chk_animation.isChecked():
-            pass
+        if self.chk_timeline.isChecked():
+            self.parent.do_export_anim()
+
+        if self.chk_animation.isChecked():
+            self.parent.do_export_animclips()
 
 
 class import_popup(QtWidgets.QWidget):
@@ -746,8 +823,10 @@ class import_popup(QtWidgets.QWidget):
     def __init__(self, filepath, parent=None):
         super(import_popup, self).__init__(parent)
 
-        self.pdx_file = filepath
-        self.pdx_type = os.path.splitext(filepath)[1]
+        # animations can be imported in bulk, from a list of filepaths
+        self.pdx_files = filepath if isinstance(filepath, list) else [filepath]
+        self.pdx_file = self.pdx_files[0]
+        self.pdx_type = os.path.splitext(self.pdx_file)[1]
         self.parent = parent
 
         self.setWindowTitle('Import options')
@@ -764,6 +843,9 @@ class import_popup(QtWidgets.QWidget):
     def create_controls(self):
         # create controls
         lbl_filepath = QtWidgets.QLabel('Filename:  {0}'.format(os.path.split(self.pdx_file)[-1]))
+        if len(self.pdx_files) > 1:
+            lbl_filepath.setText('Filenames:  {0} files'.format(len(self.pdx_files)))
+            lbl_filepath.setToolTip('\n'.join(os.path.split(filepath)[-1] for filepath in self.pdx_files))
         self.btn_import = QtWidgets.QPushButton('Import ...', self)
         self.btn_import.setToolTip('Select a {0} file to import.'.format(self.pdx_type))
         self.btn_cancel = QtWidgets.QPushButton('Cancel', self)
@@ -836,11 +918,18 @@ class import_popup(QtWidgets.QWidget):
     def import_anim(self):
         try:
             self.close()
-            import_animfile(
-                self.pdx_file,
-                timestart=self.spn_start.value(),
-                progress_fn=MayaProgress,
-            )
+            if len(self.pdx_files) > 1:
+                import_animfiles(
+                    self.pdx_files,
+                    timestart=self.spn_start.value(),
+                    progress_fn=MayaProgress,
+                )
+            else:
+                import_animfile(
+                    self.pdx_file,
+                    timestart=self.spn_start.value(),
+                    progress_fn=MayaProgress,
+                )
             self.parent.refresh_gui()
         except Exception as err:
             IO_PDX_LOG.warning("FAILED to import {0}".format(self.pdx_file))
@@ -0,0 +1,150 @@
+"""
+    Paradox asset files, DCC independent skeleton model.
+
+    Describes a bone hierarchy by bone index, with lookups for parents, children and names built once up front, so that
+    walking or searching the hierarchy never has to scan the whole bone list. Also evaluates poses of the hierarchy
+    (forward kinematics) for many frames at once, without needing a DCC scene.
+
+    author : ross-g
+"""
+
+from __future__ import division
+
+try:
+    from . import pdx_math
+except (ImportError, ValueError):
+    import pdx_math
+
+
+""" ====================================================================================================================
+    Skeleton class.
+========================================================================================================================
+"""
+
+
+class PDXSkeleton(object):
+    """
+        Bone hierarchy as parallel lists, indexed by bone index. Root bones have a parent index of -1.
+        Optionally stores each bones 12 float inverse world-space transform, as found in .mesh files.
+    """
+
+    def __init__(self, names, parents, transforms=None):
+        self.names = list(names)
+        self.parents = [-1 if p is None else p for p in parents]
+        self.transforms = transforms
+
+        if len(self.names) != len(self.parents):
+            raise ValueError("Mismatched bone names and parents. ({0}, {1})".format(len(names), len(parents)))
+
+        # build lookups once
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.children = [[] for _ in self.names]
+        self.roots = []
+        for i, parent in enumerate(self.parents):
+            if parent < 0:
+                self.roots.append(i)
+            else:
+                self.children[parent].append(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_pdx_bones(cls, pdx_bone_list):
+        """
+            Builds the skeleton from a list of PDXData bone objects, read from a .mesh file skeleton.
+        """
+        count = len(pdx_bone_list)
+        names, parents, transforms = [None] * count, [-1] * count, [None] * count
+
+        for bone in pdx_bone_list:
+            index = bone.ix[0]
+            names[index] = bone.name
+            parents[index] = getattr(bone, 'pa', [-1])[0]
+            transforms[index] = bone.tx
+
+        return cls(names, parents, transforms)
+
+    @classmethod
+    def from_hierarchy(cls, bones, parent_bones, names=None):
+        """
+            Builds the skeleton from a list of hashable bone keys (eg. scene nodes or unique names) and their parents.
+            Any parent not in the bone list makes that bone a root.
+        """
+        lookup = {bone: i for i, bone in enumerate(bones)}
+        parents = [lookup.get(parent, -1) for parent in parent_bones]
+
+        return cls(bones if names is None else names, parents)
+
+    def get_depth_levels(self):
+        """
+            Returns lists of bone indices by depth in the hierarchy, starting with the roots. Every bone in a level has
+            its parent in the level before, so each level can be evaluated as one batch.
+        """
+        levels = []
+        level = list(self.roots)
+        while level:
+            levels.append(level)
+            level = [child for i in level for child in self.children[i]]
+
+        return levels
+
+    def get_bind_matrices(self):
+        """
+            Returns the world-space and parent-relative bind matrix of each bone, from the stored inverse world-space
+            transforms. Bones are in the same space as the transforms.
+        """
+        if self.transforms is None:
+            raise RuntimeError("Skeleton has no bind transforms.")
+
+        world_matrices = pdx_math.invert_matrices(pdx_math.tx_to_matrices(self.transforms))
+        local_matrices = list(world_matrices)
+
+        # parent-relative matrix is the world matrix with the parents world matrix removed
+        children = [i for i, parent in enumerate(self.parents) if parent >= 0]
+        parent_inverses = pdx_math.tx_to_matrices([self.transforms[self.parents[i]] for i in children])
+        child_matrices = pdx_math.multiply_matrices([world_matrices[i] for i in children], parent_inverses)
+        for i, matrix in zip(children, child_matrices):
+            local_matrices[i] = matrix
+
+        return world_matrices, local_matrices
+
+    def get_world_matrices(self, local_matrices):
+        """
+            Forward kinematics, returns world-space matrices from parent-relative matrices. Takes a list per frame of
+            matrices per bone, and returns the same layout. Each level of the hierarchy is multiplied for every frame
+            at once.
+        """
+        world_matrices = [list(frame) for frame in local_matrices]
+
+        for level in self.get_depth_levels()[1:]:
+            pairs = [(frame, i) for frame in world_matrices for i in level]
+            results = pdx_math.multiply_matrices(
+                [frame[i] for frame, i in pairs], [frame[self.parents[i]] for frame, i in pairs]
+            )
+            for (frame, i), matrix in zip(pairs, results):
+                frame[i] = matrix
+
+        return world_matrices
+
+    def evaluate_poses(self, frame_poses):
+        """
+            Returns world-space matrices for a list per frame of parent-relative poses per bone. Poses are (translation,
+            rotation, scale) tuples with (x, y, z, w) quaternions as in .anim files, bones with a pose of None are held
+            in their bind pose.
+        """
+        bind_locals = self.get_bind_matrices()[1] if self.transforms is not None else None
+
+        local_matrices = []
+        for poses in frame_poses:
+            posed = [i for i, pose in enumerate(poses) if pose is not None]
+            if len(posed) < len(poses) and bind_locals is None:
+                raise RuntimeError("Skeleton has no bind transforms to use for unposed bones.")
+
+            frame = list(bind_locals) if bind_locals is not None else [None] * len(poses)
+            translations, rotations, scales = zip(*[poses[i] for i in posed]) if posed else ([], [], [])
+            for i, matrix in zip(posed, pdx_math.compose_matrices(translations, rotations, scales)):
+                frame[i] = matrix
+            local_matrices.append(frame)
+
+        return self.get_world_matrices(local_matrices)
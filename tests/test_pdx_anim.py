@@ -0,0 +1,197 @@
+"""
+    Paradox asset files, headless animation clip editing tests.
+
+    Run from the repository root with
+        python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import math
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdx_anim  # noqa: E402
+import pdx_math  # noqa: E402
+
+
+def make_poses(framecount):
+    return OrderedDict(
+        [
+            ('root', [((0.0, 0.0, float(f)), (0.0, 0.0, 0.0, 1.0), (1.0,)) for f in range(framecount)]),
+            ('arm', [((1.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0), (1.0 + f,)) for f in range(framecount)]),
+        ]
+    )
+
+
+class TestResamplePoses(unittest.TestCase):
+    def test_single_frame(self):
+        poses = make_poses(1)
+        for new_fps in [15, 30, 60]:
+            resampled = pdx_anim.resample_poses(poses, 30, new_fps)
+            self.assertEqual(resampled, poses)
+
+    def test_two_frames_down(self):
+        poses = make_poses(2)
+        resampled = pdx_anim.resample_poses(poses, 30, 15)
+        for name in poses:
+            self.assertEqual(len(resampled[name]), 1)
+            self.assertEqual(resampled[name][0], poses[name][0])
+
+    def test_two_frames_up(self):
+        poses = make_poses(2)
+        resampled = pdx_anim.resample_poses(poses, 30, 60)
+        self.assertEqual(len(resampled['root']), 3)
+        self.assertAlmostEqual(resampled['root'][1][0][2], 0.5)
+        self.assertEqual(resampled['root'][-1], poses['root'][-1])
+
+    def test_trimmed_to_short_clip(self):
+        poses = make_poses(10)
+        for start, end in [(4, 4), (4, 5)]:
+            trimmed = pdx_anim.trim_poses(poses, start, end)
+            self.assertEqual(len(trimmed['root']), end - start + 1)
+            for new_fps in [15, 60]:
+                resampled = pdx_anim.resample_poses(trimmed, 30, new_fps)
+                self.assertEqual(resampled['root'][0], poses['root'][start])
+
+
+class TestEditPoses(unittest.TestCase):
+    def assertPoseAlmostEqual(self, pose, expected):
+        for values, expected_values in zip(pose, expected):
+            self.assertEqual(len(values), len(expected_values))
+            for value, expected_value in zip(values, expected_values):
+                self.assertAlmostEqual(value, expected_value)
+
+    def test_interpolate_midpoint(self):
+        half = math.pi / 8.0
+        pose_a = ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0), (1.0,))
+        pose_b = ((0.0, 0.0, 2.0), (0.0, 0.0, math.sin(2.0 * half), math.cos(2.0 * half)), (3.0,))
+        midpoint = pdx_anim.interpolate_poses([pose_a], [pose_b], [0.5])[0]
+
+        # halfway translation and scale, and half of the 90 degree rotation
+        self.assertPoseAlmostEqual(midpoint, ((0.0, 0.0, 1.0), (0.0, 0.0, math.sin(half), math.cos(half)), (2.0,)))
+
+    def test_slerp_shortest_path(self):
+        # the same rotation with a flipped sign blends along the short path, not through a full turn
+        q = (0.0, 0.0, math.sin(math.pi / 8.0), math.cos(math.pi / 8.0))
+        flipped = tuple(-x for x in q)
+        midpoint = pdx_math.slerp_quaternions([q], [flipped], [0.5])[0]
+        self.assertPoseAlmostEqual([midpoint], [q])
+
+    def test_concat(self):
+        poses = pdx_anim.concat_poses([make_poses(2), make_poses(3)])
+        self.assertEqual(pdx_anim.get_framecount(poses), 5)
+        self.assertEqual(poses['root'][2], make_poses(3)['root'][0])
+
+    def test_concat_mismatched(self):
+        other = make_poses(2)
+        other['hand'] = other.pop('arm')
+        with self.assertRaises(ValueError):
+            pdx_anim.concat_poses([make_poses(2), other])
+
+    def test_loop_close(self):
+        poses = make_poses(6)
+        for blend_frames in [1, 3]:
+            looped = pdx_anim.loop_close_poses(poses, blend_frames)
+            for name in poses:
+                self.assertEqual(len(looped[name]), 6)
+                self.assertPoseAlmostEqual(looped[name][-1], poses[name][0])
+                # frames before the blend are untouched
+                self.assertEqual(looped[name][: 6 - blend_frames], poses[name][: 6 - blend_frames])
+
+
+class TestAnimationChannels(unittest.TestCase):
+    NDIGITS = (pdx_anim.PDX_ROUND_TRANS, pdx_anim.PDX_ROUND_ROT, pdx_anim.PDX_ROUND_SCALE)
+
+    def make_translations(self, values):
+        return OrderedDict([('root', [((0.0, 1.0, z), (0.0, 0.0, 0.0, 1.0), (1.0,)) for z in values])])
+
+    def test_noise_dropped(self):
+        # sampling noise smaller than one quantization step is not animation
+        poses = self.make_translations([5.0, 5.0004, 4.9996, 5.0003])
+        channels = pdx_anim.get_animation_channels(poses, self.NDIGITS)
+        self.assertEqual(channels['root'], {})
+
+    def test_step_kept(self):
+        # a real change of exactly one quantization step is animation
+        poses = self.make_translations([1.0, 1.0, 1.001, 1.001])
+        channels = pdx_anim.get_animation_channels(poses, self.NDIGITS)
+        self.assertEqual(list(channels['root']), ['t'])
+        self.assertEqual([t[2] for t in channels['root']['t']], [1.0, 1.0, 1.001, 1.001])
+
+    def test_pruned_size(self):
+        # root animates translation only and arm animates scale only, of 8 values per bone per frame
+        poses = make_poses(4)
+        poses['hand'] = [((2.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0), (1.0,))] * 4
+        channels = pdx_anim.get_animation_channels(poses, self.NDIGITS)
+        self.assertEqual([sorted(channels[name]) for name in poses], [['t'], ['s'], []])
+        self.assertEqual(pdx_anim.get_pruned_size(poses, channels), 4 * 4 * (3 * 8 - 3 - 1))
+
+        pruned_poses, pruned_channels = pdx_anim.prune_static_bones(poses, channels)
+        self.assertEqual(list(pruned_poses), ['root', 'arm'])
+        self.assertEqual(list(pruned_channels), ['root', 'arm'])
+
+
+class TestPoseCache(unittest.TestCase):
+    def sample(self, frames):
+        self.sampled.extend(frames)
+        poses = make_poses(max(frames) + 1)
+        return OrderedDict((name, [bone_poses[f] for f in frames]) for name, bone_poses in poses.items())
+
+    def setUp(self):
+        self.cache = pdx_anim.PDXPoseCache()
+        self.sampled = []
+
+    def test_reuses_frames(self):
+        self.cache.get_poses('rig', [0, 1, 2], self.sample)
+        poses = self.cache.get_poses('rig', [1, 2, 3], self.sample)
+        self.assertEqual(self.sampled, [0, 1, 2, 3])
+        self.assertEqual(poses['root'], make_poses(4)['root'][1:])
+
+    def test_same_range_cached(self):
+        # exporting the same range again, with the scene unchanged, samples no frames at all
+        first = self.cache.get_poses('rig', [0, 1, 2], self.sample)
+        self.sampled = []
+        second = self.cache.get_poses('rig', [0, 1, 2], self.sample)
+        self.assertEqual(self.sampled, [])
+        self.assertEqual(second, first)
+
+    def test_cleared_while_sampling(self):
+        self.cache.get_poses('rig', [0, 1], self.sample)
+
+        def clearing_sample(frames):
+            self.cache.clear()
+            return self.sample(frames)
+
+        poses = self.cache.get_poses('rig', [0, 1, 2], clearing_sample)
+        self.assertEqual(poses['arm'], make_poses(3)['arm'])
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestProcessAnimfiles(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_resample_short_files(self):
+        in_dir, out_dir = os.path.join(self.tempdir, 'in'), os.path.join(self.tempdir, 'out')
+        os.makedirs(in_dir)
+        for framecount in [1, 2]:
+            pdx_anim.write_animation(os.path.join(in_dir, '{0}.anim'.format(framecount)), 30, make_poses(framecount))
+
+        pdx_anim.main([in_dir, out_dir, '--fps', '15', '--processes', '1'])
+
+        for framecount in [1, 2]:
+            fps, bone_poses = pdx_anim.read_animation(os.path.join(out_dir, '{0}.anim'.format(framecount)))
+            self.assertEqual(fps, 15.0)
+            self.assertEqual(pdx_anim.get_framecount(bone_poses), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+    Paradox asset files, skeleton and animation compatibility checker tests.
+
+    Run from the repository root with
+        python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import copy
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdx_anim  # noqa: E402
+import pdx_data  # noqa: E402
+import pdx_check  # noqa: E402
+from test_pdx_data import make_mesh_xml  # noqa: E402
+from test_pdx_anim import make_poses  # noqa: E402
+
+
+def get_structure(element):
+    # nested tuples of element tag and children, ignoring attributes
+    return element.tag, [get_structure(child) for child in element]
+
+
+def make_two_skeleton_xml():
+    # the skinned triangle, plus a second shape skinned to a different skeleton
+    root_xml = make_mesh_xml()
+    shape_xml = copy.deepcopy(root_xml.find('object/triangleShape'))
+    skeleton_xml = shape_xml.find('skeleton')
+    skeleton_xml.remove(skeleton_xml.find('arm'))
+    leg_xml = copy.deepcopy(root_xml.find('object/triangleShape/skeleton/arm'))
+    leg_xml.tag = 'leg'
+    skeleton_xml.append(leg_xml)
+    root_xml.find('object').append(shape_xml)
+    return root_xml
+
+
+class TestCheckAnimation(unittest.TestCase):
+    def setUp(self):
+        self.mesh_bones = [['root', 'arm'], ['root', 'leg']]
+        self.bone_index = pdx_check.get_bone_index(self.mesh_bones)
+
+    def test_fits(self):
+        self.assertEqual(pdx_check.check_animation(['root', 'arm'], self.mesh_bones, self.bone_index), ([0], None, []))
+
+    def test_missing_bones(self):
+        result = pdx_check.check_animation(['root', 'arm', 'tail'], self.mesh_bones, self.bone_index)
+        self.assertEqual(result, ([], 0, ['tail']))
+
+    def test_no_skeletons(self):
+        self.assertEqual(pdx_check.check_animation(['root'], [], {}), ([], None, ['root']))
+
+    def test_cleaned_names(self):
+        names = [pdx_check.clean_imported_name(name) for name in ['chr:root', 'chr:arm|hand']]
+        self.assertEqual(names, ['root', 'arm_hand'])
+
+
+class TestProbeFiles(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.meshpath = os.path.join(self.tempdir, 'triangle.mesh')
+        self.animpath = os.path.join(self.tempdir, 'triangle.anim')
+        pdx_data.write_meshfile(self.meshpath, make_two_skeleton_xml())
+        pdx_anim.write_animation(self.animpath, 30, make_poses(4))
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_mesh_probe(self):
+        # reading no properties gives the same element tree as a full read, without any values
+        full_elem = pdx_data.read_meshfile(self.meshpath)
+        probe_elem = pdx_data.read_meshfile(self.meshpath, properties=[])
+        self.assertEqual(get_structure(probe_elem), get_structure(full_elem))
+        self.assertEqual([elem.tag for elem in probe_elem.iter() if elem is not probe_elem and elem.attrib], [])
+
+    def test_anim_probe(self):
+        # reading only the bone count gives the same element tree and bone count as a full read
+        full_elem = pdx_data.read_meshfile(self.animpath)
+        probe_elem = pdx_data.read_meshfile(self.animpath, properties=['j'])
+        self.assertEqual(get_structure(probe_elem), get_structure(full_elem))
+        self.assertEqual(dict(probe_elem.find('info').attrib), {'j': full_elem.find('info').attrib['j']})
+        self.assertEqual(pdx_check.get_anim_bones(self.animpath), (2, ['root', 'arm']))
+
+    def test_mesh_bones(self):
+        self.assertEqual(pdx_check.get_mesh_bones(self.meshpath), [['root', 'arm'], ['root', 'leg']])
+
+    def test_check_library(self):
+        # each skeleton is checked on its own, the .mesh file is listed once when both skeletons fit
+        root_animpath = os.path.join(self.tempdir, 'root.anim')
+        poses = make_poses(4)
+        del poses['arm']
+        pdx_anim.write_animation(root_animpath, 30, poses)
+
+        results = pdx_check.check_library([self.meshpath], [self.animpath, root_animpath], processes=1)
+        self.assertEqual([result.meshpaths for result in results], [[self.meshpath], [self.meshpath]])
+        self.assertEqual([result.missing_bones for result in results], [[], []])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+    Paradox asset files, binary file read/write tests.
+
+    Run from the repository root with
+        python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+try:
+    import xml.etree.cElementTree as Xml
+except ImportError:
+    import xml.etree.ElementTree as Xml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdx_data  # noqa: E402
+
+
+def make_mesh_xml():
+    # a skinned triangle with a two bone skeleton and a locator, laid out as the exporters write it
+    root_xml = Xml.Element('File')
+    root_xml.set('pdxasset', [1, 0])
+
+    object_xml = Xml.SubElement(root_xml, 'object')
+    object_xml.set('lodperc', [50.0, 25.0])
+    shape_xml = Xml.SubElement(object_xml, 'triangleShape')
+
+    mesh_xml = Xml.SubElement(shape_xml, 'mesh')
+    mesh_xml.set('p', [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 0.0])
+    mesh_xml.set('n', [0.0, 0.0, -1.0] * 3)
+    mesh_xml.set('tri', [0, 2, 1])
+    mesh_xml.set('boundingsphere', [0.5, 0.5, 0.0, 0.75])
+    aabb_xml = Xml.SubElement(mesh_xml, 'aabb')
+    aabb_xml.set('min', [0.0, 0.0, 0.0])
+    aabb_xml.set('max', [1.0, 1.0, 0.0])
+    material_xml = Xml.SubElement(mesh_xml, 'material')
+    material_xml.set('shader', ['PdxMeshStandard'])
+    material_xml.set('diff', ['triangle_diffuse.dds'])
+    skin_xml = Xml.SubElement(mesh_xml, 'skin')
+    skin_xml.set('bones', [4])
+    skin_xml.set('ix', [0, -1, -1, -1, 1, -1, -1, -1, 0, 1, -1, -1])
+    skin_xml.set('w', [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.5, 0.5, 0.0, 0.0])
+
+    skeleton_xml = Xml.SubElement(shape_xml, 'skeleton')
+    for i, name in enumerate(['root', 'arm']):
+        bone_xml = Xml.SubElement(skeleton_xml, name)
+        bone_xml.set('ix', [i])
+        if i:
+            bone_xml.set('pa', [i - 1])
+        bone_xml.set('tx', [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, -float(i), 0.0, 0.0])
+
+    locator_xml = Xml.SubElement(root_xml, 'locator')
+    locnode_xml = Xml.SubElement(locator_xml, 'attach')
+    locnode_xml.set('p', [0.0, 1.0, 0.0])
+    locnode_xml.set('q', [0.0, 0.0, 0.0, 1.0])
+    locnode_xml.set('pa', ['arm'])
+
+    return root_xml
+
+
+def get_tree(element):
+    # nested tuples of element tag, attributes and children, for comparing element trees
+    return element.tag, dict(element.attrib), [get_tree(child) for child in element]
+
+
+class TestMeshfile(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.meshpath = os.path.join(self.tempdir, 'triangle.mesh')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_round_trip(self):
+        root_xml = make_mesh_xml()
+        pdx_data.write_meshfile(self.meshpath, root_xml)
+        asset_elem = pdx_data.read_meshfile(self.meshpath)
+
+        # all values above are exactly representable as 32 bit floats
+        expected = get_tree(root_xml)[2]
+        self.assertEqual(get_tree(asset_elem)[2], expected)
+        self.assertEqual(asset_elem.attrib['pdxasset'], [1, 0])
+
+        mesh_elem = asset_elem.find('object/triangleShape/mesh')
+        self.assertEqual(mesh_elem.attrib['boundingsphere'], [0.5, 0.5, 0.0, 0.75])
+        self.assertEqual(asset_elem.find('object').attrib['lodperc'], [50.0, 25.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+"""
+    Paradox asset files, DCC independent maths tests.
+
+    Run from the repository root with
+        python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdx_math  # noqa: E402
+
+
+def util_round(data, ndigits=0):
+    # per element rounding, as the exporters used before batched quantization
+    return tuple(round(x, ndigits) for x in data)
+
+
+def list_weld(keys):
+    # vertex welding, as the exporters used before pdx_math.weld
+    export_verts, unique_verts, indices = [], set(), []
+    for key in keys:
+        if key in unique_verts:
+            indices.append(export_verts.index(key))
+        else:
+            unique_verts.add(key)
+            export_verts.append(key)
+            indices.append(len(export_verts) - 1)
+    return export_verts, indices
+
+
+def random_positions(count, seed=0):
+    rng = random.Random(seed)
+    # include exact halfway values, which round differently depending on float representation
+    values = [rng.uniform(-10.0, 10.0) for _ in range(count * 3)]
+    values[0:6] = [0.125, 2.675, -0.000004, 1.000005, -2.5, 0.0]
+    return values
+
+
+class TestQuantize(unittest.TestCase):
+    def test_matches_round(self):
+        values = random_positions(500)
+        for ndigits in [0, 2, 3, 4, 5]:
+            quantized = pdx_math.quantize(values, ndigits)
+            self.assertEqual(quantized, list(util_round(values, ndigits)))
+            # compare exact float representation, not just equality
+            self.assertEqual([x.hex() for x in quantized], [x.hex() for x in util_round(values, ndigits)])
+
+    def test_iterable(self):
+        self.assertEqual(pdx_math.quantize(iter([1.23456, 2.5]), 2), [1.23, 2.5])
+
+    def test_quantize_keys(self):
+        values = random_positions(100)
+        vectors = pdx_math.pack(values, 3)
+        self.assertEqual(pdx_math.quantize_keys(values, 5, 3), [util_round(v, 5) for v in vectors])
+
+    def test_flatten(self):
+        values = random_positions(10)
+        self.assertEqual(pdx_math.flatten(pdx_math.pack(values, 3)), values)
+
+
+class TestWeld(unittest.TestCase):
+    def test_matches_list_weld(self):
+        rng = random.Random(1)
+        values = random_positions(50)
+        # tri-verts sharing positions, as from a triangulated mesh
+        keys = [util_round(values[i * 3 : i * 3 + 3], 5) for i in (rng.randrange(50) for _ in range(300))]
+
+        first_indices, item_indices = pdx_math.weld(keys)
+        export_verts, indices = list_weld(keys)
+        self.assertEqual([keys[k] for k in first_indices], export_verts)
+        self.assertEqual(item_indices, indices)
+
+    def test_no_merge(self):
+        keys = [(0.0,), (1.0,), (0.0,)]
+        self.assertEqual(pdx_math.weld(keys, merge=False), ([0, 1, 2], [0, 1, 2]))
+        self.assertEqual(pdx_math.weld(keys), ([0, 1], [0, 1, 0]))
+
+
+class TestLimitInfluences(unittest.TestCase):
+    def test_limits_to_largest(self):
+        influences = [[(0, 0.4), (1, 0.3), (2, 0.1), (3, 0.1), (4, 0.1)]]
+        ix, w, report = pdx_math.limit_influences(influences, 4)
+
+        self.assertEqual(ix, [0, 1, 2, 3])
+        self.assertAlmostEqual(sum(w), 1.0)
+        for weight, expected in zip(w, [0.4, 0.3, 0.1, 0.1]):
+            self.assertAlmostEqual(weight, expected / 0.9)
+        self.assertEqual(report['vertices'], 1)
+        self.assertEqual(report['limited'], 1)
+        self.assertAlmostEqual(report['max_error'], 0.1)
+
+    def test_padding_and_unchanged(self):
+        influences = [[(2, 1.0)], [(0, 0.25), (1, 0.75)]]
+        ix, w, report = pdx_math.limit_influences(influences, 4)
+
+        self.assertEqual(ix, [2, -1, -1, -1, 0, 1, -1, -1])
+        self.assertEqual(w, [1.0, 0.0, 0.0, 0.0, 0.25, 0.75, 0.0, 0.0])
+        self.assertEqual(report, {'vertices': 2, 'limited': 0, 'max_error': 0.0})
+
+    def test_prune_threshold(self):
+        influences = [[(0, 0.999995), (1, 0.000005)], [(3, 0.000001)]]
+        ix, w, report = pdx_math.limit_influences(influences, 4, prune_threshold=0.00001)
+
+        # the pruned vertex is renormalized, a vertex is never pruned down to no influences
+        self.assertEqual(ix, [0, -1, -1, -1, 3, -1, -1, -1])
+        self.assertEqual(w[0], 1.0)
+        self.assertEqual(w[4], 0.000001)
+        self.assertEqual(report['limited'], 1)
+        self.assertAlmostEqual(report['max_error'], 0.000005)
+
+    def test_quantize(self):
+        influences = [[(0, 0.333), (1, 0.667)], [(0, 0.2), (1, 0.2), (2, 0.2), (3, 0.2), (4, 0.2)]]
+        ix, w, report = pdx_math.limit_influences(influences, 4, ndigits=2)
+
+        self.assertEqual(w[:4], [0.33, 0.67, 0.0, 0.0])
+        self.assertEqual(w[4:], [0.25, 0.25, 0.25, 0.25])
+        self.assertEqual(report['limited'], 1)
+        self.assertAlmostEqual(report['max_error'], 0.2)
+
+
+class TestMatrices(unittest.TestCase):
+    # fmt: off
+    # uniform scale of 2, rotated 90 degrees around Z and translated
+    MATRIX = [
+        0.0, 2.0, 0.0, 0.0,
+        -2.0, 0.0, 0.0, 0.0,
+        0.0, 0.0, 2.0, 0.0,
+        1.0, 2.0, 3.0, 1.0,
+    ]
+    IDENTITY = [
+        1.0, 0.0, 0.0, 0.0,
+        0.0, 1.0, 0.0, 0.0,
+        0.0, 0.0, 1.0, 0.0,
+        0.0, 0.0, 0.0, 1.0,
+    ]
+    SWAP_YZ = [
+        1.0, 0.0, 0.0, 0.0,
+        0.0, 0.0, 1.0, 0.0,
+        0.0, 1.0, 0.0, 0.0,
+        0.0, 0.0, 0.0, 1.0,
+    ]
+    # fmt: on
+
+    def assertSequenceAlmostEqual(self, values, expected):
+        self.assertEqual(len(values), len(expected))
+        for value, expected_value in zip(values, expected):
+            self.assertAlmostEqual(value, expected_value)
+
+    def test_convert_space(self):
+        # swapping Y and Z turns a rotation around Z into a rotation around Y
+        # fmt: off
+        expected = [
+            0.0, 0.0, 2.0, 0.0,
+            0.0, 2.0, 0.0, 0.0,
+            -2.0, 0.0, 0.0, 0.0,
+            1.0, 3.0, 2.0, 1.0,
+        ]
+        # fmt: on
+        self.assertEqual(pdx_math.convert_space([self.MATRIX], self.SWAP_YZ), [expected])
+
+    def test_invert(self):
+        # fmt: off
+        expected = [
+            0.0, -0.5, 0.0, 0.0,
+            0.5, 0.0, 0.0, 0.0,
+            0.0, 0.0, 0.5, 0.0,
+            -1.0, 0.5, -1.5, 1.0,
+        ]
+        # fmt: on
+        inverse = pdx_math.invert_matrices([self.MATRIX])[0]
+        self.assertSequenceAlmostEqual(inverse, expected)
+        self.assertSequenceAlmostEqual(pdx_math.multiply_matrices([self.MATRIX], [inverse])[0], self.IDENTITY)
+
+    def test_invert_singular(self):
+        # singular matrices keep an identity rotation and scale, only the translation is inverted
+        singular = [0.0] * 12 + [1.0, 2.0, 3.0, 1.0]
+        inverse = pdx_math.invert_matrices([singular])[0]
+        self.assertEqual(inverse, self.IDENTITY[:12] + [-1.0, -2.0, -3.0, 1.0])
+
+    def test_decompose(self):
+        translations, rotations, scales = pdx_math.decompose_matrices([self.MATRIX])
+        self.assertEqual(translations, [(1.0, 2.0, 3.0)])
+        self.assertSequenceAlmostEqual(rotations[0], [0.0, 0.0, 0.5 ** 0.5, 0.5 ** 0.5])
+        self.assertSequenceAlmostEqual(scales[0], [2.0, 2.0, 2.0])
+
+        # composing gives back the original matrix
+        self.assertSequenceAlmostEqual(pdx_math.compose_matrices(translations, rotations, scales)[0], self.MATRIX)
+
+    def test_decompose_mirrored(self):
+        # a negative determinant flips every scale axis, the remaining rotation is 180 degrees around X
+        mirrored = [-1.0] + self.IDENTITY[1:]
+        translations, rotations, scales = pdx_math.decompose_matrices([mirrored])
+        self.assertSequenceAlmostEqual(rotations[0], [1.0, 0.0, 0.0, 0.0])
+        self.assertSequenceAlmostEqual(scales[0], [-1.0, -1.0, -1.0])
+        self.assertSequenceAlmostEqual(pdx_math.compose_matrices(translations, rotations, scales)[0], mirrored)
+
+
+class TestBounds(unittest.TestCase):
+    def assertContains(self, sphere, positions):
+        cx, cy, cz, radius = sphere
+        for x, y, z in pdx_math.pack(positions, 3):
+            self.assertLessEqual(((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2) ** 0.5, radius + 1e-9)
+
+    def test_aabb(self):
+        positions = [1.0, -2.0, 3.0, -4.0, 5.0, 0.5, 0.0, 0.0, -6.0]
+        self.assertEqual(pdx_math.get_aabb(positions), ([-4.0, -2.0, -6.0], [1.0, 5.0, 3.0]))
+
+    def test_sphere_contains_points(self):
+        for seed in range(5):
+            positions = random_positions(200, seed)
+            self.assertContains(pdx_math.get_bounding_sphere(positions), positions)
+
+    def test_sphere_of_cube(self):
+        # the sphere through the corners of a cube is the tightest possible
+        corners = [float(c) for x in [-1, 1] for y in [-1, 1] for z in [-1, 1] for c in [x, y, z]]
+        sphere = pdx_math.get_bounding_sphere(corners)
+        self.assertContains(sphere, corners)
+        self.assertAlmostEqual(sphere[3], 3.0 ** 0.5)
+        for c in sphere[:3]:
+            self.assertAlmostEqual(c, 0.0)
+
+    def test_sphere_degenerate(self):
+        self.assertEqual(pdx_math.get_bounding_sphere([]), [0.0, 0.0, 0.0, 0.0])
+        self.assertEqual(pdx_math.get_bounding_sphere([1.0, 2.0, 3.0]), [1.0, 2.0, 3.0, 0.0])
+
+    def test_bounds(self):
+        positions = random_positions(20)
+        bounds = pdx_math.get_bounds(positions)
+        self.assertEqual(sorted(bounds), ['boundingsphere', 'max', 'min'])
+        self.assertEqual([bounds['min'], bounds['max']], list(pdx_math.get_aabb(positions)))
+
+    def test_lod_switches(self):
+        self.assertEqual(pdx_math.get_lod_switches(['50', 25, 12.5]), [50.0, 25.0, 12.5])
+        for lodperc in [[50.0, 0.0], [-10.0]]:
+            with self.assertRaises(ValueError):
+                pdx_math.get_lod_switches(lodperc)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+"""
+    Paradox asset files, DCC independent skeleton model tests.
+
+    Run from the repository root with
+        python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import math
+import unittest
+
+try:
+    import xml.etree.cElementTree as Xml
+except ImportError:
+    import xml.etree.ElementTree as Xml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdx_data  # noqa: E402
+import pdx_math  # noqa: E402
+import pdx_skeleton  # noqa: E402
+
+
+# a three bone chain, the spine is rotated 90 degrees around Z and the arm is offset along the spines X axis
+# fmt: off
+BIND_WORLD = {
+    'root': [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0],
+    'spine': [0.0, 1.0, 0.0, 0.0, -1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 1.0, 0.0, 1.0],
+    'arm': [0.0, 1.0, 0.0, 0.0, -1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 2.0, 0.0, 1.0],
+}
+BIND_TX = {
+    'root': [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+    'spine': [0.0, -1.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, -1.0, 0.0, 0.0],
+    'arm': [0.0, -1.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, -2.0, 0.0, 0.0],
+}
+# fmt: on
+
+
+def make_pdx_bones(order=('arm', 'root', 'spine')):
+    # bones as read from a .mesh file, which need not be stored in index order
+    indices = {'root': 0, 'spine': 1, 'arm': 2}
+    skeleton_xml = Xml.Element('skeleton')
+    for name in order:
+        bone_xml = Xml.SubElement(skeleton_xml, name)
+        bone_xml.set('ix', [indices[name]])
+        if indices[name]:
+            bone_xml.set('pa', [indices[name] - 1])
+        bone_xml.set('tx', BIND_TX[name])
+
+    return [pdx_data.PDXData(bone_xml) for bone_xml in skeleton_xml]
+
+
+class SkeletonTestCase(unittest.TestCase):
+    def assertMatricesAlmostEqual(self, matrices, expected, places=6):
+        self.assertEqual(len(matrices), len(expected))
+        for matrix, expected_matrix in zip(matrices, expected):
+            self.assertEqual(len(matrix), len(expected_matrix))
+            for value, expected_value in zip(matrix, expected_matrix):
+                self.assertAlmostEqual(value, expected_value, places=places)
+
+
+class TestSkeleton(SkeletonTestCase):
+    def test_from_pdx_bones(self):
+        skeleton = pdx_skeleton.PDXSkeleton.from_pdx_bones(make_pdx_bones())
+
+        self.assertEqual(skeleton.names, ['root', 'spine', 'arm'])
+        self.assertEqual(skeleton.parents, [-1, 0, 1])
+        self.assertEqual(skeleton.children, [[1], [2], []])
+        self.assertEqual(skeleton.roots, [0])
+        self.assertEqual(skeleton.index['arm'], 2)
+        self.assertEqual(skeleton.transforms[1], BIND_TX['spine'])
+
+    def test_from_hierarchy(self):
+        # parents outside the bone list, or None, make roots
+        bones = ['root', 'spine', 'arm', 'prop']
+        skeleton = pdx_skeleton.PDXSkeleton.from_hierarchy(bones, [None, 'root', 'spine', 'world'])
+
+        self.assertEqual(skeleton.parents, [-1, 0, 1, -1])
+        self.assertEqual(skeleton.roots, [0, 3])
+        self.assertEqual(skeleton.get_depth_levels(), [[0, 3], [1], [2]])
+
+        named = pdx_skeleton.PDXSkeleton.from_hierarchy([10, 11], [None, 10], names=['a', 'b'])
+        self.assertEqual(named.names, ['a', 'b'])
+        self.assertEqual(named.parents, [-1, 0])
+
+    def test_mismatched(self):
+        with self.assertRaises(ValueError):
+            pdx_skeleton.PDXSkeleton(['root', 'spine'], [-1])
+
+    def test_inverse_bind_transforms(self):
+        skeleton = pdx_skeleton.PDXSkeleton.from_pdx_bones(make_pdx_bones())
+        world_matrices = skeleton.get_bind_matrices()[0]
+        self.assertMatricesAlmostEqual(world_matrices, [BIND_WORLD[name] for name in skeleton.names])
+
+        # inverting the bind matrices gives back the transforms stored in the file
+        transforms = pdx_math.matrices_to_tx(pdx_math.invert_matrices(world_matrices))
+        self.assertMatricesAlmostEqual(transforms, [BIND_TX[name] for name in skeleton.names])
+
+
+class TestEvaluatePoses(SkeletonTestCase):
+    def test_bind_pose(self):
+        # every bone unposed, on every frame, gives the bind pose matching the inverse of the stored transforms
+        skeleton = pdx_skeleton.PDXSkeleton.from_pdx_bones(make_pdx_bones())
+        frames = skeleton.evaluate_poses([[None] * len(skeleton)] * 3)
+
+        self.assertEqual(len(frames), 3)
+        for world_matrices in frames:
+            self.assertMatricesAlmostEqual(world_matrices, [BIND_WORLD[name] for name in skeleton.names])
+            transforms = pdx_math.matrices_to_tx(pdx_math.invert_matrices(world_matrices))
+            self.assertMatricesAlmostEqual(transforms, [BIND_TX[name] for name in skeleton.names])
+
+    def test_chain(self):
+        # root moves along Z, the spine above it rotates around Z with a scale of 2, the arm is offset along the spine
+        skeleton = pdx_skeleton.PDXSkeleton(['root', 'spine', 'arm'], [-1, 0, 1])
+        angles = [0.0, math.pi / 4.0, math.pi / 2.0, math.pi]
+        frame_poses = [
+            [
+                ((0.0, 0.0, float(f)), (0.0, 0.0, 0.0, 1.0), (1.0,)),
+                ((0.0, 1.0, 0.0), (0.0, 0.0, math.sin(a / 2.0), math.cos(a / 2.0)), (2.0,)),
+                ((1.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0), (1.0,)),
+            ]
+            for f, a in enumerate(angles)
+        ]
+        frames = skeleton.evaluate_poses(frame_poses)
+
+        for f, (a, world_matrices) in enumerate(zip(angles, frames)):
+            c, s = math.cos(a), math.sin(a)
+            # fmt: off
+            spine = [
+                2.0 * c, 2.0 * s, 0.0, 0.0,
+                -2.0 * s, 2.0 * c, 0.0, 0.0,
+                0.0, 0.0, 2.0, 0.0,
+                0.0, 1.0, float(f), 1.0,
+            ]
+            # fmt: on
+            arm = spine[:12] + [2.0 * c, 1.0 + 2.0 * s, float(f), 1.0]
+            root = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, float(f), 1.0]
+            self.assertMatricesAlmostEqual(world_matrices, [root, spine, arm])
+
+    def test_unposed_holds_bind(self):
+        # only the root is posed, its children follow it while holding their bind offsets
+        skeleton = pdx_skeleton.PDXSkeleton.from_pdx_bones(make_pdx_bones())
+        frame_poses = [[((0.0, 0.0, float(f)), (0.0, 0.0, 0.0, 1.0), (1.0,)), None, None] for f in range(3)]
+        frames = skeleton.evaluate_poses(frame_poses)
+
+        for f, world_matrices in enumerate(frames):
+            expected = [BIND_WORLD[name][:14] + [float(f), 1.0] for name in skeleton.names]
+            self.assertMatricesAlmostEqual(world_matrices, expected)
+
+    def test_unposed_without_bind(self):
+        skeleton = pdx_skeleton.PDXSkeleton(['root', 'spine'], [-1, 0])
+        with self.assertRaises(RuntimeError):
+            skeleton.evaluate_poses([[((0.0, 0.0, 0.0), (0.0, 0.0, 0.0, 1.0), (1.0,)), None]])
+
+
+if __name__ == '__main__':
+    unittest.main()